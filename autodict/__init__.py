@@ -7,5 +7,6 @@ from autodict import version
 
 __version__ = version.version_full
 
-from autodict.implementation import AutoDict
+from autodict.implementation import (AutoDict, FrozenAutoDict, LazyAutoDict,
+                                     ObservedAutoDict)
 from autodict.json_drivers import *
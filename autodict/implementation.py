@@ -3,6 +3,9 @@
 
 from __future__ import annotations
 
+import weakref
+from typing import Callable, Optional, Tuple
+
 
 class AutoDict(dict):
   """Dictionary that automatically adds children dictionaries as necessary
@@ -52,3 +55,327 @@ class AutoDict(dict):
     if isinstance(o, list):
       return self.contains(*o)
     return super().__contains__(o)
+
+
+class LazyAutoDict(AutoDict):
+  """AutoDict that upgrades plain dict children on first access
+
+  Children that are plain dicts, such as those from a JSON parser without an
+  object hook, are left untouched until reached through __getitem__ or get.
+  Then that child alone is replaced by a LazyAutoDict so untouched subtrees are
+  never copied. Dicts reached through values(), items(), or inside lists are
+  returned as is.
+  """
+
+  def __missing__(self, key: object):
+    """Called when a key does not exist in the dictionary
+
+    Args:
+      key: Index of item that does not exist
+
+    Returns:
+      New LazyAutoDict created at key location
+    """
+    value = self[key] = LazyAutoDict()
+    return value
+
+  def __getitem__(self, key: object):
+    value = super().__getitem__(key)
+    if type(value) is dict:  # pylint: disable=unidiomatic-typecheck
+      value = LazyAutoDict(value)
+      super().__setitem__(key, value)
+    return value
+
+  def get(self, key: object, default: object = None) -> object:
+    if super().__contains__(key):
+      return self[key]
+    return default
+
+
+class ObservedAutoDict(LazyAutoDict):
+  """LazyAutoDict that reports every mutation of itself and its children
+
+  Observers are called with (op, path, value) where op is "set", "delete", or
+  "clear", path is the tuple of keys from the observed node to the mutated key
+  (to the cleared node for "clear"), and value is the new value for "set" else
+  None.
+
+  Children are linked to their parent when stored or accessed. AutoDict
+  children are upgraded in place by changing their class, plain dict children
+  are copied like LazyAutoDict. Links to parents are weak so a tree is freed
+  as soon as its root is no longer referenced. Mutations inside lists are not
+  observed, nor are mutations to a child through a reference held from before
+  it was removed.
+  """
+
+  # Weak reference to parent, set per instance when stored in an
+  # ObservedAutoDict
+  _parent: weakref.ref = None
+  _key: object = None
+  _observers: tuple = ()
+  # Encoded members, invalidated upon mutation of this node or a child, see
+  # JSONDriver.encode_cached
+  _encoded: object = None
+
+  def add_observer(self, callback: Callable[[str, tuple, object],
+                                            None]) -> None:
+    """Add a callback for mutations of this node and its children
+
+    Args:
+      callback: Function called with (op, path, value) after each mutation
+    """
+    self._observers = self._observers + (callback,)
+
+  def remove_observer(self, callback: Callable[[str, tuple, object],
+                                               None]) -> None:
+    """Remove a callback added with add_observer
+
+    Args:
+      callback: Function to remove
+
+    Raises:
+      ValueError if callback was not added
+    """
+    observers = list(self._observers)
+    observers.remove(callback)
+    self._observers = tuple(observers)
+
+  def _notify(self, op: str, path: tuple, value: object) -> None:
+    """Call the observers of this node and every ancestor
+
+    Args:
+      op: "set", "delete", or "clear"
+      path: Keys from this node to the mutated key
+      value: New value for "set" else None
+    """
+    # pylint: disable=protected-access
+    node = self
+    while True:
+      if node._encoded is not None:
+        node._encoded.invalidate(op, path)
+      for callback in node._observers:
+        callback(op, path, value)
+      parent = node.parent()
+      if parent is None:
+        return
+      path = (node._key,) + path
+      node = parent
+
+  def _invalidate(self, path: tuple) -> None:
+    """Invalidate the encoded member of this node and every ancestor
+
+    Args:
+      path: Keys from this node to the member
+    """
+    # pylint: disable=protected-access
+    node = self
+    while node is not None:
+      if node._encoded is not None:
+        node._encoded.invalidate("set", path)
+      path = (node._key,) + path
+      node = node.parent()
+
+  def parent(self) -> Optional[ObservedAutoDict]:
+    """Get the node this node is linked to
+
+    Returns:
+      Parent node, None if not linked or the parent was freed
+    """
+    ref = self._parent
+    if ref is None:
+      return None
+    return ref()
+
+  def is_linked(self, parent: ObservedAutoDict, key: object) -> bool:
+    """Check this node is linked to a parent at a key
+
+    Args:
+      parent: Node expected to hold this node
+      key: Key of this node in parent
+
+    Returns:
+      True if mutations of this node are reported to parent under key
+    """
+    return self.parent() is parent and self._key == key
+
+  def _link(self, key: object, value: object) -> None:
+    """Link a child to this node unless it is linked to another node
+
+    Children shared with another tree, such as by copy.copy, stay linked to
+    it until accessed through this node, see __getitem__.
+
+    Args:
+      key: Key of child
+      value: Child, anything but an ObservedAutoDict is ignored
+    """
+    # pylint: disable=protected-access
+    if isinstance(value, ObservedAutoDict) and value.parent() is None:
+      value._parent = weakref.ref(self)
+      value._key = key
+
+  def _unlink(self, value: object) -> None:
+    """Unlink a removed child from this node
+
+    Args:
+      value: Removed child, anything not linked to this node is ignored
+    """
+    # pylint: disable=protected-access
+    if isinstance(value, ObservedAutoDict) and value.parent() is self:
+      value._parent = None
+      value._key = None
+
+  def __getstate__(self) -> dict:
+    # Copies are not linked, observed, nor cached
+    state = dict(self.__dict__)
+    for k in ("_parent", "_key", "_observers", "_encoded"):
+      state.pop(k, None)
+    return state
+
+  def __missing__(self, key: object):
+    """Called when a key does not exist in the dictionary
+
+    Args:
+      key: Index of item that does not exist
+
+    Returns:
+      New ObservedAutoDict created at key location
+    """
+    value = self[key] = ObservedAutoDict()
+    return value
+
+  def __getitem__(self, key: object):
+    value = dict.__getitem__(self, key)
+    t = type(value)
+    if t is dict:
+      value = ObservedAutoDict(value)
+      dict.__setitem__(self, key, value)
+    elif t is AutoDict or t is LazyAutoDict:
+      value.__class__ = ObservedAutoDict
+    elif t is ObservedAutoDict:
+      # Children unlinked by a copy, or linked elsewhere, are linked again
+      ref = value._parent
+      parent = None if ref is None else ref()
+      if parent is self and value._key == key:
+        return value
+      if parent is not None:
+        # The previous location is no longer notified of mutations
+        parent._invalidate((value._key,))
+    else:
+      return value
+    value._parent = weakref.ref(self)
+    value._key = key
+    return value
+
+  def __setitem__(self, key: object, value: object) -> None:
+    self._unlink(dict.get(self, key))
+    dict.__setitem__(self, key, value)
+    self._link(key, value)
+    self._notify("set", (key,), value)
+
+  def __delitem__(self, key: object) -> None:
+    value = dict.pop(self, key)
+    self._unlink(value)
+    self._notify("delete", (key,), None)
+
+  def pop(self, key: object, *args) -> object:
+    if not dict.__contains__(self, key):
+      return dict.pop(self, key, *args)
+    value = dict.pop(self, key)
+    self._unlink(value)
+    self._notify("delete", (key,), None)
+    return value
+
+  def popitem(self) -> Tuple[object, object]:
+    key, value = dict.popitem(self)
+    self._unlink(value)
+    self._notify("delete", (key,), None)
+    return key, value
+
+  def clear(self) -> None:
+    for value in dict.values(self):
+      self._unlink(value)
+    dict.clear(self)
+    self._notify("clear", (), None)
+
+  def setdefault(self, key: object, default: object = None) -> object:
+    if dict.__contains__(self, key):
+      return self[key]
+    self[key] = default
+    return default
+
+  def update(self, other: object = (), **kwargs) -> None:
+    if hasattr(other, "keys"):
+      for k in other.keys():
+        self[k] = other[k]
+    else:
+      for k, v in other:
+        self[k] = v
+    for k, v in kwargs.items():
+      self[k] = v
+
+  def __ior__(self, other: object) -> ObservedAutoDict:
+    self.update(other)
+    return self
+
+
+class FrozenAutoDict(AutoDict):
+  """Read-only AutoDict that can be shared without copying
+
+  Missing keys raise KeyError rather than adding children and mutations raise
+  TypeError. Children are FrozenAutoDicts and lists are tuples, see freeze.
+  Use thaw for a mutable copy.
+  """
+
+  @classmethod
+  def freeze(cls, obj: object) -> object:
+    """Copy the dicts and lists of a tree into FrozenAutoDicts and tuples
+
+    Args:
+      obj: Root of tree, other values are shared
+
+    Returns:
+      Read-only copy of obj
+    """
+    t = type(obj)
+    if t is cls:
+      return obj
+    if isinstance(obj, dict):
+      return cls({k: cls.freeze(v) for k, v in dict.items(obj)})
+    if isinstance(obj, (list, tuple)):
+      return tuple(cls.freeze(v) for v in obj)
+    return obj
+
+  def thaw(self) -> AutoDict:
+    """Copy into a mutable tree
+
+    Returns:
+      AutoDict with AutoDict children and lists in place of tuples
+    """
+
+    def thaw(obj: object) -> object:
+      if isinstance(obj, dict):
+        return AutoDict({k: thaw(v) for k, v in dict.items(obj)})
+      if isinstance(obj, tuple):
+        return [thaw(v) for v in obj]
+      return obj
+
+    return thaw(self)
+
+  def __missing__(self, key: object):
+    raise KeyError(key)
+
+  def _read_only(self, *args, **kwargs) -> None:
+    raise TypeError("FrozenAutoDict is read-only, see thaw")
+
+  __setitem__ = _read_only
+  __delitem__ = _read_only
+  __ior__ = _read_only
+  pop = _read_only
+  popitem = _read_only
+  clear = _read_only
+  setdefault = _read_only
+  update = _read_only
+
+  def __reduce__(self) -> tuple:
+    # Rebuilt in one call since setting items raises
+    return (type(self), (dict(self),))
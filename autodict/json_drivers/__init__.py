@@ -1,5 +1,13 @@
-"""JSON Drivers to serialize/deserialize AutoDict objects
+"""JSON and binary drivers to serialize/deserialize AutoDict objects
 """
 
-from autodict.json_drivers.base import (JSONAutoDict, JSONDriver,
-                                        DefaultJSONDriver)
+from autodict.json_drivers.registry import TypeRegistry, register_type
+from autodict.json_drivers.auto import best_driver
+from autodict.json_drivers.serialization import (SerializationDriver,
+                                                 JSONDriver, DefaultJSONDriver)
+from autodict.json_drivers.base import JSONAutoDict
+from autodict.json_drivers.ndjson import AppendLog, NDJSONAutoDict
+from autodict.json_drivers.sharded import ShardedAutoDict
+from autodict.json_drivers.cache import TreeCache
+from autodict.json_drivers.sqlite import SQLiteAutoDict
+from autodict.json_drivers.instrument import StatsAggregator
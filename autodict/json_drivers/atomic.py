@@ -0,0 +1,127 @@
+"""Atomic replacement of files with configurable durability
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import itertools
+import os
+import pathlib
+import stat
+from typing import Iterator, Optional, Tuple, Union
+
+# Levels from fastest to most durable:
+#   none: write the file in place, a crash mid-write leaves it truncated
+#   flush: write a temporary file then rename it over the file, readers and
+#     crashes of the process see the old or the new file, never a mix
+#   fsync: flush and sync the temporary file to disk before renaming so a
+#     power loss cannot leave the new file empty
+#   fsync_dir: fsync and sync the directory after renaming so the rename
+#     itself survives a power loss
+DURABILITIES: Tuple[str, ...] = ("none", "flush", "fsync", "fsync_dir")
+
+# Numbers the temporary files of a process
+_TMP_IDS = itertools.count()
+
+
+def check(durability: str) -> str:
+  """Check a durability level is known
+
+  Args:
+    durability: Name of level, see DURABILITIES
+
+  Returns:
+    durability
+
+  Raises:
+    ValueError if durability is unknown
+  """
+  if durability not in DURABILITIES:
+    raise ValueError(f"Unknown durability '{durability}', expected one of "
+                     f"{list(DURABILITIES)}")
+  return durability
+
+
+def fsync_dir(path: Union[str, os.PathLike]) -> None:
+  """Sync a directory's entries to disk
+
+  Does nothing on platforms that cannot open directories, such as Windows.
+
+  Args:
+    path: Path to directory
+  """
+  try:
+    fd = os.open(path, os.O_RDONLY)
+  except (PermissionError, IsADirectoryError):
+    return
+  try:
+    os.fsync(fd)
+  finally:
+    os.close(fd)
+
+
+def signature(path: Union[str, os.PathLike]) -> Optional[Tuple[int, ...]]:
+  """Get a signature that changes when a file is replaced or modified
+
+  Replacing with open_atomic changes the inode, writing in place changes the
+  size or modification time.
+
+  Args:
+    path: Path to file
+
+  Returns:
+    (inode, size, modification time in ns), None if the file does not exist
+  """
+  try:
+    st = os.stat(path)
+  except FileNotFoundError:
+    return None
+  return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+@contextlib.contextmanager
+def open_atomic(path: Union[str, os.PathLike],
+                durability: str = "flush") -> Iterator[io.BufferedWriter]:
+  """Context to write a file that replaces path upon exit
+
+  The temporary file is in the same directory so the rename does not cross
+  file systems, it is removed if the context raises. An existing file's
+  permissions are kept. A symbolic link is kept, the file it points to is
+  replaced.
+
+  Args:
+    path: Path to file
+    durability: Name of level, see DURABILITIES
+
+  Yields:
+    Binary file object to write the new contents
+  """
+  if check(durability) == "none":
+    with open(path, "wb") as file:
+      yield file
+    return
+
+  # Replacing a link would replace the link itself rather than its target
+  path = pathlib.Path(os.path.realpath(path))
+
+  # Unique per call so concurrent writers do not share a temporary file, even
+  # a destructor saving the same path from the garbage collector mid-write
+  tmp = path.with_name(f".{path.name}.{os.getpid()}.{next(_TMP_IDS)}.tmp")
+  try:
+    with open(tmp, "wb") as file:
+      yield file
+      file.flush()
+      if durability != "flush":
+        os.fsync(file.fileno())
+    try:
+      os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+    except FileNotFoundError:
+      pass
+    os.replace(tmp, path)
+  except BaseException:
+    with contextlib.suppress(FileNotFoundError):
+      os.remove(tmp)
+    raise
+  if durability == "fsync_dir":
+    fsync_dir(path.parent)
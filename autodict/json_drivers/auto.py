@@ -0,0 +1,139 @@
+"""Selection of the fastest installed JSONDriver or the driver of a file format
+
+Driver modules are only imported when probed so selection costs nothing for
+users that pick a driver themselves.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import os
+import pathlib
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple, Union
+
+from autodict.json_drivers import compression
+
+# Fastest first as measured by tests/json_drivers/test_*.py::test_speed_*
+DRIVERS: Tuple[Tuple[str, str], ...] = (
+    ("autodict.json_drivers.orjson", "OrjsonDriver"),
+    ("autodict.json_drivers.rapidjson", "RapidJSONDriver"),
+    ("autodict.json_drivers.ujson", "UltraJSONDriver"),
+    ("autodict.json_drivers.simplejson", "SimpleJSONDriver"),
+    ("autodict.json_drivers.serialization", "DefaultJSONDriver"),
+)
+
+# Binary formats, never chosen by best_driver since they do not write JSON
+BINARY_DRIVERS: Tuple[Tuple[str, str], ...] = (
+    ("autodict.json_drivers.pickle", "PickleDriver"),
+    ("autodict.json_drivers.marshal", "MarshalDriver"),
+    ("autodict.json_drivers.msgpack", "MsgpackDriver"),
+)
+
+# File suffix: driver of its format, see driver_for_path
+EXTENSIONS: Dict[str, Tuple[str, str]] = {
+    ".pickle": BINARY_DRIVERS[0],
+    ".pkl": BINARY_DRIVERS[0],
+    ".marshal": BINARY_DRIVERS[1],
+    ".msgpack": BINARY_DRIVERS[2],
+}
+
+
+def installed_drivers(binary: bool = False) -> Tuple[type, ...]:
+  """Get every driver whose backend is installed
+
+  Args:
+    binary: True will include the drivers of binary formats after the
+      JSONDrivers, see BINARY_DRIVERS
+
+  Returns:
+    Tuple of driver classes, fastest JSONDriver first
+  """
+  drivers = []
+  for module_name, class_name in DRIVERS + (BINARY_DRIVERS if binary else ()):
+    try:
+      module = importlib.import_module(module_name)
+    except ImportError:
+      continue
+    drivers.append(getattr(module, class_name))
+  return tuple(drivers)
+
+
+def driver_for_path(path: Union[str, os.PathLike]) -> Optional[type]:
+  """Get the driver of a file format from its suffix
+
+  A compression suffix is skipped so "cache.pickle.gz" uses PickleDriver.
+
+  Args:
+    path: Path to file
+
+  Returns:
+    Driver class from EXTENSIONS or None if the suffix is not a binary format
+
+  Raises:
+    ImportError if the format's backend is not installed
+  """
+  path = pathlib.Path(path)
+  if path.suffix.lower() in compression.SUFFIXES:
+    path = path.with_suffix("")
+  entry = EXTENSIONS.get(path.suffix.lower())
+  if entry is None:
+    return None
+  module_name, class_name = entry
+  return getattr(importlib.import_module(module_name), class_name)
+
+
+def supports(driver: type, capability: Union[str, type]) -> bool:
+  """Check if a driver supports a capability
+
+  Args:
+    driver: JSONDriver class to check
+    capability: Name from JSONDriver.CAPABILITIES or a type that needs to be
+      serialized, natively or through the driver's TypeRegistry
+
+  Returns:
+    True if driver supports capability
+  """
+  if isinstance(capability, str):
+    return capability in driver.CAPABILITIES
+  if issubclass(capability, driver.NATIVE_TYPES):
+    return True
+  return driver.REGISTRY.lookup(capability) is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _best_driver(capabilities: FrozenSet[Union[str, type]]) -> type:
+  """Find the fastest installed driver, cached by capabilities
+
+  Args:
+    capabilities: Required capabilities
+
+  Returns:
+    JSONDriver class
+
+  Raises:
+    ValueError if no installed driver supports every capability
+  """
+  for driver in installed_drivers():
+    if all(supports(driver, c) for c in capabilities):
+      return driver
+  raise ValueError(f"No installed JSONDriver supports {set(capabilities)}")
+
+
+def best_driver(capabilities: Iterable[Union[str, type]] = ()) -> type:
+  """Find the fastest installed driver that supports every capability
+
+  The choice is cached for each set of capabilities.
+
+  Args:
+    capabilities: Required capabilities, names from JSONDriver.CAPABILITIES
+      such as "indent" for any indentation width, or types that need to be
+      serialized
+
+  Returns:
+    JSONDriver class
+
+  Raises:
+    ValueError if no installed driver supports every capability
+  """
+  return _best_driver(frozenset(capabilities))
@@ -1,196 +1,1055 @@
-"""Default JSONDriver that uses the built-in json library
+"""JSONAutoDict, an AutoDict saved to a file by a SerializationDriver
 """
 
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
-import datetime
-import io
-import json
+import contextlib
+import functools
+import itertools
 import os
 import pathlib
-from typing import Callable, Union
-import uuid
+import threading
+import time
+import weakref
+from typing import (TYPE_CHECKING, Callable, Dict, FrozenSet, Iterable, List,
+                    Optional, Union)
 
-from autodict.implementation import AutoDict
+from autodict.implementation import (AutoDict, FrozenAutoDict, LazyAutoDict,
+                                     ObservedAutoDict)
+from autodict.json_drivers import atomic, auto, cache, instrument, ndjson
+from autodict.json_drivers import compression as codec
+from autodict.json_drivers import locking as lockfile
+from autodict.json_drivers.serialization import (DefaultJSONDriver, JSONDriver,
+                                                 SerializationDriver)
 
+if TYPE_CHECKING:
+  # Imported upon use by the async methods, importing asyncio is slow
+  import asyncio
+  import concurrent.futures
 
-class JSONDriver(ABC):
-  """Drivers to dump an AutoDict to json and load from json
+
+def _copy_tree(obj: object) -> object:
+  """Copy the dicts and lists of a tree, other values are shared
+
+  Each container is copied by a single call that another thread cannot
+  interrupt so a concurrent mutation never leaves a container half copied.
+
+  Args:
+    obj: Root of tree
+
+  Returns:
+    Copy of tree with plain dicts and lists
   """
+  if isinstance(obj, dict):
+    copy = dict.copy(obj)
+    for k, v in copy.items():
+      if isinstance(v, (dict, list)):
+        copy[k] = _copy_tree(v)
+    return copy
+  if isinstance(obj, list):
+    copy = list.copy(obj)
+    for i, v in enumerate(copy):
+      if isinstance(v, (dict, list)):
+        copy[i] = _copy_tree(v)
+    return copy
+  return obj
 
-  @classmethod
-  @abstractmethod
-  def dump(cls,
-           obj: AutoDict,
-           fp: Union[str, os.PathLike, io.IOBase],
-           indent: int = None) -> None:
-    """Dump AutoDict to a file
+
+class _ChangeCounter:
+  """Observer that counts mutations
+
+  Holds no reference to the observed tree so adding it does not create a
+  reference cycle that would delay JSONAutoDict.__del__.
+  """
+
+  __slots__ = ("changes",)
+
+  def __init__(self) -> None:
+    self.changes = 0
+
+  def __call__(self, op: str, path: tuple, value: object) -> None:
+    self.changes += 1
+
+
+class _DirtyPaths:
+  """Observer that records the paths mutated since the last save
+
+  Holds no reference to the observed tree so adding it does not create a
+  reference cycle that would delay JSONAutoDict.__del__.
+  """
+
+  __slots__ = ("paths",)
+
+  def __init__(self) -> None:
+    # Path: True if its value was replaced, False if an empty dict was set
+    # which merges with the stored one so concurrent auto-vivified children
+    # are kept
+    self.paths: Dict[tuple, bool] = {}
+
+  def __call__(self, op: str, path: tuple, value: object) -> None:
+    if op == "clear":
+      # The cleared node is replaced by its new contents
+      self.paths[path] = True
+    elif op == "set" and isinstance(value, dict) and len(value) == 0:
+      self.paths.setdefault(path, False)
+    else:
+      self.paths[path] = True
+
+
+# Sentinel of a path missing from a tree
+_MISSING = object()
+
+
+def _merge_paths(target: dict, source: dict, paths: Dict[tuple, bool]) -> None:
+  """Apply the values of source at paths to target
+
+  Args:
+    target: Tree to update, intermediate dicts are created where missing
+    source: Tree with the new values, a path missing from it is deleted from
+      target
+    paths: Paths to apply, see _DirtyPaths
+  """
+  for path, replace in sorted(paths.items(), key=lambda item: len(item[0])):
+    if any(paths.get(path[:i], False) for i in range(len(path))):
+      # Covered by a replaced ancestor
+      continue
+    if len(path) == 0:
+      dict.clear(target)
+      dict.update(target, _copy_tree(source))
+      continue
+    value = source
+    for k in path:
+      if not isinstance(value, dict):
+        value = _MISSING
+        break
+      value = dict.get(value, k, _MISSING)
+    node = target
+    for k in path[:-1]:
+      child = dict.get(node, k)
+      if not isinstance(child, dict):
+        child = {}
+        dict.__setitem__(node, k, child)
+      node = child
+    k = path[-1]
+    if value is _MISSING:
+      dict.pop(node, k, None)
+    elif replace:
+      dict.__setitem__(node, k, _copy_tree(value))
+    elif not isinstance(dict.get(node, k), dict):
+      dict.__setitem__(node, k, {})
+
+
+def _periodic_loop(ref: weakref.ref, stop: threading.Event, interval: float,
+                   method: Callable[[JSONAutoDict], None]) -> None:
+  """Call a method of a JSONAutoDict until stopped or garbage collected
+
+  Args:
+    ref: Weak reference to the JSONAutoDict so the thread does not keep it
+      alive
+    stop: Event that ends the loop
+    interval: Seconds between calls
+    method: Function called with the JSONAutoDict
+  """
+  while not stop.wait(interval):
+    d = ref()
+    if d is None:
+      return
+    method(d)
+    del d
+
+
+class JSONAutoDict(AutoDict):
+  """AutoDict with json file compatibility/autosaving
+
+  With lazy_children plain dict children are upgraded to AutoDicts upon
+  access, see LazyAutoDict. Autosaving, journaling, locking, and caching
+  encodings observe mutations to track unsaved changes, see ObservedAutoDict.
+  The JSONAutoDict is only a LazyAutoDict or an ObservedAutoDict when it uses
+  these features, so the others do not pay for them.
+
+  In journal mode mutations are also appended to a sidecar journal,
+  path + ".journal", and saving only writes the new records. Opening replays
+  the journal over the file. Once the journal passes a threshold it is rotated
+  and folded into a new snapshot of the file by a background thread. Mutations
+  inside lists are not recorded, reassign the list to save them.
+
+  In locking mode processes share the file: loading holds a shared lock and
+  saving holds an exclusive lock, both on a sidecar file, path + ".lock". If
+  another process saved since this one loaded, saving reads the file again,
+  applies the paths mutated by this process, and replaces this AutoDict's
+  contents with the merged tree before writing it. A path set by both
+  processes keeps the last save's value. Setting an empty dict, as
+  auto-vivification does, merges with the stored dict, delete the key first
+  to replace it. Mutations inside lists are not recorded, reassign the list to
+  save them.
+  """
+
+  # Class a variant was created from, see _variant
+  _variant_base: type = None
+  _variant_mixin: type = None
+
+  def __init__(self,
+               path: str,
+               *,
+               save_on_exit: bool = True,
+               driver: Union[SerializationDriver, str] = None,
+               lazy_children: bool = False,
+               keys: Iterable = None,
+               compression: Optional[str] = "infer",
+               compression_level: int = None,
+               background_compression: bool = False,
+               executor: concurrent.futures.Executor = None,
+               autosave_interval: float = None,
+               autosave_min_changes: int = 1,
+               durability: str = "flush",
+               journal: bool = False,
+               journal_threshold: int = 1 << 24,
+               encoder_cache: bool = False,
+               lazy: bool = False,
+               locking: bool = False,
+               reload_check_interval: float = None,
+               **kwargs) -> None:
+    """Initialize JSONAutoDict
 
     Args:
-      obj: AutoDict to dump
-      fp: Path to file or object with a write() function
-      indent: A number will pretty-print the JSON, None will not
+      path: path to json file, or a binary format by suffix such as .pickle,
+        see auto.EXTENSIONS
+      save_on_exit: True will save file when object is closed, False will not
+      driver: SerializationDriver to serialize/deserialize the object, None
+        will use the driver of a binary suffix else the built-in json library
+        via DefaultJSONDriver, "auto" will use the driver of a binary suffix
+        else the fastest installed JSONDriver, see best_driver
+      lazy_children: True will load nested objects as plain dicts and upgrade
+        them upon first access, False will upgrade every object while loading
+      keys: Only load these top-level keys streaming the rest of the file
+        without parsing, see JSONDriver.iterload. The result cannot be saved
+        since the other keys are dropped. None will load every key
+      compression: "gzip", "bz2", or "xz" to compress the file, "infer" will
+        use the file suffix (.gz, .bz2, or .xz), None will not compress
+      compression_level: Level of compression, None will use the default of
+        each compression, see compression.DEFAULT_LEVELS
+      background_compression: True will compress on a separate thread while
+        encoding when saving, False will encode and compress alternately
+      executor: Executor to run asave on, None will use the event loop's
+        default executor
+      autosave_interval: Seconds between checks for unsaved changes by a
+        background thread, see flush. None will not autosave
+      autosave_min_changes: Number of unsaved changes that triggers an
+        autosave, fewer are saved by flush or upon exit
+      durability: "none" will write the file in place, "flush", "fsync", or
+        "fsync_dir" will write a temporary file then atomically replace the
+        file, each level syncing more to disk, see atomic.DURABILITIES
+      journal: True will save by appending mutations to a journal, see
+        JSONAutoDict. Records are encoded by the driver if it is a JSONDriver
+        else by DefaultJSONDriver. Buffered records may be written before a
+        save once the buffer is full, see AppendLog
+      journal_threshold: Number of bytes of journal that triggers folding it
+        into a new snapshot
+      encoder_cache: True will keep the encoding of each node so compact
+        saves only encode the subtrees changed since the last save, see
+        JSONDriver.encode_cached. Costs memory of about the file's size per
+        level of nesting
+      lazy: True will only check the file exists and parse it upon first
+        access, False will parse it now. A lazy JSONAutoDict closed before
+        any access is not saved since it has no changes. Consumers that read
+        the dict directly, such as json.dumps, see it empty until loaded,
+        see loaded
+      locking: True will lock the file while loading and saving and merge
+        the changes of other processes upon saving, see JSONAutoDict. Needs
+        fcntl. asave runs on the event loop's thread
+      reload_check_interval: Seconds between checks for changes to the file
+        by a background thread, see refresh. None will not check
+
+      other arguments passed to AutoDict.__init__
+
+    Raises:
+      ValueError if compression or durability is unknown, autosaving,
+      journaling, locking, or reloading with keys, caching encodings with a
+      binary driver, locking or reloading with journaling, or locking with
+      durability "none"
+      ImportError if locking without fcntl
     """
-    pass  # pragma: no cover
+    tracked = (autosave_interval is not None or journal or locking or
+               encoder_cache)
+    mixin = None
+    if tracked:
+      mixin = ObservedAutoDict
+    elif lazy_children:
+      mixin = LazyAutoDict
+    self.__class__ = _variant(type(self)._variant_base or type(self), mixin)
+    super().__init__(**kwargs)
+    self._path = pathlib.Path(path)
+    self._compression = codec.resolve(self._path, compression)
+    self._durability = atomic.check(durability)
+    self._partial = keys is not None
+    if driver is None:
+      driver = auto.driver_for_path(self._path) or DefaultJSONDriver
+    elif driver == "auto":
+      driver = auto.driver_for_path(self._path) or auto.best_driver()
+    self._driver = driver
+    if encoder_cache and not issubclass(driver, JSONDriver):
+      raise ValueError(f"Cannot cache encodings of {driver.__name__}, only a "
+                       "JSONDriver")
+    self._encoder_cache = encoder_cache
 
-  @classmethod
-  @abstractmethod
-  def dumps(cls, obj: AutoDict, indent: int = None) -> str:
-    """Dump AutoDict to a file
+    self._compression_level = compression_level
+    self._background_compression = background_compression
+    self._executor = executor
+    # asave coalescing: number of asave calls, number covered by a completed
+    # save, and the running save
+    self._save_requests = 0
+    self._saved_requests = 0
+    self._save_future: asyncio.Future = None
+
+    # Held while taking a snapshot for autosave, see lock
+    self._lock = threading.RLock()
+    # Held while writing the file
+    self._save_lock = threading.Lock()
+    # Number of mutations, and the number included in the last save, None
+    # if mutations are not observed
+    self._counter: _ChangeCounter = _ChangeCounter() if tracked else None
+    self._saved_changes = 0
+    self._stats = {
+        "saves": 0,
+        "errors": 0,
+        "last_seconds": 0.0,
+        "max_seconds": 0.0,
+        "total_seconds": 0.0,
+        "snapshot_seconds": 0.0,
+    }
+    self._autosave_min_changes = autosave_min_changes
+    self._autosave_stop: threading.Event = None
+    if autosave_interval is not None and self._partial:
+      raise ValueError("Cannot autosave JSONAutoDict opened with keys, the "
+                       "other keys were not loaded")
+    self._journal: ndjson.AppendLog = None
+    self._journal_threshold = journal_threshold
+    # Thread folding the rotated journals into a snapshot
+    self._compactor: threading.Thread = None
+    if journal and self._partial:
+      raise ValueError("Cannot journal JSONAutoDict opened with keys, the "
+                       "other keys were not loaded")
+    self._file_lock: lockfile.FileLock = None
+    # Paths mutated since the last save in locking mode
+    self._dirty: _DirtyPaths = None
+    # Signature of the file as last read or written, see refresh
+    self._signature: tuple = None
+    self._lazy_children = lazy_children
+    self._reload_callbacks: tuple = ()
+    self._reload_stop: threading.Event = None
+    if reload_check_interval is not None and (self._partial or journal):
+      raise ValueError("Cannot reload JSONAutoDict opened with keys or "
+                       "journaling")
+    if locking:
+      if self._partial or journal:
+        raise ValueError("Cannot lock JSONAutoDict opened with keys or "
+                         "journaling")
+      if self._durability == "none":
+        raise ValueError("Cannot lock JSONAutoDict with durability none, "
+                         "readers could see a partial file")
+      self._file_lock = lockfile.FileLock(
+          self._path.with_name(self._path.name + ".lock"))
+
+    # Arguments of _load until the first access when lazy
+    self._deferred: tuple = None
+    if lazy and (self._path.exists() or journal):
+      self._deferred = (keys, lazy_children, journal)
+    else:
+      self._load(keys, lazy_children, journal)
+
+    if tracked:
+      self.add_observer(self._counter)
+    if self._file_lock is not None:
+      self._dirty = _DirtyPaths()
+      self.add_observer(self._dirty)
+    # Set last so __del__ does not save if __init__ raised
+    self._save_on_exit = save_on_exit and not self._partial
+    if self._deferred is not None:
+      self._loaded_class = type(self)
+      self.__class__ = _deferred_class(type(self))
+    if autosave_interval is not None:
+      self._autosave_stop = threading.Event()
+      threading.Thread(target=_periodic_loop,
+                       args=(weakref.ref(self), self._autosave_stop,
+                             autosave_interval, JSONAutoDict._autosave),
+                       name="autodict-autosave",
+                       daemon=True).start()
+    if reload_check_interval is not None:
+      self._reload_stop = threading.Event()
+      threading.Thread(target=_periodic_loop,
+                       args=(weakref.ref(self), self._reload_stop,
+                             reload_check_interval, JSONAutoDict._reload),
+                       name="autodict-reload",
+                       daemon=True).start()
+
+  def _load(self, keys: Optional[Iterable], lazy_children: bool,
+            journal: bool) -> None:
+    """Load the file into this AutoDict
+
+    Args:
+      keys: Only load these top-level keys, None will load every key
+      lazy_children: True will load nested objects as plain dicts
+      journal: True will replay and open the journal
+    """
+    if self._file_lock is not None:
+      with self._file_lock.shared():
+        self._signature = atomic.signature(self._path)
+        if self._signature is not None:
+          dict.update(self, self._read(lazy_children))
+    elif self._path.exists() and self._partial:
+      keys = set(keys)
+      with contextlib.ExitStack() as stack:
+        fp = self._path
+        if self._compression is not None:
+          fp = stack.enter_context(
+              codec.open_file(self._path, "rb", self._compression))
+        if lazy_children:
+          items = self._driver.iterload(fp, keys=keys, lazy=True)
+        else:
+          items = self._driver.iterload(fp, keys=keys)
+        for item_path, v in items:
+          dict.__setitem__(self, item_path[0], v)
+    elif self._path.exists():
+      self._signature = atomic.signature(self._path)
+      # A C-level copy of the top level, nested objects are not copied
+      dict.update(self, self._read(lazy_children))
+    if journal:
+      self._open_journal()
+
+  def _read(self, lazy_children: bool, in_memory: bool = False) -> dict:
+    """Parse the file
 
     Args:
-      obj: AutoDict to dump
-      indent: A number will pretty-print the JSON, None will not
+      lazy_children: True will load nested objects as plain dicts
+      in_memory: True will read the file into memory before parsing rather
+        than let the driver map it, a file truncated by another process while
+        mapped would crash the process
 
     Returns:
-      JSON in a string
+      Parsed top-level object
     """
-    pass  # pragma: no cover
+    if instrument.HOOKS:
+      return instrument.load(self._driver,
+                             self._path,
+                             self._compression,
+                             lazy=lazy_children)
+    if self._compression is not None:
+      return codec.load(self._driver,
+                        self._path,
+                        self._compression,
+                        lazy=lazy_children)
+    if in_memory:
+      with open(self._path, "rb") as file:
+        return self._driver.loads(file.read(), lazy=lazy_children)
+    if lazy_children:
+      return self._driver.load(self._path, lazy=True)
+    return self._driver.load(self._path)
 
-  @classmethod
-  @abstractmethod
-  def load(cls, fp: Union[str, os.PathLike, io.IOBase]) -> AutoDict:
-    """Load a JSON file into an AutoDict
+  def _replace(self, data: dict) -> None:
+    """Replace the contents holding lock without notifying observers
+
+    The new contents are built before taking lock then swapped in at once, so
+    threads holding lock never see a mix of old and new values.
 
     Args:
-      fp: Path to file or object with a read() function
+      data: New top-level object
+    """
+    with self._lock:
+      if self._counter is not None:
+        for value in dict.values(self):
+          self._unlink(value)
+        # Encoded members are of the previous children
+        self._encoded = None
+      dict.clear(self)
+      dict.update(self, data)
+
+  def refresh(self) -> FrozenSet:
+    """Parse the file again if it changed since it was last read or written
+
+    Changes are detected by the file's inode, size, and modification time,
+    see atomic.signature, so checking an unchanged file costs a stat. The
+    parsed tree replaces the contents, see lock, discarding unsaved changes
+    and detaching references to previous children. Then each reload callback
+    is called with the changed keys. A missing file keeps the contents and a
+    lazy JSONAutoDict not yet parsed does nothing.
 
     Returns:
-      Loaded JSON object
+      Top-level keys whose value changed, added, or removed, empty if the file
+      did not change
+
+    Raises:
+      ValueError if only some keys were loaded or journaling
     """
-    pass  # pragma: no cover
+    if self._partial or self._journal is not None:
+      raise ValueError("Cannot refresh JSONAutoDict opened with keys or "
+                       "journaling")
+    if self._deferred is not None or (atomic.signature(self._path)
+                                      == self._signature):
+      return frozenset()
+    with contextlib.ExitStack() as stack:
+      if self._file_lock is not None:
+        stack.enter_context(self._file_lock.shared())
+      signature = atomic.signature(self._path)
+      if signature is None or signature == self._signature:
+        return frozenset()
+      data = self._read(self._lazy_children, in_memory=True)
+    with self._lock:
+      changed = frozenset(
+          k for k in itertools.chain(dict.keys(self), dict.keys(data))
+          if dict.get(self, k, _MISSING) != dict.get(data, k, _MISSING))
+      self._replace(data)
+      self._signature = signature
+      self._saved_changes = self._changes()
+      if self._dirty is not None:
+        self._dirty.paths.clear()
+    if len(changed) > 0:
+      for callback in self._reload_callbacks:
+        callback(changed)
+    return changed
 
-  @classmethod
-  @abstractmethod
-  def loads(cls, s: Union[str, bytes]) -> AutoDict:
-    """Load a JSON string into an AutoDict
+  def add_reload_callback(self, callback: Callable[[FrozenSet],
+                                                   None]) -> None:
+    """Add a callback for reloads by refresh
 
     Args:
-      s: JSON string to parse
+      callback: Function called with the changed top-level keys after each
+        reload, a reference to this JSONAutoDict delays its __del__
+    """
+    self._reload_callbacks = self._reload_callbacks + (callback,)
+
+  def remove_reload_callback(self, callback: Callable[[FrozenSet],
+                                                      None]) -> None:
+    """Remove a callback added with add_reload_callback
+
+    Args:
+      callback: Function to remove
+
+    Raises:
+      ValueError if callback was not added
+    """
+    callbacks = list(self._reload_callbacks)
+    callbacks.remove(callback)
+    self._reload_callbacks = tuple(callbacks)
+
+  def _reload(self) -> None:
+    """Refresh, called by the reload thread
+    """
+    try:
+      self.refresh()
+    except Exception:  # pylint: disable=broad-except
+      # A file written in place may be partial, retried next interval
+      pass
+
+  def _load_deferred(self) -> None:
+    """Load the file upon first access of a lazy JSONAutoDict
+
+    Other threads wait for the load to complete. Calls made while loading,
+    such as replaying the journal, use the loaded class' methods directly.
+    """
+    with self._lock:
+      args = self._deferred
+      if args is None:
+        return
+      self._deferred = None
+      # Replayed journal records are not unsaved changes
+      if self._counter is not None:
+        self.remove_observer(self._counter)
+      try:
+        self._load(*args)
+      except BaseException:
+        # Raised again by the next access
+        self._deferred = args
+        raise
+      finally:
+        if self._counter is not None:
+          self.add_observer(self._counter)
+      self.__class__ = self._loaded_class
+
+  @property
+  def loaded(self) -> bool:
+    """False if lazy and the file was not yet parsed"""
+    return self._deferred is None
+
+  def __reduce_ex__(self, protocol: int) -> tuple:
+    # Variants are created at runtime so they are rebuilt from the class they
+    # were created from, see _variant
+    cls = self._variant_base or type(self)
+    return (_new_variant, (cls, self._variant_mixin), self.__getstate__(),
+            None, iter(dict.items(self)))
+
+  def __getstate__(self) -> dict:
+    # Copies do not autosave, reload, journal, nor lock, locks and futures
+    # cannot be copied. Copies are not linked, observed, nor cached
+    state = dict(self.__dict__)
+    for k in ("_parent", "_key", "_observers", "_encoded", "_counter", "_lock",
+              "_save_lock", "_autosave_stop", "_reload_stop",
+              "_reload_callbacks", "_save_future", "_compactor", "_dirty"):
+      state.pop(k, None)
+    if state.get("_journal") is not None:
+      # A snapshot saved by a copy would be reverted by the journal's records
+      state["_journal"] = None
+      state["_save_on_exit"] = False
+    if state.get("_file_lock") is not None:
+      # A copy saving without merging would drop other processes' changes
+      state["_file_lock"] = None
+      state["_save_on_exit"] = False
+    return state
+
+  def __setstate__(self, state: dict) -> None:
+    self.__dict__.update(state)
+    self._counter = None
+    if isinstance(self, ObservedAutoDict):
+      self._counter = _ChangeCounter()
+      self.add_observer(self._counter)
+    self._saved_changes = 0
+    self._stats = dict(self._stats)
+    self._lock = threading.RLock()
+    self._save_lock = threading.Lock()
+    self._autosave_stop = None
+    self._reload_stop = None
+    self._reload_callbacks = ()
+    self._save_future = None
+    self._compactor = None
+    self._dirty = None
+
+  @property
+  def lock(self) -> threading.RLock:
+    """Lock held while autosave copies the tree and refresh replaces it
+
+    Hold it in other threads to make a group of changes atomic with respect to
+    autosave, or to read the tree while another thread may refresh it.
+    Encoding and writing run without it.
+    """
+    return self._lock
+
+  @property
+  def save_stats(self) -> Dict[str, float]:
+    """Statistics of completed saves
 
     Returns:
-      Loaded JSON object
+      {"saves": number of saves, "errors": number of failed autosaves,
+      "last_seconds"/"max_seconds"/"total_seconds": duration of encoding and
+      writing, "snapshot_seconds": duration of the last autosave copy,
+      "pending_changes": number of changes not yet saved, None if mutations
+      are not observed, see JSONAutoDict}
     """
-    pass  # pragma: no cover
+    stats = dict(self._stats)
+    stats["pending_changes"] = None
+    if self._counter is not None:
+      stats["pending_changes"] = self._counter.changes - self._saved_changes
+    return stats
 
+  def _changes(self) -> int:
+    """Get the number of mutations
 
-class DefaultJSONDriver(JSONDriver):
-  """Default JSONDriver that uses the built-in json library"""
+    Returns:
+      Number of mutations observed, 0 if mutations are not observed
+    """
+    if self._counter is None:
+      return 0
+    return self._counter.changes
 
-  TYPES_SERIALIZE = {
-      datetime.datetime: lambda t: t.isoformat(),
-      datetime.date: lambda t: t.isoformat(),
-      datetime.time: lambda t: t.isoformat(),
-      uuid.UUID: str
-  }
+  def save(self, indent: int = None) -> None:
+    """Write AutoDict to file
 
-  @classmethod
-  def default(cls, obj: object) -> Union[str, dict, list, int, float]:
-    """Serialize an object into a JSON basic type
+    In journal mode only the journal records since the last save are written.
+    In locking mode the changes of other processes are merged first.
 
     Args:
-      obj: Object to serialize
+      indent: Indentation parameter passed to JSONDriver.dump
 
-    Returns:
-      Serialized object in JSON basic types
+    Raises:
+      ValueError if only some keys were loaded
+    """
+    self._check_savable()
+    if self._journal is not None:
+      self._commit()
+      return
+    if self._file_lock is not None:
+      self._merge(indent)
+      return
+    self._write(self, indent, self._changes())
+
+  def flush(self, indent: int = None) -> None:
+    """Save if there are unsaved changes, always if mutations are not observed
+
+    The tree is copied holding lock then encoded and written without it so
+    other threads are only blocked for the copy.
+
+    Args:
+      indent: Indentation parameter passed to JSONDriver.dump
 
     Raises:
-      TypeError upon encoding error
+      ValueError if only some keys were loaded
     """
-    for t, op in cls.TYPES_SERIALIZE.items():
-      op: Callable
-      if isinstance(obj, t):
-        return op(obj)
+    self._check_savable()
+    if (self._counter is not None and
+        self._counter.changes == self._saved_changes):
+      return
+    if self._journal is not None:
+      self._commit()
+      return
+    if self._file_lock is not None:
+      self._merge(indent)
+      return
+    start = time.perf_counter()
+    with self._lock:
+      changes = self._changes()
+      snapshot = _copy_tree(self)
+    self._stats["snapshot_seconds"] = time.perf_counter() - start
+    self._write(snapshot, indent, changes)
 
-    raise TypeError(f"AutoDict encoder cannot encode type='{type(obj)}'")
+  def _autosave(self) -> None:
+    """Flush if enough changes accumulated, called by the autosave thread
+    """
+    pending = self._counter.changes - self._saved_changes
+    if pending < self._autosave_min_changes:
+      return
+    try:
+      self.flush()
+    except Exception:  # pylint: disable=broad-except
+      # Retried next interval, save and flush raise to the caller
+      self._stats["errors"] += 1
 
-  @classmethod
-  def dump(cls,
-           obj: AutoDict,
-           fp: Union[str, os.PathLike, io.IOBase],
-           indent: int = None) -> None:
-    if isinstance(fp, (str, os.PathLike)):
-      with open(fp, "w", encoding="utf-8") as file:
-        json.dump(obj, file, indent=indent, default=cls.default)
-    else:
-      if isinstance(fp, io.TextIOBase):
-        json.dump(obj, fp, indent=indent, default=cls.default)
-      else:
-        s = json.dumps(obj, indent=indent, default=cls.default)
-        fp.write(s.encode(encoding="utf-8"))
+  def _stop_threads(self) -> None:
+    """Stop the autosave and reload threads, they exit at their next check
+    """
+    if self._autosave_stop is not None:
+      self._autosave_stop.set()
+      self._autosave_stop = None
+    if self._reload_stop is not None:
+      self._reload_stop.set()
+      self._reload_stop = None
 
-  @classmethod
-  def dumps(cls, obj: AutoDict, indent: int = None) -> str:
-    return json.dumps(obj, indent=indent, default=cls.default)
+  def _check_savable(self) -> None:
+    """Check every key was loaded
 
-  @classmethod
-  def object_hook(cls, d: dict) -> object:
-    """Object hook called when decoder encounters an object aka dict
+    Raises:
+      ValueError if only some keys were loaded
+    """
+    if self._partial:
+      raise ValueError("Cannot save JSONAutoDict opened with keys, the other "
+                       "keys were not loaded")
+
+  def _write(self, obj: dict, indent: int, changes: int) -> None:
+    """Write an object to file
 
     Args:
-      d: JSON object literal
+      obj: This AutoDict or a snapshot of it
+      indent: Indentation parameter passed to JSONDriver.dump
+      changes: Number of changes included in obj
+    """
+    with self._save_lock:
+      start = time.perf_counter()
+      self._path.parent.mkdir(parents=True, exist_ok=True)
+      writer: instrument.MeteredWriter = None
+      with atomic.open_atomic(self._path, self._durability) as file:
+        if instrument.HOOKS:
+          file = writer = instrument.MeteredWriter(file)
+        encoding = time.perf_counter()
+        if self._encoder_cache and obj is self and indent is None:
+          # Snapshots from other threads are plain copies without a cache
+          data = self._driver.encode_cached(obj)
+          if self._compression is not None:
+            with codec.open_file(file,
+                                 "wb",
+                                 self._compression,
+                                 level=self._compression_level) as compressed:
+              compressed.write(data)
+          else:
+            file.write(data)
+        elif self._compression is not None:
+          codec.dump(self._driver,
+                     obj,
+                     file,
+                     self._compression,
+                     level=self._compression_level,
+                     indent=indent,
+                     background=self._background_compression)
+        else:
+          self._driver.dump(obj, file, indent=indent)
+        encoded = time.perf_counter()
+      self._signature = atomic.signature(self._path)
+      elapsed = time.perf_counter() - start
+      self._saved(changes, elapsed)
+    if writer is not None:
+      instrument.dumped(self._driver,
+                        obj,
+                        self._path,
+                        writer,
+                        elapsed=encoded - encoding,
+                        total=elapsed)
+
+  def _saved(self, changes: int, elapsed: float) -> None:
+    """Record a completed save
+
+    Args:
+      changes: Number of changes included in the save
+      elapsed: Duration of the save in seconds
+    """
+    # A concurrent save may have written newer changes
+    self._saved_changes = max(self._saved_changes, changes)
+    stats = self._stats
+    stats["saves"] += 1
+    stats["last_seconds"] = elapsed
+    stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+    stats["total_seconds"] += elapsed
+
+  def _merge(self, indent: int) -> None:
+    """Merge the changes of other processes then write the file, holding the
+    exclusive lock
+
+    The file is only read again if its signature changed since it was last
+    read or written by this AutoDict. The merged tree replaces the contents,
+    references to its previous children no longer update it.
+
+    Args:
+      indent: Indentation parameter passed to JSONDriver.dump
+    """
+    with self._file_lock.exclusive(), self._lock:
+      changes = self._counter.changes
+      signature = atomic.signature(self._path)
+      if signature is not None and signature != self._signature:
+        merged = self._read(False, in_memory=True)
+        _merge_paths(merged, self, self._dirty.paths)
+        self._replace(merged)
+      self._write(self, indent, changes)
+      self._dirty.paths.clear()
+
+  def _open_journal(self) -> None:
+    """Replay the journal over the loaded file and record later mutations
+
+    Rotated journals are left by a compaction that did not complete so their
+    records may already be in the file. Records only assign absolute paths so
+    they are applied leniently, see AppendLog.apply, and applying them again
+    converges to the same state. Those journals are then folded into the file.
+    """
+    driver = self._driver
+    if not issubclass(driver, JSONDriver):
+      driver = DefaultJSONDriver
+    self._journal = ndjson.AppendLog(
+        self._path.with_name(self._path.name + ".journal"),
+        driver=driver,
+        fsync=self._durability in ("fsync", "fsync_dir"))
+    rotated = self._rotated_journals()
+    for path in rotated:
+      ndjson.AppendLog(path, driver=driver).apply(self, strict=False)
+    self._journal.apply(self, strict=False)
+    if len(rotated) > 0:
+      self._write(self, None, 0)
+      # The active journal last so a crash before leaves the others to replay
+      for path in rotated + [self._journal.path]:
+        with contextlib.suppress(FileNotFoundError):
+          os.remove(path)
+    self.add_observer(self._journal.record)
+
+  def _rotated_journals(self) -> List[pathlib.Path]:
+    """Get the rotated journals, path + ".journal.N"
 
     Returns:
-      Appropriate Python object
+      Paths in the order they were rotated
+    """
+    journal = self._journal.path
+    if not journal.parent.is_dir():
+      return []
+    prefix = journal.name + "."
+    found = []
+    for path in journal.parent.iterdir():
+      n = path.name[len(prefix):]
+      if path.name.startswith(prefix) and n.isdigit():
+        found.append((int(n), path))
+    return [path for _, path in sorted(found)]
 
-    Raises:
-      TypeError upon decoding error
+  def _commit(self) -> None:
+    """Write buffered journal records, starting a compaction once the journal
+    passes its threshold
     """
-    return AutoDict(d)
+    start = time.perf_counter()
+    changes = self._counter.changes
+    self._journal.flush()
+    self._saved(changes, time.perf_counter() - start)
+    with self._lock:
+      if self._compactor is not None and self._compactor.is_alive():
+        return
+      if self._journal.size >= self._journal_threshold:
+        self._compact()
 
-  @classmethod
-  def load(cls, fp: Union[str, os.PathLike, io.IOBase]) -> AutoDict:
-    if isinstance(fp, (str, os.PathLike)):
-      with open(fp, "r", encoding="utf-8") as file:
-        return json.load(file, object_hook=cls.object_hook)
-    return json.load(fp, object_hook=cls.object_hook)
+  def _compact(self) -> None:
+    """Rotate the journal and fold it into a new snapshot in the background
 
-  @classmethod
-  def loads(cls, s: Union[str, bytes]) -> AutoDict:
-    return json.loads(s, object_hook=cls.object_hook)
+    The tree is copied holding lock right after rotating so the snapshot has
+    every record of the rotated journals. Mutations by threads not holding
+    lock may be in both the snapshot and the new journal, which replays
+    leniently.
+    """
+    rotated = self._rotated_journals()
+    n = int(rotated[-1].name.rsplit(".", 1)[1]) + 1 if rotated else 0
+    target = self._journal.path.with_name(f"{self._journal.path.name}.{n}")
+    start = time.perf_counter()
+    with self._lock:
+      changes = self._counter.changes
+      self._journal.rotate(target)
+      snapshot = _copy_tree(self)
+    self._stats["snapshot_seconds"] = time.perf_counter() - start
+    self._compactor = threading.Thread(target=self._fold,
+                                       args=(snapshot, changes,
+                                             rotated + [target]),
+                                       name="autodict-compact",
+                                       daemon=True)
+    self._compactor.start()
 
+  def _fold(self, snapshot: dict, changes: int,
+            journals: List[pathlib.Path]) -> None:
+    """Write a snapshot then remove the journals it includes
 
-class JSONAutoDict(AutoDict):
-  """AutoDict with json file compatibility/autosaving
-  """
+    Args:
+      snapshot: Copy of the tree taken after rotating the journals
+      changes: Number of changes included in snapshot
+      journals: Rotated journals included in snapshot
+    """
+    try:
+      self._write(snapshot, None, changes)
+      for path in journals:
+        with contextlib.suppress(FileNotFoundError):
+          os.remove(path)
+    except Exception:  # pylint: disable=broad-except
+      # The journals are kept and folded by the next compaction or open
+      self._stats["errors"] += 1
 
-  def __init__(self,
-               path: str,
-               *,
-               save_on_exit: bool = True,
-               driver: JSONDriver = None,
-               **kwargs) -> None:
-    """Initialize JSONAutoDict
+  def _close_journal(self) -> None:
+    """Wait for a running compaction and close the journal's file
+
+    Records not written by a save are discarded. The journal reopens its file
+    if the AutoDict is saved again.
+    """
+    if self._journal is None:
+      return
+    if self._compactor is not None:
+      self._compactor.join()
+      self._compactor = None
+    self._journal.close(flush=False)
+
+  @classmethod
+  async def open(cls,
+                 path: str,
+                 *,
+                 executor: concurrent.futures.Executor = None,
+                 **kwargs) -> JSONAutoDict:
+    """Open a JSONAutoDict without blocking the event loop
+
+    Reading and parsing the file run on the executor.
 
     Args:
       path: path to json file
-      save_on_exit: True will save file when object is closed, False will not
-      driver: JSONDriver to serialize/deserialize the object, None will use the
-        built-in json library via DefaultJSONDriver
+      executor: Executor to load on and to run asave on, None will use the
+        event loop's default executor
 
-      other arguments passed to AutoDict.__init__
+      other arguments passed to JSONAutoDict.__init__
+
+    Returns:
+      Loaded JSONAutoDict
     """
-    super().__init__(**kwargs)
-    self._save_on_exit = save_on_exit
-    if driver is None:
-      driver = DefaultJSONDriver
-    self._driver = driver
+    import asyncio  # pylint: disable=import-outside-toplevel
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(cls, path, executor=executor, **kwargs))
 
-    self._path = pathlib.Path(path)
-    if self._path.exists():
-      data = driver.load(self._path)
-      for k, v in data.items():
-        self[k] = v
+  @classmethod
+  def open_cached(cls,
+                  path: str,
+                  *,
+                  driver: Union[SerializationDriver, str] = None,
+                  compression: Optional[str] = "infer",
+                  tree_cache: cache.TreeCache = None) -> FrozenAutoDict:
+    """Open a read-only tree of a file shared through a process-wide cache
 
-  def save(self, indent: int = None) -> None:
-    """Write AutoDict to file
+    Opening an unchanged file again costs a stat and returns the same tree,
+    see TreeCache. Use FrozenAutoDict.thaw or JSONAutoDict for a mutable
+    tree.
+
+    Args:
+      path: path to json file, or a binary format by suffix
+      driver: SerializationDriver, see JSONAutoDict.__init__
+      compression: Compression of file, see JSONAutoDict.__init__
+      tree_cache: TreeCache to use, None will use cache.CACHE
+
+    Returns:
+      Read-only tree of the file
+
+    Raises:
+      FileNotFoundError if the file does not exist
+    """
+
+    def load() -> dict:
+      return cls(path,
+                 save_on_exit=False,
+                 driver=driver,
+                 compression=compression,
+                 lazy_children=True)
+
+    if tree_cache is None:
+      tree_cache = cache.CACHE
+    return tree_cache.open(path, load, (driver, compression))
+
+  async def asave(self, indent: int = None) -> None:
+    """Write AutoDict to file without blocking the event loop
+
+    Encoding and writing run on the executor. The top level is copied when the
+    save starts so other tasks may keep adding keys, changes to nested values
+    while encoding may or may not be written. Calls made while a save is
+    running are coalesced: once it completes a single save writes the latest
+    state for all of them.
+
+    In journal mode the records are written on the event loop's thread, they
+    are proportional to the changes since the last save. In locking mode the
+    whole save runs on the event loop's thread since merging replaces the
+    contents.
 
     Args:
       indent: Indentation parameter passed to JSONDriver.dump
+
+    Raises:
+      ValueError if only some keys were loaded
     """
-    self._path.parent.mkdir(parents=True, exist_ok=True)
-    self._driver.dump(self, self._path, indent=indent)
+    self._check_savable()
+    if self._journal is not None:
+      self._commit()
+      return
+    if self._file_lock is not None:
+      self._merge(indent)
+      return
+    import asyncio  # pylint: disable=import-outside-toplevel
+    self._save_requests += 1
+    request = self._save_requests
+    loop = asyncio.get_running_loop()
+    while self._saved_requests < request:
+      running = self._save_future
+      if running is not None:
+        # Saving an older state, errors are raised to the caller that started
+        # it and the state is saved again below
+        try:
+          await asyncio.shield(running)
+        except Exception:  # pylint: disable=broad-except
+          pass
+        continue
+      future = loop.run_in_executor(self._executor, self._write, dict(self),
+                                    indent, self._changes())
+      self._save_future = future
+      future.add_done_callback(
+          functools.partial(self._save_done, self._save_requests))
+      # Shielded so a cancelled caller does not cancel the shared save
+      await asyncio.shield(future)
+
+  def _save_done(self, requests: int, future: asyncio.Future) -> None:
+    """Record a completed save started by asave
+
+    Args:
+      requests: Number of asave calls covered by the save
+      future: Completed save
+    """
+    self._save_future = None
+    if not future.cancelled() and future.exception() is None:
+      self._saved_requests = max(self._saved_requests, requests)
 
   def __enter__(self) -> JSONAutoDict:
     """Enter ContextManager
@@ -202,13 +1061,139 @@ class JSONAutoDict(AutoDict):
   def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
     """Exit ContextManager
     """
+    self._stop_threads()
     if self._save_on_exit:
       self.save()
       self._save_on_exit = False
+    self._close_journal()
+
+  async def __aenter__(self) -> JSONAutoDict:
+    """Enter asynchronous ContextManager
+    Returns:
+      self
+    """
+    return self
+
+  async def __aexit__(self, exc_type, exc_value, exc_traceback) -> None:
+    """Exit asynchronous ContextManager, saving with asave
+    """
+    self._stop_threads()
+    if self._save_on_exit:
+      await self.asave()
+      self._save_on_exit = False
+    self._close_journal()
 
   def __del__(self) -> None:
     """Object destructor
     """
-    if self._save_on_exit:
+    # Not set if __init__ raised
+    if (getattr(self, "_autosave_stop", None) is not None or
+        getattr(self, "_reload_stop", None) is not None):
+      self._stop_threads()
+    if getattr(self, "_save_on_exit", False):
       self.save()
       self._save_on_exit = False
+    if getattr(self, "_journal", None) is not None:
+      self._close_journal()
+
+
+class _DeferredLoad:
+  """Mixin of a lazy JSONAutoDict whose file was not yet parsed
+
+  Accessing the contents loads the file, restores the JSONAutoDict's class,
+  and calls its method so a loaded JSONAutoDict has no overhead. Closing
+  before any access does not load nor save. A with statement keeps the
+  __exit__ of the class it entered so it may be called once loaded.
+  """
+
+  def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+    if self._deferred is not None:
+      self._save_on_exit = False
+    self._loaded_class.__exit__(self, exc_type, exc_value, exc_traceback)
+
+  async def __aexit__(self, exc_type, exc_value, exc_traceback) -> None:
+    if self._deferred is not None:
+      self._save_on_exit = False
+    await self._loaded_class.__aexit__(self, exc_type, exc_value,
+                                       exc_traceback)
+
+  def __del__(self) -> None:
+    if self._deferred is not None:
+      self._save_on_exit = False
+    self._loaded_class.__del__(self)
+
+
+def _load_then(name: str) -> Callable:
+  """Create a method that loads a deferred JSONAutoDict then calls name
+
+  Args:
+    name: Name of method of the loaded class
+
+  Returns:
+    Method for _DeferredLoad
+  """
+
+  def method(self, *args, **kwargs):
+    self._load_deferred()  # pylint: disable=protected-access
+    return getattr(self._loaded_class, name)(self, *args, **kwargs)  # pylint: disable=protected-access
+
+  method.__name__ = name
+  return method
+
+
+for _name in ("__getitem__", "__setitem__", "__delitem__", "__contains__",
+              "__iter__", "__reversed__", "__len__", "__repr__", "__eq__",
+              "__ne__", "__or__", "__ror__", "__ior__", "__reduce_ex__",
+              "__getstate__", "get", "pop", "popitem", "setdefault", "update",
+              "clear", "copy", "keys", "values", "items", "contains", "save",
+              "flush", "asave"):
+  # Operators added after Python 3.7 are only wrapped where they exist
+  if hasattr(JSONAutoDict, _name):
+    setattr(_DeferredLoad, _name, _load_then(_name))
+
+
+@functools.lru_cache(maxsize=None)
+def _deferred_class(cls: type) -> type:
+  """Create the class of a lazy JSONAutoDict before it is loaded
+
+  Args:
+    cls: JSONAutoDict or a subclass
+
+  Returns:
+    Subclass of cls and _DeferredLoad
+  """
+  return type(cls.__name__, (_DeferredLoad, cls), {})
+
+
+@functools.lru_cache(maxsize=None)
+def _variant(cls: type, mixin: Optional[type]) -> type:
+  """Create the class of a JSONAutoDict using the features of mixin
+
+  Args:
+    cls: JSONAutoDict or a subclass
+    mixin: ObservedAutoDict to observe mutations, LazyAutoDict to upgrade
+      plain dict children upon access, None for neither
+
+  Returns:
+    Subclass of cls and mixin, cls if mixin is None
+  """
+  if mixin is None:
+    return cls
+  return type(cls.__name__, (cls, mixin), {
+      "_variant_base": cls,
+      "_variant_mixin": mixin
+  })
+
+
+def _new_variant(cls: type, mixin: Optional[type]) -> JSONAutoDict:
+  """Create an uninitialized JSONAutoDict for pickle and copy, see _variant
+
+  Args:
+    cls: JSONAutoDict or a subclass
+    mixin: ObservedAutoDict, LazyAutoDict, or None, see _variant
+
+  Returns:
+    Instance of _variant(cls, mixin) to restore with __setstate__
+  """
+  variant = _variant(cls, mixin)
+  return variant.__new__(variant)
@@ -0,0 +1,126 @@
+"""Process-wide cache of parsed files shared as read-only trees
+"""
+
+from __future__ import annotations
+
+import collections
+import os
+import threading
+from typing import Callable, Dict, Hashable, Tuple, Union
+
+from autodict.implementation import FrozenAutoDict
+from autodict.json_drivers import atomic
+
+
+class TreeCache:
+  """LRU cache of parsed files keyed by path and validated by signature
+
+  Each open stats the file, see atomic.signature, and parses it again only if
+  it changed. Trees are FrozenAutoDicts so every caller shares the same
+  objects. The least recently opened files are evicted once their total size
+  on disk passes max_bytes. max_bytes bounds bytes on disk, not memory: a
+  parsed tree is typically several times larger than its file. A file larger
+  than max_bytes is parsed but not kept.
+  """
+
+  def __init__(self, max_bytes: int = 1 << 26) -> None:
+    """Initialize TreeCache
+
+    Args:
+      max_bytes: Total size on disk of the cached files, the memory of their
+        trees is several times larger
+    """
+    self._max_bytes = max_bytes
+    self._lock = threading.Lock()
+    # (path, options): (signature, tree), least recently opened first
+    self._entries: Dict[tuple, Tuple[tuple, FrozenAutoDict]] = (
+        collections.OrderedDict())
+    self._bytes = 0
+    self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+  @property
+  def max_bytes(self) -> int:
+    """Total size on disk of the cached files before evicting"""
+    return self._max_bytes
+
+  @property
+  def stats(self) -> Dict[str, int]:
+    """Statistics of the cache
+
+    Returns:
+      {"hits": number of opens of an unchanged cached file, "misses": number
+      of parses, "evictions": number of files evicted, "files": number of
+      cached files, "bytes": total size on disk of the cached files}
+    """
+    with self._lock:
+      stats = dict(self._stats)
+      stats["files"] = len(self._entries)
+      stats["bytes"] = self._bytes
+    return stats
+
+  def open(self, path: Union[str, os.PathLike], load: Callable[[], dict],
+           options: Hashable = None) -> FrozenAutoDict:
+    """Get the tree of a file, parsing it if it is not cached or changed
+
+    Two threads missing the same file at once both parse it.
+
+    Args:
+      path: Path to file, cached by its resolved path so symlinks and other
+        aliases of a file share one tree
+      load: Function that parses the file
+      options: Options of load that change the tree, part of the key
+
+    Returns:
+      Read-only tree
+
+    Raises:
+      FileNotFoundError if the file does not exist
+    """
+    key = (os.path.realpath(path), options)
+    signature = atomic.signature(path)
+    if signature is None:
+      with self._lock:
+        self._evict(key)
+      raise FileNotFoundError(f"No such file: '{path}'")
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None and entry[0] == signature:
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[1]
+
+    tree = FrozenAutoDict.freeze(load())
+    with self._lock:
+      self._stats["misses"] += 1
+      self._evict(key)
+      # Signature is (inode, size, modification time)
+      size = signature[1]
+      if size > self._max_bytes:
+        return tree
+      self._entries[key] = (signature, tree)
+      self._bytes += size
+      while self._bytes > self._max_bytes:
+        self._evict(next(iter(self._entries)))
+        self._stats["evictions"] += 1
+    return tree
+
+  def _evict(self, key: tuple) -> None:
+    """Remove a file from the cache, called holding lock
+
+    Args:
+      key: Key of file, ignored if not cached
+    """
+    entry = self._entries.pop(key, None)
+    if entry is not None:
+      self._bytes -= entry[0][1]
+
+  def clear(self) -> None:
+    """Remove every file from the cache
+    """
+    with self._lock:
+      self._entries.clear()
+      self._bytes = 0
+
+
+# Cache of JSONAutoDict.open_cached
+CACHE = TreeCache()
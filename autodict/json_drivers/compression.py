@@ -0,0 +1,233 @@
+"""Transparent compression of JSON files with the standard library codecs
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import pathlib
+import queue
+import threading
+from typing import Callable, Dict, Optional, Tuple, Type, Union
+
+from autodict.implementation import AutoDict
+from autodict.json_drivers import serialization
+
+# Name: (function(path, mode, **kwargs) to open a binary file, name of its
+# compression level argument)
+COMPRESSIONS: Dict[str, Tuple[Callable[..., io.IOBase], str]] = {
+    "gzip": (gzip.open, "compresslevel"),
+    "bz2": (bz2.open, "compresslevel"),
+    "xz": (lzma.open, "preset"),
+}
+
+# Level used when none is given, gzip's own default of 9 is much slower than 6
+# for a slightly smaller file
+DEFAULT_LEVELS: Dict[str, int] = {"gzip": 6, "bz2": 9, "xz": 6}
+
+# File suffix: name of compression
+SUFFIXES: Dict[str, str] = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+
+def resolve(path: Union[str, os.PathLike],
+            compression: Optional[str] = "infer") -> Optional[str]:
+  """Get the compression of a file
+
+  Args:
+    path: Path to file
+    compression: Name of compression, see COMPRESSIONS. "infer" will use the
+      file suffix, see SUFFIXES. None will not compress
+
+  Returns:
+    Name of compression or None if uncompressed
+
+  Raises:
+    ValueError if compression is unknown
+  """
+  if compression == "infer":
+    return SUFFIXES.get(pathlib.Path(path).suffix.lower())
+  if compression is None or compression in COMPRESSIONS:
+    return compression
+  raise ValueError(f"Unknown compression '{compression}', expected one of "
+                   f"{list(COMPRESSIONS)}")
+
+
+def open_file(path: Union[str, os.PathLike, io.IOBase],
+              mode: str,
+              compression: str,
+              level: int = None) -> io.IOBase:
+  """Open a compressed file in binary mode
+
+  Args:
+    path: Path to file or binary file object, which is not closed
+    mode: "rb" or "wb"
+    compression: Name of compression, see COMPRESSIONS
+    level: Compression level when writing, None will use DEFAULT_LEVELS
+
+  Returns:
+    File object that decompresses upon read or compresses upon write
+  """
+  func, level_arg = COMPRESSIONS[compression]
+  if "r" in mode:
+    return func(path, mode)
+  if level is None:
+    level = DEFAULT_LEVELS[compression]
+  return func(path, mode, **{level_arg: level})
+
+
+def read_all(fp: io.IOBase, chunk_size: int = 1 << 20) -> bytearray:
+  """Read a file until the end into a single buffer
+
+  A decompressing file's read() collects every chunk then joins them, holding
+  the uncompressed document twice. Extending a bytearray grows it in place.
+
+  Args:
+    fp: Object with a read() function returning bytes
+    chunk_size: Number of bytes per read
+
+  Returns:
+    Contents of file
+  """
+  buf = bytearray()
+  while True:
+    chunk = fp.read(chunk_size)
+    if len(chunk) == 0:
+      return buf
+    buf += chunk
+
+
+class BackgroundWriter:
+  """Writer that passes writes to another file object on a separate thread
+
+  The standard library codecs release the GIL while compressing so, given a
+  spare core, encoding continues while the previous chunks are compressed. At
+  most max_pending chunks are queued to bound memory.
+  """
+
+  def __init__(self, fp: io.IOBase, max_pending: int = 4) -> None:
+    """Initialize BackgroundWriter
+
+    Args:
+      fp: Object with a write() function, not closed by this writer
+      max_pending: Number of chunks queued before write() blocks
+    """
+    self._fp = fp
+    self._queue = queue.Queue(maxsize=max_pending)
+    self._error: BaseException = None
+    self._thread = threading.Thread(target=self._run,
+                                    name="autodict-compress",
+                                    daemon=True)
+    self._thread.start()
+
+  def _run(self) -> None:
+    while True:
+      chunk = self._queue.get()
+      if chunk is None:
+        return
+      if self._error is not None:
+        # Drain the queue so write() does not block
+        continue
+      try:
+        self._fp.write(chunk)
+      except BaseException as e:  # pylint: disable=broad-except
+        self._error = e
+
+  def write(self, b: bytes) -> int:
+    """Queue bytes to be written
+
+    Args:
+      b: Bytes to write, a copy is queued if mutable
+
+    Returns:
+      Number of bytes queued
+
+    Raises:
+      Exception raised by a previous write on the thread
+    """
+    if self._error is not None:
+      raise self._error
+    if not isinstance(b, bytes):
+      b = bytes(b)
+    self._queue.put(b)
+    return len(b)
+
+  def close(self) -> None:
+    """Wait for the queued writes to complete
+
+    Raises:
+      Exception raised by a write on the thread
+    """
+    if self._thread.is_alive():
+      self._queue.put(None)
+      self._thread.join()
+    if self._error is not None:
+      raise self._error
+
+  def __enter__(self) -> BackgroundWriter:
+    """Enter ContextManager
+    Returns:
+      self
+    """
+    return self
+
+  def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+    """Exit ContextManager
+    """
+    self.close()
+
+
+def load(driver: Type[serialization.SerializationDriver],
+         path: Union[str, os.PathLike],
+         compression: str,
+         lazy: bool = False) -> AutoDict:
+  """Load a compressed file into an AutoDict
+
+  Args:
+    driver: SerializationDriver to deserialize the document
+    path: Path to file
+    compression: Name of compression, see COMPRESSIONS
+    lazy: Passed to SerializationDriver.loads
+
+  Returns:
+    Loaded object
+  """
+  with open_file(path, "rb", compression) as file:
+    s = read_all(file)
+  if lazy:
+    return driver.loads(s, lazy=True)
+  return driver.loads(s)
+
+
+def dump(driver: Type[serialization.SerializationDriver],
+         obj: AutoDict,
+         path: Union[str, os.PathLike, io.IOBase],
+         compression: str,
+         *,
+         level: int = None,
+         indent: int = None,
+         background: bool = False) -> None:
+  """Dump an AutoDict to a compressed file
+
+  The document is encoded in chunks, see JSONDriver.iterencode, and each chunk
+  is compressed as it is written. Formats that cannot be encoded in pieces
+  are compressed as one chunk.
+
+  Args:
+    driver: SerializationDriver to serialize the document
+    obj: AutoDict to dump
+    path: Path to file or binary file object, which is not closed
+    compression: Name of compression, see COMPRESSIONS
+    level: Compression level, None will use DEFAULT_LEVELS
+    indent: A number will pretty-print the JSON, None will not
+    background: True will compress on a separate thread while encoding
+  """
+  with open_file(path, "wb", compression, level=level) as file:
+    if background:
+      # Larger chunks hand over the GIL less often
+      with BackgroundWriter(file) as writer:
+        driver.iterdump(obj, writer, indent=indent, chunk_size=1 << 20)
+    else:
+      driver.dump(obj, file, indent=indent)
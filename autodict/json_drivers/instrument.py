@@ -0,0 +1,324 @@
+"""Instrumentation of loads and dumps for latency and size metrics
+
+Hooks are called with an event dict after each measured load or dump. Without
+hooks the only cost is checking HOOKS is empty.
+
+Load events:
+  {"operation": "load", "driver": name of SerializationDriver, "path": path
+  to file, "bytes_read": size of the serialized document, "read_seconds":
+  duration of reading and decompressing, "parse_seconds": duration of
+  parsing into plain objects, "construct_seconds": duration of upgrading
+  dicts to AutoDicts, "seconds": total duration, "objects": number of dicts
+  and lists}
+
+Dump events:
+  {"operation": "dump", "driver": name of SerializationDriver, "path": path
+  to file, "bytes_written": size written to the file, "encode_seconds":
+  duration of encoding and compressing, "write_seconds": duration of writing,
+  syncing, and replacing the file, "seconds": total duration, "objects":
+  number of dicts and lists}
+"""
+
+from __future__ import annotations
+
+import collections
+import io
+import os
+import threading
+import time
+from typing import Callable, Deque, Dict, Iterable, Type, Union
+
+from autodict.implementation import AutoDict
+from autodict.json_drivers import compression as codec
+from autodict.json_drivers import serialization
+
+# Functions called with each event, see add_hook
+HOOKS: tuple = ()
+
+_HOOKS_LOCK = threading.Lock()
+
+
+def add_hook(hook: Callable[[dict], None]) -> None:
+  """Call a function with each event
+
+  Hooks run on the thread that loaded or dumped, exceptions propagate to it.
+
+  Args:
+    hook: Function called with the event dict
+  """
+  global HOOKS
+  with _HOOKS_LOCK:
+    HOOKS = HOOKS + (hook,)
+
+
+def remove_hook(hook: Callable[[dict], None]) -> None:
+  """Stop calling a function added by add_hook
+
+  Args:
+    hook: Function to remove, equal bound methods match, ignored if not
+      added
+  """
+  global HOOKS
+  with _HOOKS_LOCK:
+    HOOKS = tuple(h for h in HOOKS if h != hook)
+
+
+def emit(event: dict) -> None:
+  """Call every hook with an event
+
+  Args:
+    event: Load or dump event, see module
+  """
+  for hook in HOOKS:
+    hook(event)
+
+
+def count_objects(obj: object) -> int:
+  """Count the dicts and lists of a tree
+
+  Args:
+    obj: Root of tree
+
+  Returns:
+    Number of dicts and lists including obj
+  """
+  n = 0
+  stack = [obj]
+  while stack:
+    o = stack.pop()
+    if isinstance(o, dict):
+      n += 1
+      stack.extend(o.values())
+    elif isinstance(o, list):
+      n += 1
+      stack.extend(o)
+  return n
+
+
+def load(driver: Type[serialization.SerializationDriver],
+         path: Union[str, os.PathLike],
+         compression: str = None,
+         lazy: bool = False) -> AutoDict:
+  """Load a file like SerializationDriver.load, emitting a load event
+
+  The file is read into memory, parsed without upgrading dicts, then upgraded
+  so each phase is timed on its own. Drivers that parse a mapped file or
+  upgrade while parsing are slightly slower this way.
+
+  Args:
+    driver: SerializationDriver to deserialize the document
+    path: Path to file
+    compression: Name of compression, see compression.COMPRESSIONS, None for
+      an uncompressed file
+    lazy: Passed to SerializationDriver.load, construct_seconds is 0 since
+      nested dicts are upgraded upon access
+
+  Returns:
+    Loaded object
+  """
+  start = time.perf_counter()
+  if compression is None:
+    with open(path, "rb") as file:
+      s = file.read()
+  else:
+    with codec.open_file(path, "rb", compression) as file:
+      s = codec.read_all(file)
+  read = time.perf_counter()
+  obj = driver.loads(s, lazy=True)
+  parsed = time.perf_counter()
+  if not lazy and isinstance(obj, dict):
+    with serialization.gc_paused():
+      obj = driver.upgrade_dicts(dict(obj))
+  end = time.perf_counter()
+  emit({
+      "operation": "load",
+      "driver": driver.__name__,
+      "path": str(path),
+      "bytes_read": len(s),
+      "read_seconds": read - start,
+      "parse_seconds": parsed - read,
+      "construct_seconds": end - parsed,
+      "seconds": end - start,
+      "objects": count_objects(obj),
+  })
+  return obj
+
+
+def dump(driver: Type[serialization.SerializationDriver],
+         obj: AutoDict,
+         path: Union[str, os.PathLike],
+         indent: int = None) -> None:
+  """Dump to a file like SerializationDriver.dump, emitting a dump event
+
+  Args:
+    driver: SerializationDriver to serialize the document
+    obj: AutoDict to dump
+    path: Path to file
+    indent: Indentation parameter passed to the driver
+  """
+  start = time.perf_counter()
+  with open(path, "wb") as file:
+    writer = MeteredWriter(file)
+    encoding = time.perf_counter()
+    driver.dump(obj, writer, indent=indent)
+    encoded = time.perf_counter()
+  dumped(driver,
+         obj,
+         path,
+         writer,
+         elapsed=encoded - encoding,
+         total=time.perf_counter() - start)
+
+
+def dumped(driver: Type[serialization.SerializationDriver], obj: object,
+           path: Union[str, os.PathLike], writer: MeteredWriter, *,
+           elapsed: float, total: float) -> None:
+  """Emit the dump event of a file written through a MeteredWriter
+
+  Args:
+    driver: SerializationDriver that serialized the document
+    obj: Dumped object
+    path: Path to file
+    writer: MeteredWriter the document was written to
+    elapsed: Duration of encoding and writing to writer
+    total: Duration including opening and closing the file
+  """
+  encode = elapsed - writer.seconds
+  emit({
+      "operation": "dump",
+      "driver": driver.__name__,
+      "path": str(path),
+      "bytes_written": writer.bytes,
+      "encode_seconds": encode,
+      "write_seconds": total - encode,
+      "seconds": total,
+      "objects": count_objects(obj),
+  })
+
+
+class MeteredWriter(io.BufferedIOBase):
+  """Binary file wrapper counting the bytes written and time spent writing
+
+  Closing the wrapper does not close the file.
+  """
+
+  def __init__(self, file: io.IOBase) -> None:
+    """Initialize MeteredWriter
+
+    Args:
+      file: Binary file to write to
+    """
+    super().__init__()
+    self._file = file
+    self.bytes = 0
+    self.seconds = 0.0
+
+  def writable(self) -> bool:
+    return True
+
+  def write(self, b: Union[bytes, bytearray, memoryview]) -> int:
+    start = time.perf_counter()
+    self._file.write(b)
+    self.seconds += time.perf_counter() - start
+    n = len(b) if not isinstance(b, memoryview) else b.nbytes
+    self.bytes += n
+    return n
+
+  def flush(self) -> None:
+    # Also called when the wrapper is collected, maybe after the file closed
+    if not self._file.closed:
+      self._file.flush()
+
+
+class StatsAggregator:
+  """Hook collecting events into percentile summaries
+
+  Events are grouped by operation and driver. Counts and totals cover every
+  event, percentiles the latest max_samples events of each group. Use as a
+  context manager to add and remove it as a hook.
+  """
+
+  def __init__(self,
+               max_samples: int = 10000,
+               percentiles: Iterable[float] = (50, 90, 99)) -> None:
+    """Initialize StatsAggregator
+
+    Args:
+      max_samples: Number of latest events per group kept for percentiles
+      percentiles: Percentiles of each summary, from 0 to 100
+    """
+    self._max_samples = max_samples
+    self._percentiles = tuple(percentiles)
+    self._lock = threading.Lock()
+    # "operation/driver": latest events
+    self._samples: Dict[str, Deque[dict]] = {}
+    # "operation/driver": {"count": number of events, metric: total}
+    self._totals: Dict[str, Dict[str, float]] = {}
+
+  def __call__(self, event: dict) -> None:
+    """Record an event
+
+    Args:
+      event: Load or dump event, see module
+    """
+    key = f"{event['operation']}/{event['driver']}"
+    with self._lock:
+      samples = self._samples.get(key)
+      if samples is None:
+        samples = self._samples[key] = collections.deque(
+            maxlen=self._max_samples)
+        self._totals[key] = collections.defaultdict(float)
+      samples.append(event)
+      totals = self._totals[key]
+      totals["count"] += 1
+      for k, v in event.items():
+        if isinstance(v, (int, float)):
+          totals[k] += v
+
+  def summary(self) -> Dict[str, Dict[str, object]]:
+    """Summarize the recorded events
+
+    Returns:
+      {"operation/driver": {"count": number of events, metric: {"p50": 50th
+      percentile, ..., "max": maximum, "mean": mean, "total": sum}}} for each
+      numeric field of the events, percentiles by nearest rank
+    """
+    out = {}
+    with self._lock:
+      groups = [(k, list(v), dict(self._totals[k]))
+                for k, v in self._samples.items()]
+    for key, samples, totals in groups:
+      count = int(totals.pop("count"))
+      group = {"count": count}
+      for metric, total in totals.items():
+        values = sorted(e[metric] for e in samples)
+        stats = {}
+        for p in self._percentiles:
+          i = max(0, -(-len(values) * p // 100) - 1)
+          stats[f"p{p:g}"] = values[int(i)]
+        stats["max"] = values[-1]
+        stats["mean"] = total / count
+        stats["total"] = total
+        group[metric] = stats
+      out[key] = group
+    return out
+
+  def reset(self) -> None:
+    """Remove every recorded event
+    """
+    with self._lock:
+      self._samples.clear()
+      self._totals.clear()
+
+  def __enter__(self) -> StatsAggregator:
+    """Enter ContextManager, adding this as a hook
+    Returns:
+      self
+    """
+    add_hook(self)
+    return self
+
+  def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+    """Exit ContextManager, removing this hook
+    """
+    remove_hook(self)
@@ -0,0 +1,96 @@
+"""Advisory file locks shared between processes
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import pathlib
+import threading
+from typing import Iterator, Union
+
+try:
+  import fcntl
+except ImportError:
+  # Windows
+  fcntl = None
+
+
+class FileLock:
+  """Shared/exclusive lock on a lock file with fcntl.flock
+
+  The lock is on a separate file since saving atomically replaces the data
+  file, a lock on the replaced file would not exclude processes that opened
+  the new one. Locks are advisory: only processes using FileLock on the same
+  path are excluded. Threads of a process take turns.
+  """
+
+  def __init__(self, path: Union[str, os.PathLike]) -> None:
+    """Initialize FileLock
+
+    The lock file is created upon first lock and never removed since another
+    process may hold it.
+
+    Args:
+      path: Path to lock file
+
+    Raises:
+      ImportError if fcntl is not available
+    """
+    if fcntl is None:
+      raise ImportError("Cannot lock files without fcntl")
+    self._path = pathlib.Path(path)
+    self._fd = None
+    self._lock = threading.Lock()
+
+  @property
+  def path(self) -> pathlib.Path:
+    """Path to lock file"""
+    return self._path
+
+  @contextlib.contextmanager
+  def _locked(self, operation: int) -> Iterator[None]:
+    """Context holding the lock
+
+    Args:
+      operation: fcntl.LOCK_SH or fcntl.LOCK_EX
+    """
+    with self._lock:
+      if self._fd is None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o666)
+      fcntl.flock(self._fd, operation)
+      try:
+        yield
+      finally:
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+  def shared(self) -> contextlib.AbstractContextManager:
+    """Context holding a lock shared with other readers
+
+    Returns:
+      Context blocking until no process holds the exclusive lock
+    """
+    return self._locked(fcntl.LOCK_SH)
+
+  def exclusive(self) -> contextlib.AbstractContextManager:
+    """Context holding the exclusive lock
+
+    Returns:
+      Context blocking until no process holds any lock
+    """
+    return self._locked(fcntl.LOCK_EX)
+
+  def close(self) -> None:
+    """Close the lock file, it is reopened by the next lock
+    """
+    with self._lock:
+      if self._fd is not None:
+        os.close(self._fd)
+        self._fd = None
+
+  def __del__(self) -> None:
+    """Object destructor
+    """
+    if self.__dict__.get("_fd") is not None:
+      os.close(self._fd)
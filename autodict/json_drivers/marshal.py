@@ -0,0 +1,88 @@
+"""SerializationDriver that uses the built-in marshal library
+
+The format is specific to the Python version, only use it for caches that are
+rebuilt when Python changes. Only load files from a trusted source, malformed
+data can crash the interpreter.
+"""
+
+from __future__ import annotations
+
+import io
+import marshal
+import os
+from typing import Union
+
+from autodict.implementation import AutoDict
+from autodict.json_drivers import serialization
+
+# Types marshal serializes as is
+_BASIC_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+class MarshalDriver(serialization.SerializationDriver):
+  """SerializationDriver that uses the built-in marshal library
+
+  Stores the JSON type set: dicts, lists, str, int, float, bool, and None.
+  Other types are serialized by the TypeRegistry like the JSON drivers, tuples
+  become lists. Keys are stored as is so int keys remain ints.
+  """
+
+  @classmethod
+  def to_basic(cls, obj: object) -> Union[dict, list, str, int, float, None]:
+    """Traverse an object and convert it to types marshal can serialize
+
+    marshal only accepts exact dicts so AutoDicts are copied.
+
+    Args:
+      obj: Object to convert
+
+    Returns:
+      Copy of obj with only JSON basic types
+    """
+    basic_types = _BASIC_TYPES
+    default = cls.default
+
+    def convert(v: object) -> object:
+      if type(v) in basic_types:
+        return v
+      if isinstance(v, dict):
+        return {k: convert(x) for k, x in v.items()}
+      if isinstance(v, (list, tuple)):
+        return [convert(x) for x in v]
+      return convert(default(v))
+
+    return convert(obj)
+
+  @classmethod
+  def dump(cls,
+           obj: AutoDict,
+           fp: Union[str, os.PathLike, io.IOBase],
+           indent: int = None) -> None:
+    if isinstance(fp, (str, os.PathLike)):
+      with open(fp, "wb") as file:
+        file.write(cls.dumps(obj, indent=indent))
+    else:
+      fp.write(cls.dumps(obj, indent=indent))
+
+  @classmethod
+  def dumps(cls, obj: AutoDict, indent: int = None) -> bytes:
+    del indent
+    return marshal.dumps(cls.to_basic(obj), marshal.version)
+
+  @classmethod
+  def load(cls,
+           fp: Union[str, os.PathLike, io.IOBase],
+           lazy: bool = False) -> AutoDict:
+    if isinstance(fp, (str, os.PathLike)):
+      with serialization.mapped(fp) as view:
+        return cls.loads(view, lazy=lazy)
+    return cls.loads(fp.read(), lazy=lazy)
+
+  @classmethod
+  def loads(cls,
+            s: Union[bytes, bytearray, memoryview],
+            lazy: bool = False) -> AutoDict:
+    with serialization.gc_paused():
+      if lazy:
+        return cls.upgrade_root(marshal.loads(s))
+      return cls.upgrade_dicts(marshal.loads(s))
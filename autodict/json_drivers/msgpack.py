@@ -0,0 +1,63 @@
+"""SerializationDriver that uses the msgpack library
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from typing import Union
+
+try:
+  import msgpack
+except ImportError as e:
+  raise ImportError("Cannot use MsgpackDriver without msgpack installed") from e
+
+from autodict.implementation import AutoDict
+from autodict.json_drivers import serialization
+
+
+class MsgpackDriver(serialization.SerializationDriver):
+  """SerializationDriver that uses the msgpack library
+
+  A compact binary equivalent of JSON readable from other languages. Types
+  outside the JSON type set are serialized by the TypeRegistry, tuples become
+  lists, and bytes are stored natively.
+  """
+
+  NATIVE_TYPES = (bytes, bytearray)
+
+  @classmethod
+  def dump(cls,
+           obj: AutoDict,
+           fp: Union[str, os.PathLike, io.IOBase],
+           indent: int = None) -> None:
+    if isinstance(fp, (str, os.PathLike)):
+      with open(fp, "wb") as file:
+        file.write(cls.dumps(obj, indent=indent))
+    else:
+      fp.write(cls.dumps(obj, indent=indent))
+
+  @classmethod
+  def dumps(cls, obj: AutoDict, indent: int = None) -> bytes:
+    del indent
+    return msgpack.packb(obj, default=cls.default, use_bin_type=True)
+
+  @classmethod
+  def load(cls,
+           fp: Union[str, os.PathLike, io.IOBase],
+           lazy: bool = False) -> AutoDict:
+    if isinstance(fp, (str, os.PathLike)):
+      with serialization.mapped(fp) as view:
+        return cls.loads(view, lazy=lazy)
+    return cls.loads(fp.read(), lazy=lazy)
+
+  @classmethod
+  def loads(cls,
+            s: Union[bytes, bytearray, memoryview],
+            lazy: bool = False) -> AutoDict:
+    with serialization.gc_paused():
+      # Keys may be ints like in an AutoDict
+      obj = msgpack.unpackb(s, raw=False, strict_map_key=False)
+      if lazy:
+        return cls.upgrade_root(obj)
+      return cls.upgrade_dicts(obj)
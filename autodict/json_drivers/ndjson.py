@@ -0,0 +1,340 @@
+"""Append-only log of AutoDict updates as newline delimited JSON
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import threading
+from typing import Iterator, List, Tuple, Type, Union
+
+from autodict.implementation import AutoDict, ObservedAutoDict
+from autodict.json_drivers import atomic, auto, serialization
+
+# Flags to open the log for appending, O_BINARY only exists on Windows
+_APPEND_FLAGS = (os.O_WRONLY | os.O_APPEND | os.O_CREAT |
+                 getattr(os, "O_BINARY", 0))
+
+
+class AppendLog:
+  """Buffered append-only log of AutoDict updates
+
+  Each update is one line: [path, value] to set the value at path or [path] to
+  delete it, path being a list of keys from the root. Lines are buffered and
+  written with O_APPEND so each flush is a single write to the end of the file
+  regardless of its size.
+  """
+
+  def __init__(self,
+               path: Union[str, os.PathLike],
+               driver: Type[serialization.JSONDriver] = None,
+               buffer_size: int = 1 << 16,
+               fsync: bool = False) -> None:
+    """Initialize AppendLog
+
+    The file is not opened until the first flush.
+
+    Args:
+      path: Path to log file
+      driver: JSONDriver to serialize/deserialize each line, None will use
+        DefaultJSONDriver
+      buffer_size: Number of buffered bytes that triggers a flush, 0 will flush
+        every line
+      fsync: True will sync the file to disk after each flush
+    """
+    self._path = pathlib.Path(path)
+    self._driver = serialization.DefaultJSONDriver if driver is None else driver
+    self._buffer_size = buffer_size
+    self._fsync = fsync
+    self._buf: List[bytes] = []
+    self._buffered = 0
+    self._fd = None
+    # Flushes from different threads write whole buffers in order
+    self._flush_lock = threading.Lock()
+
+  @property
+  def path(self) -> pathlib.Path:
+    """Path to log file"""
+    return self._path
+
+  @property
+  def size(self) -> int:
+    """Number of bytes in the file and buffered"""
+    try:
+      size = self._path.stat().st_size
+    except FileNotFoundError:
+      size = 0
+    return size + self._buffered
+
+  def _encode(self, record: list) -> bytes:
+    """Encode a record as one line
+
+    Args:
+      record: [path, value] or [path]
+
+    Returns:
+      JSON line including the newline
+    """
+    s = self._driver.dumps(record)
+    if isinstance(s, str):
+      s = s.encode(encoding="utf-8")
+    if b"\n" in s:
+      # Some drivers always indent, newlines in strings are escaped so these
+      # are only whitespace
+      s = s.replace(b"\n", b"")
+    return s + b"\n"
+
+  def _write(self, line: bytes) -> None:
+    self._buf.append(line)
+    self._buffered += len(line)
+    if self._buffered >= self._buffer_size:
+      self.flush()
+
+  def record(self, op: str, path: tuple, value: object) -> None:
+    """Append an update, see ObservedAutoDict.add_observer
+
+    Args:
+      op: "set", "delete", or "clear"
+      path: Keys from the root to the updated key or cleared node
+      value: New value for "set" else None
+    """
+    if op == "set":
+      self._write(self._encode([list(path), value]))
+    elif op == "delete":
+      self._write(self._encode([list(path)]))
+    else:
+      self._write(self._encode([list(path), {}]))
+
+  def flush(self) -> None:
+    """Write buffered lines to the end of the file
+
+    Lines recorded by other threads while writing are kept for the next flush.
+    """
+    with self._flush_lock:
+      if self._buffered == 0:
+        return
+      if self._fd is None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self._path, _APPEND_FLAGS, 0o666)
+      # Swap before joining so lines appended meanwhile are in either buffer
+      buf = self._buf
+      self._buf = []
+      self._buffered = 0
+      data = memoryview(b"".join(buf))
+      while len(data) > 0:
+        data = data[os.write(self._fd, data):]
+      if self._fsync:
+        os.fsync(self._fd)
+
+  def close(self, flush: bool = True) -> None:
+    """Close the file
+
+    Args:
+      flush: True will write buffered lines first, False will discard them
+    """
+    if flush:
+      self.flush()
+    else:
+      self._buf = []
+      self._buffered = 0
+    with self._flush_lock:
+      if self._fd is not None:
+        os.close(self._fd)
+        self._fd = None
+
+  def rotate(self, target: Union[str, os.PathLike]) -> None:
+    """Flush and move the file to target, later lines start a new file
+
+    Args:
+      target: Path to move the file to, replaced if it exists
+    """
+    self.flush()
+    with self._flush_lock:
+      if self._fd is not None:
+        os.close(self._fd)
+        self._fd = None
+      if self._path.exists():
+        os.replace(self._path, target)
+
+  def records(self) -> Iterator[Tuple[tuple, object, bool]]:
+    """Iterate over the records in the file
+
+    A partial last line, such as from a crash while appending, is truncated
+    from the file.
+
+    Yields:
+      (path, value, delete) for each line, value is None when deleting
+
+    Raises:
+      ValueError if a complete line is not a valid record
+    """
+    if not self._path.exists():
+      return
+    with open(self._path, "rb") as file:
+      valid = 0
+      for i, line in enumerate(file):
+        if not line.endswith(b"\n"):
+          break
+        try:
+          record = self._driver.loads(line)
+        except ValueError as e:
+          raise ValueError(f"Invalid record on line {i + 1} of "
+                           f"{self._path}") from e
+        if not isinstance(record, list) or len(record) not in (1, 2):
+          raise ValueError(f"Invalid record on line {i + 1} of "
+                           f"{self._path}")
+        valid += len(line)
+        if len(record) == 1:
+          yield tuple(record[0]), None, True
+        else:
+          yield tuple(record[0]), record[1], False
+    if valid != self._path.stat().st_size:
+      os.truncate(self._path, valid)
+
+  def replay(self) -> AutoDict:
+    """Rebuild the AutoDict by applying every record in the file
+
+    Returns:
+      Result of every update in order
+
+    Raises:
+      ValueError if a record is invalid or its path cannot be applied
+    """
+    root = AutoDict()
+    self.apply(root)
+    return root
+
+  def apply(self, root: AutoDict, strict: bool = True) -> None:
+    """Apply every record in the file to an AutoDict
+
+    Args:
+      root: AutoDict to update in place
+      strict: True will raise if a record's path goes through a value that is
+        not a dict, False will replace that value with an AutoDict. Records
+        only assign absolute paths so applying them again to their result,
+        such as a snapshot taken after them, converges to the same result
+
+    Raises:
+      ValueError if a record is invalid or its path cannot be applied
+    """
+    with serialization.gc_paused():
+      for path, value, delete in self.records():
+        if len(path) == 0:
+          root.clear()
+          if not delete:
+            root.update(value)
+          continue
+        node = root
+        try:
+          for k in path[:-1]:
+            child = node[k]
+            if not strict and not isinstance(child, dict):
+              node[k] = AutoDict()
+              child = node[k]
+            node = child
+          if delete:
+            node.pop(path[-1], None)
+          else:
+            node[path[-1]] = value
+        except (TypeError, KeyError, IndexError) as e:
+          raise ValueError(f"Cannot apply record to {path}") from e
+
+  def rewrite(self, obj: dict) -> None:
+    """Replace the file with a snapshot of obj, one line per top-level key
+
+    Buffered lines are discarded since the snapshot includes them.
+
+    Args:
+      obj: Current state of the AutoDict
+    """
+    if self._fd is not None:
+      os.close(self._fd)
+      self._fd = None
+    self._buf = []
+    self._buffered = 0
+
+    self._path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic.open_atomic(self._path) as file:
+      buf = []
+      buffered = 0
+      for k, v in obj.items():
+        line = self._encode([[k], v])
+        buf.append(line)
+        buffered += len(line)
+        if buffered >= self._buffer_size:
+          file.write(b"".join(buf))
+          buf = []
+          buffered = 0
+      file.write(b"".join(buf))
+
+
+class NDJSONAutoDict(ObservedAutoDict):
+  """AutoDict persisted as an append-only log of updates
+
+  Every mutation appends one line to the file instead of rewriting the whole
+  document so saving is proportional to the size of the update. Opening
+  replays the log, compact() rewrites it as a snapshot to bound its growth.
+  Mutations inside lists are not recorded, see ObservedAutoDict.
+  """
+
+  def __init__(self,
+               path: Union[str, os.PathLike],
+               *,
+               driver: Union[Type[serialization.JSONDriver], str] = None,
+               buffer_size: int = 1 << 16) -> None:
+    """Initialize NDJSONAutoDict
+
+    Args:
+      path: Path to log file
+      driver: JSONDriver to serialize/deserialize each line, None will use
+        DefaultJSONDriver, "auto" will use the fastest installed driver, see
+        best_driver
+      buffer_size: Number of buffered bytes that triggers a write, 0 will
+        write every update immediately
+    """
+    super().__init__()
+    if driver == "auto":
+      driver = auto.best_driver()
+    self._log = AppendLog(path, driver=driver, buffer_size=buffer_size)
+    dict.update(self, self._log.replay())
+    self.add_observer(self._log.record)
+
+  def __getstate__(self) -> dict:
+    # Copies are detached from the file
+    state = super().__getstate__()
+    state.pop("_log", None)
+    return state
+
+  def flush(self) -> None:
+    """Write buffered updates to the file
+    """
+    self._log.flush()
+
+  def compact(self) -> None:
+    """Rewrite the file as a snapshot of the current state
+    """
+    self._log.rewrite(self)
+
+  def close(self) -> None:
+    """Write buffered updates and close the file
+    """
+    self._log.close()
+
+  def __enter__(self) -> NDJSONAutoDict:
+    """Enter ContextManager
+    Returns:
+      self
+    """
+    return self
+
+  def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+    """Exit ContextManager
+    """
+    self.close()
+
+  def __del__(self) -> None:
+    """Object destructor
+    """
+    log = self.__dict__.get("_log")
+    if log is not None:
+      log.close()
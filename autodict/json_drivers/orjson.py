@@ -3,9 +3,12 @@
 
 from __future__ import annotations
 
+import datetime
+import enum
 import io
 import os
-from typing import Callable, Union
+from typing import Iterator, Optional, Tuple, Type, Union
+import uuid
 
 try:
   import orjson
@@ -13,96 +16,162 @@ except ImportError as e:
   raise ImportError("Cannot use OrjsonDriver without orjson installed") from e
 
 from autodict.implementation import AutoDict
-from autodict.json_drivers import base
+from autodict.json_drivers import serialization
 
 
-class OrjsonDriver(base.JSONDriver):
+class OrjsonDriver(serialization.JSONDriver):
   """JSONDriver that uses the orjson library
   """
 
-  TYPES_SERIALIZE = {}
+  _DATETIME_TYPES = (datetime.datetime, datetime.date, datetime.time)
+
+  # numpy types are also native with OPT_SERIALIZE_NUMPY but are not listed to
+  # avoid importing numpy
+  NATIVE_TYPES = _DATETIME_TYPES + (uuid.UUID, enum.Enum)
+
+  # orjson only indents with 2 spaces
+  CAPABILITIES = frozenset({"autodict", "lazy", "encode_cached"})
+
+  _INPUT_TYPES = (str, bytes, bytearray, memoryview)
+
+  _KEY_SEPARATOR = b":"
+
+  # orjson.OPT_* flags for every dump, OPT_INDENT_2 is added when indenting
+  OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+  # True retries a failed encode with OPT_NON_STR_KEYS
+  RETRY_NON_STR_KEYS = True
 
   @classmethod
-  def default(cls, obj: object) -> Union[str, dict, list, int, float]:
-    """Serialize an object into a JSON basic type
+  def with_options(cls,
+                   *,
+                   serialize_numpy: bool = True,
+                   non_str_keys: Optional[bool] = None,
+                   sort_keys: bool = False,
+                   passthrough_datetime: bool = False,
+                   append_newline: bool = False) -> Type[OrjsonDriver]:
+    """Create an OrjsonDriver with different orjson options
 
     Args:
-      obj: Object to serialize
+      serialize_numpy: True will natively serialize numpy arrays and scalars,
+        False will pass them to default()
+      non_str_keys: True will always allow non-str dict keys, False will
+        raise TypeError on them, None will only allow them after a failed
+        encode since they slow down encoding
+      sort_keys: True will sort dict keys
+      passthrough_datetime: True will pass datetime, date, and time to
+        default() so they use the shared TypeRegistry, False will use orjson's
+        RFC 3339 format
+      append_newline: True will append a newline to the output
 
     Returns:
-      Serialized object in JSON basic types
+      Subclass of OrjsonDriver with OPTIONS, RETRY_NON_STR_KEYS, NATIVE_TYPES,
+      and CAPABILITIES set
+    """
+    options = 0
+    natives: Tuple[type, ...] = (uuid.UUID, enum.Enum)
+    if serialize_numpy:
+      options |= orjson.OPT_SERIALIZE_NUMPY
+    if non_str_keys:
+      options |= orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+      options |= orjson.OPT_SORT_KEYS
+    if passthrough_datetime:
+      options |= orjson.OPT_PASSTHROUGH_DATETIME
+    else:
+      natives += cls._DATETIME_TYPES
+    capabilities = cls.CAPABILITIES
+    if append_newline:
+      options |= orjson.OPT_APPEND_NEWLINE
+    if sort_keys or append_newline:
+      capabilities = capabilities - {"encode_cached"}
+    attrs = {
+        "OPTIONS": options,
+        "RETRY_NON_STR_KEYS": non_str_keys is None,
+        "NATIVE_TYPES": natives,
+        "CAPABILITIES": capabilities
+    }
+    return type(cls.__name__, (cls,), attrs)
 
-    Raises:
-      TypeError upon encoding error
+  @classmethod
+  def encode(cls, obj: AutoDict, indent: int = None) -> bytes:
+    """Encode AutoDict to JSON bytes with the driver's options
+
+    Args:
+      obj: AutoDict to encode
+      indent: A number will pretty-print the JSON, None will not
+
+    Returns:
+      JSON in bytes
     """
-    for t, op in cls.TYPES_SERIALIZE.items():
-      op: Callable
-      if isinstance(obj, t):
-        return op(obj)
+    option = cls.OPTIONS
+    if indent is not None:
+      option |= orjson.OPT_INDENT_2
+    try:
+      return orjson.dumps(obj, default=cls.default, option=option)
+    except orjson.JSONEncodeError:
+      if not cls.RETRY_NON_STR_KEYS or option & orjson.OPT_NON_STR_KEYS:
+        raise
+      # Possibly from non-str keys, retry with the slower option
+      return orjson.dumps(obj,
+                          default=cls.default,
+                          option=option | orjson.OPT_NON_STR_KEYS)
 
-    raise TypeError(f"AutoDict encoder cannot encode type='{type(obj)}'")
+  @classmethod
+  def encode_cached(cls, obj: AutoDict) -> bytes:
+    if cls.OPTIONS & (orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE):
+      # Spliced members would not be sorted and each would get a newline
+      return cls.encode(obj)
+    return super().encode_cached(obj)
+
+  @classmethod
+  def iterencode(cls,
+                 obj: AutoDict,
+                 indent: int = None,
+                 chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    if cls.OPTIONS & orjson.OPT_APPEND_NEWLINE:
+      # Only the whole document gets a newline, not each member
+      driver = type(cls.__name__, (cls,),
+                    {"OPTIONS": cls.OPTIONS & ~orjson.OPT_APPEND_NEWLINE})
+      yield from driver.iterencode(obj, indent=indent, chunk_size=chunk_size)
+      yield b"\n"
+      return
+    if cls.OPTIONS & orjson.OPT_SORT_KEYS and isinstance(obj, dict):
+      try:
+        obj = dict(sorted(obj.items()))
+      except TypeError:
+        # Keys of mixed types are sorted by orjson as str
+        yield cls.encode(obj, indent=indent)
+        return
+    yield from super().iterencode(obj, indent=indent, chunk_size=chunk_size)
 
   @classmethod
   def dump(cls,
            obj: AutoDict,
            fp: Union[str, os.PathLike, io.IOBase],
            indent: int = None) -> None:
-    if indent is None:
-      s = orjson.dumps(obj, default=cls.default)
-    else:
-      s = orjson.dumps(obj, default=cls.default, option=orjson.OPT_INDENT_2)
-    if isinstance(fp, (str, os.PathLike)):
-      with open(fp, "wb") as file:
-        file.write(s)
-    else:
-      if isinstance(fp, io.TextIOBase):
-        fp.write(s.decode(encoding="utf-8"))
-      else:
-        fp.write(s)
+    cls.iterdump(obj, fp, indent=indent)
 
   @classmethod
   def dumps(cls, obj: AutoDict, indent: int = None) -> str:
-    if indent is None:
-      return orjson.dumps(obj, default=cls.default)
-    return orjson.dumps(obj, default=cls.default, option=orjson.OPT_INDENT_2)
-
-  @classmethod
-  def upgrade_dicts(
-      cls, obj: Union[dict, list, str, int, float]
-  ) -> Union[dict, list, str, int, float, AutoDict]:
-    """Traverse an object and upgrade the dicts to AutoDicts
-
-    Args:
-      obj: JSON basic type object
-
-    Returns:
-      Appropriate Python object
-
-    Raises:
-      TypeError upon decoding error
-    """
-    if isinstance(obj, dict):
-      for k, v in obj.items():
-        obj[k] = cls.upgrade_dicts(v)
-      return AutoDict(obj)
-    if isinstance(obj, list):
-      for i, v in enumerate(obj):
-        obj[i] = cls.upgrade_dicts(v)
-      return obj
-    return obj
+    return cls.encode(obj, indent=indent)
 
   @classmethod
-  def load(cls, fp: Union[str, os.PathLike, io.IOBase]) -> AutoDict:
-    return base.DefaultJSONDriver.load(fp)
-    # orjson is faster but doesn't make upgrading to AutoDicts fast
-    # if isinstance(fp, (str, os.PathLike)):
-    #   with open(fp, "rb") as file:
-    #     return cls.upgrade_dicts(orjson.loads(file.read()))
-    # fp: Union[io.BytesIO, io.StringIO]
-    # return cls.upgrade_dicts(orjson.loads(fp.read()))
+  def load(cls,
+           fp: Union[str, os.PathLike, io.IOBase],
+           lazy: bool = False) -> AutoDict:
+    if isinstance(fp, (str, os.PathLike)):
+      # Parse the mapped file without copying it into a bytes object
+      with serialization.mapped(fp) as view:
+        return cls.loads(view, lazy=lazy)
+    return cls.loads(fp.read(), lazy=lazy)
 
   @classmethod
-  def loads(cls, s: Union[str, bytes]) -> AutoDict:
-    return base.DefaultJSONDriver.loads(s)
-    # orjson is faster but doesn't make upgrading to AutoDicts fast
-    # return cls.upgrade_dicts(orjson.loads(s))
+  def loads(cls,
+            s: Union[str, bytes, bytearray, memoryview],
+            lazy: bool = False) -> AutoDict:
+    s = cls._coerce_input(s)
+    with serialization.gc_paused():
+      if lazy:
+        return cls.upgrade_root(orjson.loads(s))
+      return cls.upgrade_dicts(orjson.loads(s))
@@ -0,0 +1,133 @@
+"""SerializationDriver that uses the built-in pickle library
+
+Only load files from a trusted source, unpickling can execute arbitrary code.
+"""
+
+from __future__ import annotations
+
+import copyreg
+import io
+import os
+import pickle
+from typing import Union
+
+from autodict.implementation import AutoDict, LazyAutoDict, ObservedAutoDict
+from autodict.json_drivers import serialization
+
+
+def _reduce_observed(obj: ObservedAutoDict) -> tuple:
+  """Reduce an ObservedAutoDict to an AutoDict of its items
+
+  Links to parents and observers are not restored by pickle, the AutoDict is
+  upgraded and linked upon access instead, see ObservedAutoDict.
+
+  Args:
+    obj: ObservedAutoDict to pickle
+
+  Returns:
+    Arguments of pickle's reduce protocol
+  """
+  return (AutoDict, (), None, None, iter(dict.items(obj)))
+
+
+_DISPATCH_TABLE = copyreg.dispatch_table.copy()
+_DISPATCH_TABLE[ObservedAutoDict] = _reduce_observed
+
+
+class PickleDriver(serialization.SerializationDriver):
+  """SerializationDriver that uses the built-in pickle library
+
+  The tree is stored with its classes so loading skips upgrading dicts: nested
+  AutoDicts load as AutoDicts and plain dicts stay plain. ObservedAutoDicts are
+  stored as AutoDicts. Meant for process local caches, the files are specific
+  to Python and only safe to load from a trusted source.
+  """
+
+  # Protocol 5 adds out-of-band buffers, the newest protocol if older
+  PROTOCOL = min(5, pickle.HIGHEST_PROTOCOL)
+
+  # pickle serializes any picklable type itself
+  NATIVE_TYPES = (object,)
+
+  @classmethod
+  def _root(cls, obj: AutoDict) -> AutoDict:
+    """Get the object to pickle in place of obj
+
+    Args:
+      obj: AutoDict to dump
+
+    Returns:
+      obj or a LazyAutoDict copy of its items if it is a dict subclass with
+      state, such as the path of a JSONAutoDict which would otherwise be
+      restored upon loading
+    """
+    t = type(obj)
+    if t not in (dict, AutoDict, LazyAutoDict) and isinstance(obj, dict):
+      return LazyAutoDict(obj)
+    return obj
+
+  @classmethod
+  def _pickle(cls, obj: AutoDict, file: io.IOBase) -> None:
+    """Pickle obj into a file
+
+    Args:
+      obj: AutoDict to dump
+      file: Binary file to write to
+    """
+    pickler = pickle.Pickler(file, protocol=cls.PROTOCOL)
+    pickler.dispatch_table = _DISPATCH_TABLE
+    pickler.dump(cls._root(obj))
+
+  @classmethod
+  def dump(cls,
+           obj: AutoDict,
+           fp: Union[str, os.PathLike, io.IOBase],
+           indent: int = None) -> None:
+    del indent
+    if isinstance(fp, (str, os.PathLike)):
+      with open(fp, "wb") as file:
+        cls._pickle(obj, file)
+    else:
+      cls._pickle(obj, fp)
+
+  @classmethod
+  def dumps(cls, obj: AutoDict, indent: int = None) -> bytes:
+    del indent
+    buf = io.BytesIO()
+    cls._pickle(obj, buf)
+    return buf.getvalue()
+
+  @classmethod
+  def load(cls,
+           fp: Union[str, os.PathLike, io.IOBase],
+           lazy: bool = False) -> AutoDict:
+    if isinstance(fp, (str, os.PathLike)):
+      with serialization.mapped(fp) as view:
+        return cls.loads(view, lazy=lazy)
+    with serialization.gc_paused():
+      return cls._upgrade(pickle.load(fp), lazy)
+
+  @classmethod
+  def loads(cls,
+            s: Union[bytes, bytearray, memoryview],
+            lazy: bool = False) -> AutoDict:
+    with serialization.gc_paused():
+      return cls._upgrade(pickle.loads(s), lazy)
+
+  @classmethod
+  def _upgrade(cls, obj: object, lazy: bool) -> object:
+    """Upgrade an unpickled root dict
+
+    Args:
+      obj: Unpickled object
+      lazy: True will make the root a LazyAutoDict, False an AutoDict
+
+    Returns:
+      obj, or a copy of its items if it is not the requested class
+    """
+    if lazy:
+      if isinstance(obj, dict) and not isinstance(obj, LazyAutoDict):
+        return LazyAutoDict(obj)
+    elif type(obj) is dict:  # pylint: disable=unidiomatic-typecheck
+      return AutoDict(obj)
+    return obj
@@ -6,7 +6,7 @@ from __future__ import annotations
 import datetime
 import io
 import os
-from typing import Callable, Union
+from typing import Union
 import uuid
 
 try:
@@ -16,39 +16,14 @@ except ImportError as e:
       "Cannot use RapidJSONDriver without rapidjson installed") from e
 
 from autodict.implementation import AutoDict
-from autodict.json_drivers import base
+from autodict.json_drivers import serialization
 
 
-class RapidJSONDriver(base.JSONDriver):
+class RapidJSONDriver(serialization.JSONDriver):
   """JSONDriver that uses the rapidjson library
   """
 
-  TYPES_SERIALIZE = {
-      datetime.datetime: lambda t: t.isoformat(),
-      datetime.date: lambda t: t.isoformat(),
-      datetime.time: lambda t: t.isoformat(),
-      uuid.UUID: str
-  }
-
-  @classmethod
-  def default(cls, obj: object) -> Union[str, dict, list, int, float]:
-    """Serialize an object into a JSON basic type
-
-    Args:
-      obj: Object to serialize
-
-    Returns:
-      Serialized object in JSON basic types
-
-    Raises:
-      TypeError upon encoding error
-    """
-    for t, op in cls.TYPES_SERIALIZE.items():
-      op: Callable
-      if isinstance(obj, t):
-        return op(obj)
-
-    raise TypeError(f"AutoDict encoder cannot encode type='{type(obj)}'")
+  NATIVE_TYPES = (datetime.datetime, datetime.date, datetime.time, uuid.UUID)
 
   @classmethod
   def dump(cls,
@@ -74,12 +49,7 @@ class RapidJSONDriver(base.JSONDriver):
                        datetime_mode=rapidjson.DM_ISO8601,
                        uuid_mode=rapidjson.UM_CANONICAL)
       else:
-        s = rapidjson.dumps(obj,
-                            indent=indent,
-                            default=cls.default,
-                            datetime_mode=rapidjson.DM_ISO8601,
-                            uuid_mode=rapidjson.UM_CANONICAL)
-        fp.write(s.encode(encoding="utf-8"))
+        cls.iterdump(obj, fp, indent=indent)
 
   @classmethod
   def dumps(cls, obj: AutoDict, indent: int = None) -> str:
@@ -107,12 +77,19 @@ class RapidJSONDriver(base.JSONDriver):
     return AutoDict(d)
 
   @classmethod
-  def load(cls, fp: Union[str, os.PathLike, io.IOBase]) -> AutoDict:
+  def load(cls,
+           fp: Union[str, os.PathLike, io.IOBase],
+           lazy: bool = False) -> AutoDict:
     if isinstance(fp, (str, os.PathLike)):
-      with open(fp, "r", encoding="utf-8") as file:
-        return rapidjson.load(file, object_hook=cls.object_hook)
-    return rapidjson.load(fp, object_hook=cls.object_hook)
+      with open(fp, "rb") as file:
+        return cls.loads(file.read(), lazy=lazy)
+    return cls.loads(fp.read(), lazy=lazy)
 
   @classmethod
-  def loads(cls, s: Union[str, bytes]) -> AutoDict:
-    return rapidjson.loads(s, object_hook=cls.object_hook)
+  def loads(cls,
+            s: Union[str, bytes, bytearray, memoryview],
+            lazy: bool = False) -> AutoDict:
+    s = cls._coerce_input(s)
+    hook = None if lazy else cls.object_hook
+    with serialization.gc_paused():
+      return cls.upgrade_root(rapidjson.loads(s, object_hook=hook))
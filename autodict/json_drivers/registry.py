@@ -0,0 +1,176 @@
+"""Registry of serializers for types JSON does not support natively
+"""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import enum
+import sys
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import uuid
+
+Encoder = Callable[[object], Union[str, dict, list, int, float]]
+
+
+class TypeRegistry:
+  """Mapping of types to encode functions
+
+  Lookups are cached by exact type so repeated encoding of the same type is a
+  single dict access. Subclasses of a registered type are resolved through
+  their method resolution order the first time they are seen. Loading does
+  not restore registered types since JSON does not record them, encoded
+  values load as JSON basic types.
+  """
+
+  def __init__(self) -> None:
+    """Initialize TypeRegistry
+    """
+    self._encoders: Dict[type, Encoder] = {}
+    self._cache: Dict[type, Optional[Encoder]] = {}
+    self._deferred: List[Tuple[str, Callable[[TypeRegistry], None]]] = []
+
+  def register(self, cls: type, encode: Encoder) -> None:
+    """Register a type
+
+    Args:
+      cls: Type to register, subclasses are also handled unless registered
+        separately
+      encode: Function to convert an object into JSON basic types
+    """
+    self._encoders[cls] = encode
+    self._cache.clear()
+
+  def register_deferred(self, module: str,
+                        callback: Callable[[TypeRegistry], None]) -> None:
+    """Register types from a module once that module is imported
+
+    Avoids importing optional libraries just to register their types. Objects
+    of those types cannot exist until the module is imported so the check is
+    done upon a lookup miss.
+
+    Args:
+      module: Name of module
+      callback: Function to call with this registry to register the types
+    """
+    self._deferred.append((module, callback))
+    self._cache.clear()
+
+  def _load_deferred(self) -> bool:
+    """Run deferred registrations whose module is imported
+
+    Returns:
+      True if any registrations were run
+    """
+    loaded = [d for d in self._deferred if d[0] in sys.modules]
+    for d in loaded:
+      self._deferred.remove(d)
+      d[1](self)
+    return len(loaded) != 0
+
+  def unregister(self, cls: type) -> None:
+    """Unregister a type
+
+    Args:
+      cls: Type to unregister
+
+    Raises:
+      KeyError if cls is not registered
+    """
+    del self._encoders[cls]
+    self._cache.clear()
+
+  def types(self) -> Tuple[type, ...]:
+    """Get the registered types
+
+    Returns:
+      Tuple of every registered type
+    """
+    return tuple(self._encoders)
+
+  def _resolve(self, t: type) -> Optional[type]:
+    """Find the closest registered type in the MRO of t
+
+    Args:
+      t: Type to resolve
+
+    Returns:
+      Registered type or None if no match
+    """
+    for base in t.__mro__:
+      if base in self._encoders:
+        return base
+    return None
+
+  def lookup(self, t: type) -> Optional[Encoder]:
+    """Get the encoder for a type
+
+    Args:
+      t: Type to lookup
+
+    Returns:
+      Encoder function or None if type is not registered
+    """
+    try:
+      return self._cache[t]
+    except KeyError:
+      pass
+    base = self._resolve(t)
+    if base is None and self._deferred and self._load_deferred():
+      base = self._resolve(t)
+    op = None if base is None else self._encoders[base]
+    self._cache[t] = op
+    return op
+
+  def encode(self, obj: object) -> Union[str, dict, list, int, float]:
+    """Serialize an object into a JSON basic type
+
+    Args:
+      obj: Object to serialize
+
+    Returns:
+      Serialized object in JSON basic types
+
+    Raises:
+      TypeError upon encoding error
+    """
+    t = type(obj)
+    try:
+      op = self._cache[t]
+    except KeyError:
+      op = self.lookup(t)
+    if op is None:
+      raise TypeError(f"AutoDict encoder cannot encode type='{t}'")
+    return op(obj)
+
+
+def _register_numpy(r: TypeRegistry) -> None:
+  """Register numpy types
+
+  Args:
+    r: TypeRegistry to register into
+  """
+  numpy = sys.modules["numpy"]
+  r.register(numpy.ndarray, lambda a: a.tolist())
+  r.register(numpy.generic, lambda a: a.item())
+
+
+REGISTRY = TypeRegistry()
+REGISTRY.register(datetime.datetime, lambda t: t.isoformat())
+REGISTRY.register(datetime.date, lambda t: t.isoformat())
+REGISTRY.register(datetime.time, lambda t: t.isoformat())
+REGISTRY.register(uuid.UUID, str)
+REGISTRY.register(decimal.Decimal, str)
+REGISTRY.register(enum.Enum, lambda e: e.value)
+REGISTRY.register_deferred("numpy", _register_numpy)
+
+
+def register_type(cls: type, encode: Encoder) -> None:
+  """Register a type with the shared TypeRegistry used by every JSONDriver
+
+  Args:
+    cls: Type to register, subclasses are also handled unless registered
+      separately
+    encode: Function to convert an object into JSON basic types
+  """
+  REGISTRY.register(cls, encode)
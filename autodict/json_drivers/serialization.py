@@ -0,0 +1,675 @@
+"""SerializationDriver interface and the default JSONDriver that uses the
+built-in json library
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import contextlib
+import datetime
+import gc
+import io
+import itertools
+import json
+import mmap
+import os
+from typing import (Container, Dict, FrozenSet, Iterable, Iterator, Optional,
+                    Tuple, Union)
+import uuid
+
+from autodict.implementation import AutoDict, LazyAutoDict, ObservedAutoDict
+from autodict.json_drivers import registry, stream
+
+
+@contextlib.contextmanager
+def gc_paused() -> Iterator[None]:
+  """Context to disable the cyclic garbage collector
+
+  Parsing allocates millions of containers which repeatedly triggers full
+  collections that find nothing to free. Restores previous state upon exit.
+  """
+  enabled = gc.isenabled()
+  gc.disable()
+  try:
+    yield
+  finally:
+    if enabled:
+      gc.enable()
+
+
+@contextlib.contextmanager
+def mapped(path: Union[str, os.PathLike]) -> Iterator[memoryview]:
+  """Context to memory map a file read-only
+
+  The pages are read on demand by the OS and shared with its file cache rather
+  than copied into the process. Any views of the buffer must be released
+  before exiting.
+
+  Args:
+    path: Path to file
+
+  Yields:
+    Contents of file, empty files yield an empty memoryview
+  """
+  with open(path, "rb") as file:
+    if os.fstat(file.fileno()).st_size == 0:
+      # Cannot map an empty file
+      yield memoryview(b"")
+      return
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as m:
+      with memoryview(m) as view:
+        yield view
+
+
+class SerializationDriver(ABC):
+  """Drivers to dump an AutoDict to a file format and load from it
+  """
+
+  # Serializers for types not handled by the backend
+  REGISTRY: registry.TypeRegistry = registry.REGISTRY
+
+  # Types the backend serializes itself, default() is never called for these
+  NATIVE_TYPES: Tuple[type, ...] = ()
+
+  # Features used by best_driver: "indent" for any indentation width,
+  # "autodict" for loading into AutoDicts, "lazy" for load(lazy=True),
+  # "encode_cached" for reusing unchanged subtrees in encode_cached
+  CAPABILITIES: FrozenSet[str] = frozenset({"autodict", "lazy"})
+
+  def __init_subclass__(cls, **kwargs) -> None:
+    super().__init_subclass__(**kwargs)
+    # Subclasses listing their serializers in a TYPES_SERIALIZE dict, from
+    # before REGISTRY, get a TypeRegistry of only those types
+    serializers = cls.__dict__.get("TYPES_SERIALIZE")
+    if serializers is not None and "REGISTRY" not in cls.__dict__:
+      types = registry.TypeRegistry()
+      for t, op in serializers.items():
+        types.register(t, op)
+      cls.REGISTRY = types
+
+  @classmethod
+  def default(cls, obj: object) -> Union[str, dict, list, int, float]:
+    """Serialize an object the backend does not handle into basic types
+
+    Args:
+      obj: Object to serialize
+
+    Returns:
+      Serialized object in JSON basic types
+
+    Raises:
+      TypeError upon encoding error
+    """
+    return cls.REGISTRY.encode(obj)
+
+  @classmethod
+  def upgrade_dicts(
+      cls, obj: Union[dict, list, str, int, float]
+  ) -> Union[dict, list, str, int, float, AutoDict]:
+    """Traverse an object and upgrade the dicts to AutoDicts
+
+    Lists are modified in place, dicts are replaced by AutoDicts.
+
+    Args:
+      obj: JSON basic type object
+
+    Returns:
+      Appropriate Python object
+    """
+    t_dict = dict
+    t_list = list
+
+    def upgrade_dict(d: dict) -> AutoDict:
+      for k, v in d.items():
+        t = type(v)
+        if t is t_dict:
+          d[k] = upgrade_dict(v)
+        elif t is t_list:
+          upgrade_list(v)
+      return AutoDict(d)
+
+    def upgrade_list(l: list) -> None:
+      for i, v in enumerate(l):
+        t = type(v)
+        if t is t_dict:
+          l[i] = upgrade_dict(v)
+        elif t is t_list:
+          upgrade_list(v)
+
+    t = type(obj)
+    if t is t_dict:
+      return upgrade_dict(obj)
+    if t is t_list:
+      upgrade_list(obj)
+    return obj
+
+  @classmethod
+  def upgrade_root(
+      cls, obj: Union[dict, list, str, int, float]
+  ) -> Union[dict, list, str, int, float, LazyAutoDict]:
+    """Upgrade only a top level dict to a LazyAutoDict
+
+    Children are upgraded upon first access, see LazyAutoDict.
+
+    Args:
+      obj: JSON basic type object
+
+    Returns:
+      Appropriate Python object
+    """
+    if type(obj) is dict:  # pylint: disable=unidiomatic-typecheck
+      return LazyAutoDict(obj)
+    return obj
+
+  @classmethod
+  @abstractmethod
+  def dump(cls,
+           obj: AutoDict,
+           fp: Union[str, os.PathLike, io.IOBase],
+           indent: int = None) -> None:
+    """Dump AutoDict to a file
+
+    Args:
+      obj: AutoDict to dump
+      fp: Path to file or object with a write() function
+      indent: A number will pretty-print the document if the format supports
+        it, None will not
+    """
+    pass  # pragma: no cover
+
+  @classmethod
+  @abstractmethod
+  def dumps(cls, obj: AutoDict, indent: int = None) -> Union[str, bytes]:
+    """Dump AutoDict to a string
+
+    Args:
+      obj: AutoDict to dump
+      indent: A number will pretty-print the document if the format supports
+        it, None will not
+
+    Returns:
+      Serialized document, str for text formats else bytes
+    """
+    pass  # pragma: no cover
+
+  @classmethod
+  def iterencode(cls,
+                 obj: AutoDict,
+                 indent: int = None,
+                 chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """Encode AutoDict to bytes in pieces
+
+    Formats that cannot be encoded in pieces encode the whole document then
+    yield it chunk_size bytes at a time.
+
+    Args:
+      obj: AutoDict to encode
+      indent: A number will pretty-print the document if the format supports
+        it, None will not
+      chunk_size: Target number of bytes per piece
+
+    Yields:
+      Encoded bytes, joined they are the whole document
+    """
+    s = cls.dumps(obj, indent=indent)
+    if isinstance(s, str):
+      s = s.encode(encoding="utf-8")
+    if len(s) <= chunk_size:
+      yield s
+      return
+    for i in range(0, len(s), chunk_size):
+      yield s[i:i + chunk_size]
+
+  @classmethod
+  def iterdump(cls,
+               obj: AutoDict,
+               fp: Union[str, os.PathLike, io.IOBase],
+               indent: int = None,
+               chunk_size: int = 1 << 16) -> None:
+    """Dump AutoDict to a file in chunks
+
+    Pieces from iterencode are buffered and written about chunk_size bytes at
+    a time.
+
+    Args:
+      obj: AutoDict to dump
+      fp: Path to file or object with a write() function
+      indent: A number will pretty-print the document if the format supports
+        it, None will not
+      chunk_size: Minimum number of bytes per write, except the last
+    """
+    if isinstance(fp, (str, os.PathLike)):
+      with open(fp, "wb") as file:
+        cls.iterdump(obj, file, indent=indent, chunk_size=chunk_size)
+      return
+
+    text = isinstance(fp, io.TextIOBase)
+    buf = []
+    n = 0
+    for s in cls.iterencode(obj, indent=indent, chunk_size=chunk_size):
+      buf.append(s)
+      n += len(s)
+      if n >= chunk_size:
+        chunk = b"".join(buf)
+        fp.write(chunk.decode(encoding="utf-8") if text else chunk)
+        buf = []
+        n = 0
+    if n > 0:
+      chunk = b"".join(buf)
+      fp.write(chunk.decode(encoding="utf-8") if text else chunk)
+
+  @classmethod
+  @abstractmethod
+  def load(cls,
+           fp: Union[str, os.PathLike, io.IOBase],
+           lazy: bool = False) -> AutoDict:
+    """Load a file into an AutoDict
+
+    Args:
+      fp: Path to file or object with a read() function
+      lazy: True will leave nested dicts plain and return a LazyAutoDict that
+        upgrades them upon access, False will upgrade every dict while loading
+
+    Returns:
+      Loaded object
+    """
+    pass  # pragma: no cover
+
+  @classmethod
+  @abstractmethod
+  def loads(cls,
+            s: Union[str, bytes, bytearray, memoryview],
+            lazy: bool = False) -> AutoDict:
+    """Load a string into an AutoDict
+
+    Args:
+      s: Serialized document, binary types are UTF-8 for text formats
+      lazy: True will leave nested dicts plain and return a LazyAutoDict that
+        upgrades them upon access, False will upgrade every dict while loading
+
+    Returns:
+      Loaded object
+    """
+    pass  # pragma: no cover
+
+  @classmethod
+  def iterload(
+      cls,
+      fp: Union[str, os.PathLike, io.IOBase],
+      prefix: Iterable[Union[str, int]] = (),
+      keys: Container = None,
+      lazy: bool = False,
+      chunk_size: int = 1 << 16) -> Iterator[Tuple[stream.Path, object]]:
+    """Load the members of a nested object or array
+
+    Formats that cannot be read incrementally load the whole file then select
+    the members.
+
+    Args:
+      fp: Path to file or object with a read() function
+      prefix: Keys and indices to descend before iterating, () iterates the top
+        level
+      keys: Only members with these keys or indices are returned. None returns
+        every member
+      lazy: Passed to load
+      chunk_size: Number of bytes or characters per read, unused
+
+    Yields:
+      (path, value) for each member, path is prefix + (key,)
+    """
+    del chunk_size
+    if lazy:
+      obj = cls.load(fp, lazy=True)
+    else:
+      obj = cls.load(fp)
+    prefix = tuple(prefix)
+    for k in prefix:
+      try:
+        obj = obj[k]
+      except (KeyError, IndexError, TypeError):
+        return
+    members = obj.items() if isinstance(obj, dict) else enumerate(obj)
+    for k, v in members:
+      if keys is None or k in keys:
+        yield prefix + (k,), v
+
+
+class JSONDriver(SerializationDriver):
+  """Drivers to dump an AutoDict to json and load from json
+  """
+
+  CAPABILITIES = frozenset({"indent", "autodict", "lazy"})
+
+  # Separator between members of compact output, matches dumps()
+  _ITEM_SEPARATOR = b","
+
+  # Separator between a key and its value in compact output, None if dumps()
+  # output cannot be spliced, see encode_cached
+  _KEY_SEPARATOR: Optional[bytes] = None
+
+  # Types the backend parses, loads() converts other inputs
+  _INPUT_TYPES: Tuple[type, ...] = (str, bytes, bytearray)
+
+  @classmethod
+  def _coerce_input(
+      cls, s: Union[str, bytes, bytearray, memoryview]
+  ) -> Union[str, bytes, bytearray, memoryview]:
+    """Convert input to a type the backend parses
+
+    Args:
+      s: JSON document, binary types are UTF-8
+
+    Returns:
+      s if the backend parses it else a copy as bytes or str
+    """
+    if isinstance(s, cls._INPUT_TYPES):
+      return s
+    if bytes in cls._INPUT_TYPES:
+      return bytes(s)
+    return str(s, encoding="utf-8")
+
+  @classmethod
+  def iterencode(cls,
+                 obj: AutoDict,
+                 indent: int = None,
+                 chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """Encode AutoDict to JSON bytes in pieces of top-level members
+
+    Batches of top-level members are encoded with dumps() and the pieces are
+    stitched together so memory is bounded by the largest member rather than
+    the whole document. Batches grow while their pieces are smaller than
+    chunk_size to amortize the cost of each dumps().
+
+    Args:
+      obj: AutoDict to encode
+      indent: A number will pretty-print the JSON, None will not
+      chunk_size: Target number of bytes per piece
+
+    Yields:
+      JSON bytes, joined they are the whole document
+    """
+    if isinstance(obj, dict) and len(obj) > 1:
+      items = iter(obj.items())
+      container = dict
+      brackets = b"{}"
+    elif isinstance(obj, list) and len(obj) > 1:
+      items = iter(obj)
+      container = list
+      brackets = b"[]"
+    else:
+      s = cls.dumps(obj, indent=indent)
+      yield s.encode(encoding="utf-8") if isinstance(s, str) else s
+      return
+
+    # Pretty-printed members are wrapped in newlines, compact ones are not
+    pretty = None
+    batch = 1
+    while True:
+      member = container(itertools.islice(items, batch))
+      if len(member) == 0:
+        break
+      s = cls.dumps(member, indent=indent)
+      if isinstance(s, str):
+        s = s.encode(encoding="utf-8")
+      # Strip the batch's brackets
+      s = s[1:-1]
+      if pretty is None:
+        pretty = s.startswith(b"\n")
+        yield brackets[:1]
+      else:
+        yield b"," if pretty else cls._ITEM_SEPARATOR
+      if pretty:
+        # Keep the leading newline, the trailing one goes after the last batch
+        s = s[:-1]
+      yield s
+      if len(s) < chunk_size:
+        batch *= 2
+      else:
+        batch = max(1, batch // 2)
+    if pretty:
+      yield b"\n"
+    yield brackets[1:]
+
+  @classmethod
+  def encode_cached(cls, obj: AutoDict) -> bytes:
+    """Encode AutoDict to compact JSON bytes reusing unchanged subtrees
+
+    Each ObservedAutoDict keeps the encoding of its members, invalidated along
+    the parent chain upon mutation, so saving after a few changes only
+    encodes the changed members and joins the others. AutoDict children are
+    linked while encoding, see ObservedAutoDict. Members holding lists or
+    other mutable objects, directly or in a child, are encoded every time
+    since mutations inside them are not observed.
+
+    The cache must only be used by the thread mutating the tree. Drivers
+    without a _KEY_SEPARATOR encode the whole document with dumps().
+
+    Args:
+      obj: AutoDict to encode
+
+    Returns:
+      JSON in bytes, same as dumps()
+    """
+    if cls._KEY_SEPARATOR is None or not isinstance(obj, dict):
+      return _dumps_bytes(cls, obj)
+    return _encode_node(cls, obj)[0]
+
+  @classmethod
+  def iterload(
+      cls,
+      fp: Union[str, os.PathLike, io.IOBase],
+      prefix: Iterable[Union[str, int]] = (),
+      keys: Container = None,
+      lazy: bool = False,
+      chunk_size: int = 1 << 16) -> Iterator[Tuple[stream.Path, object]]:
+    """Incrementally load the members of a nested JSON object or array
+
+    The file is read in chunks and each member is parsed on its own so memory
+    is bounded by the largest member rather than the whole file.
+
+    Args:
+      fp: Path to file or object with a read() function
+      prefix: Keys and indices to descend before iterating, () iterates the top
+        level
+      keys: Only members with these keys or indices are loaded, others are
+        skipped without parsing. None loads every member
+      lazy: Passed to loads for each member
+      chunk_size: Number of bytes or characters per read
+
+    Yields:
+      (path, value) for each member, path is prefix + (key,)
+    """
+    for path, s in stream.iter_fragments(fp,
+                                         prefix=tuple(prefix),
+                                         keys=keys,
+                                         chunk_size=chunk_size):
+      if lazy:
+        yield path, cls.loads(s, lazy=True)
+      else:
+        yield path, cls.loads(s)
+
+
+class DefaultJSONDriver(JSONDriver):
+  """Default JSONDriver that uses the built-in json library"""
+
+  CAPABILITIES = JSONDriver.CAPABILITIES | {"encode_cached"}
+
+  _ITEM_SEPARATOR = b", "
+  _KEY_SEPARATOR = b": "
+
+  @classmethod
+  def dump(cls,
+           obj: AutoDict,
+           fp: Union[str, os.PathLike, io.IOBase],
+           indent: int = None) -> None:
+    cls.iterdump(obj, fp, indent=indent)
+
+  @classmethod
+  def dumps(cls, obj: AutoDict, indent: int = None) -> str:
+    return json.dumps(obj, indent=indent, default=cls.default)
+
+  @classmethod
+  def object_hook(cls, d: dict) -> object:
+    """Object hook called when decoder encounters an object aka dict
+
+    Args:
+      d: JSON object literal
+
+    Returns:
+      Appropriate Python object
+
+    Raises:
+      TypeError upon decoding error
+    """
+    return AutoDict(d)
+
+  @classmethod
+  def load(cls,
+           fp: Union[str, os.PathLike, io.IOBase],
+           lazy: bool = False) -> AutoDict:
+    if isinstance(fp, (str, os.PathLike)):
+      # Binary skips decoding to an intermediate str, json.loads does it
+      with open(fp, "rb") as file:
+        return cls.loads(file.read(), lazy=lazy)
+    return cls.loads(fp.read(), lazy=lazy)
+
+  @classmethod
+  def loads(cls,
+            s: Union[str, bytes, bytearray, memoryview],
+            lazy: bool = False) -> AutoDict:
+    s = cls._coerce_input(s)
+    hook = None if lazy else cls.object_hook
+    with gc_paused():
+      return cls.upgrade_root(json.loads(s, object_hook=hook))
+
+
+# Values whose encoding cannot change without replacing them, a node holding
+# others is not cached
+_IMMUTABLE_TYPES = frozenset({
+    str, int, float, bool,
+    type(None), datetime.datetime, datetime.date, datetime.time, uuid.UUID
+})
+
+# Children upgraded to ObservedAutoDict in place by ObservedAutoDict.__getitem__
+_UPGRADED_TYPES = (dict, AutoDict, LazyAutoDict)
+
+
+def _dumps_bytes(driver: JSONDriver, obj: object) -> bytes:
+  """Encode an object with dumps() as bytes
+
+  Args:
+    driver: JSONDriver to encode with
+    obj: Object to encode
+
+  Returns:
+    JSON in bytes
+  """
+  s = driver.dumps(obj)
+  return s.encode(encoding="utf-8") if isinstance(s, str) else s
+
+
+class _NodeEncoding:
+  """Encoded members of an ObservedAutoDict, see JSONDriver.encode_cached
+
+  Members are kept in the order of the node since mutations are mirrored as
+  they happen: setting a new key appends it to both.
+  """
+
+  __slots__ = ("driver", "members", "dirty", "volatile")
+
+  def __init__(self, driver: JSONDriver, keys: Iterable) -> None:
+    self.driver = driver
+    # Key: '"key": value' bytes, None until encoded
+    self.members: Dict[object, Optional[bytes]] = dict.fromkeys(keys)
+    # Keys to encode again
+    self.dirty = set(self.members)
+    # Keys whose values may change without notifying, encoded every time
+    self.volatile = set()
+
+  def invalidate(self, op: str, path: tuple) -> None:
+    """Mark the member changed by a mutation, called by ObservedAutoDict
+
+    Args:
+      op: "set", "delete", or "clear"
+      path: Keys from the node to the mutated key or cleared node
+    """
+    if len(path) == 0:
+      self.members.clear()
+      self.dirty.clear()
+      self.volatile.clear()
+      return
+    k = path[0]
+    if op == "delete" and len(path) == 1:
+      self.members.pop(k, None)
+      self.dirty.discard(k)
+      self.volatile.discard(k)
+      return
+    if k not in self.members:
+      self.members[k] = None
+    self.dirty.add(k)
+
+
+def _encode_member(driver: JSONDriver, node: dict, k: object,
+                   v: object) -> Tuple[bytes, bool]:
+  """Encode a member of a dict to compact JSON
+
+  Args:
+    driver: JSONDriver with a _KEY_SEPARATOR
+    node: dict holding the member
+    k: Key of member
+    v: Value of member
+
+  Returns:
+    ('"key": value' bytes, True if the bytes stay valid until node is notified
+    of a mutation of the member)
+  """
+  t = type(v)
+  if t in _UPGRADED_TYPES and isinstance(node, ObservedAutoDict):
+    v = ObservedAutoDict.__getitem__(node, k)
+    t = ObservedAutoDict
+  if t is ObservedAutoDict and isinstance(k, str):
+    child, stable = _encode_node(driver, v)
+    key_separator = driver._KEY_SEPARATOR  # pylint: disable=protected-access
+    # A child linked elsewhere, such as under another key, does not notify
+    # node of its mutations
+    return (_dumps_bytes(driver, k) + key_separator + child, stable and
+            v.is_linked(node, k))
+  # Strip the braces
+  return _dumps_bytes(driver, {k: v})[1:-1], t in _IMMUTABLE_TYPES
+
+
+def _encode_node(driver: JSONDriver, node: dict) -> Tuple[bytes, bool]:
+  """Encode a dict to compact JSON, updating the cache of ObservedAutoDicts
+
+  Args:
+    driver: JSONDriver with a _KEY_SEPARATOR
+    node: dict to encode
+
+  Returns:
+    (JSON bytes, True if the bytes stay valid until node is notified of a
+    mutation)
+  """
+  item_separator = driver._ITEM_SEPARATOR  # pylint: disable=protected-access
+  if not isinstance(node, ObservedAutoDict):
+    # Not notified of mutations, only its children are cached
+    members = [_encode_member(driver, node, k, v)[0] for k, v in node.items()]
+    return b"{" + item_separator.join(members) + b"}", False
+
+  encoding: _NodeEncoding = node._encoded  # pylint: disable=protected-access
+  if (encoding is None or encoding.driver is not driver or
+      len(encoding.members) != dict.__len__(node)):
+    # New, for another driver, or out of sync from an unobserved mutation
+    encoding = _NodeEncoding(driver, dict.keys(node))
+    node._encoded = encoding  # pylint: disable=protected-access
+  members = encoding.members
+  volatile = encoding.volatile
+  for k in encoding.dirty | volatile:
+    b, stable = _encode_member(driver, node, k, dict.__getitem__(node, k))
+    members[k] = b
+    if stable:
+      volatile.discard(k)
+    else:
+      volatile.add(k)
+  encoding.dirty.clear()
+  return (b"{" + item_separator.join(members.values()) + b"}",
+          len(volatile) == 0)
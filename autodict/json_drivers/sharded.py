@@ -0,0 +1,391 @@
+"""AutoDict stored as a directory of shards saved independently
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import pathlib
+import zlib
+from typing import Dict, Iterator, Set, Type, Union
+
+from autodict.implementation import LazyAutoDict, ObservedAutoDict
+from autodict.json_drivers import atomic, auto, serialization
+
+MANIFEST = "manifest.json"
+
+# Manifest format version, incremented upon incompatible changes
+_FORMAT = 1
+
+
+class _ShardTracker:
+  """Observer that records which shards changed and the keys of each shard
+
+  Holds no reference to the observed tree so adding it does not create a
+  reference cycle that would delay ShardedAutoDict.__del__.
+  """
+
+  __slots__ = ("shards", "dirty", "members")
+
+  def __init__(self, shards: int) -> None:
+    self.shards = shards
+    self.dirty: Set[int] = set()
+    self.members: Dict[int, set] = {}
+
+  def shard_of(self, key: object) -> int:
+    """Get the shard of a top-level key
+
+    Keys are hashed as strings since JSON stores them as strings.
+
+    Args:
+      key: Top-level key
+
+    Returns:
+      Index of shard
+    """
+    return zlib.crc32(str(key).encode(encoding="utf-8")) % self.shards
+
+  def __call__(self, op: str, path: tuple, value: object) -> None:
+    if len(path) == 0:
+      # Root was cleared
+      self.dirty.update(range(self.shards))
+      self.members = {}
+      return
+    i = self.shard_of(path[0])
+    self.dirty.add(i)
+    if len(path) == 1:
+      if op == "set":
+        self.members.setdefault(i, set()).add(path[0])
+      elif op == "delete":
+        self.members.get(i, set()).discard(path[0])
+
+
+class ShardedAutoDict(ObservedAutoDict):
+  """AutoDict stored as a directory of shards
+
+  Top-level keys are hashed into a fixed number of shards, each its own file,
+  listed by a manifest. A shard is loaded upon first access to one of its
+  keys and saving only rewrites shards that changed, in parallel. Each shard
+  is replaced atomically but a crash during a save may leave some shards from
+  before and some from after it.
+
+  Iterating, len, repr, comparisons, |, and copies load every shard first.
+  Consumers that read the dict directly, such as json.dumps, only see loaded
+  shards, call load_all first. Copies are in-memory LazyAutoDicts.
+  """
+
+  def __init__(self,
+               path: Union[str, os.PathLike],
+               *,
+               shards: int = 256,
+               driver: Union[Type[serialization.SerializationDriver],
+                             str] = None,
+               save_on_exit: bool = True,
+               durability: str = "flush",
+               max_workers: int = None) -> None:
+    """Initialize ShardedAutoDict
+
+    Args:
+      path: Path to directory
+      shards: Number of shards for a new directory, an existing directory
+        uses the number in its manifest
+      driver: SerializationDriver to serialize/deserialize each shard, None
+        will use the driver of an existing directory else DefaultJSONDriver,
+        "auto" will use the fastest installed JSONDriver, see best_driver
+      save_on_exit: True will save changed shards when object is closed,
+        False will not
+      durability: Durability of each shard, see atomic.DURABILITIES
+      max_workers: Number of threads writing shards, None will use the
+        default of ThreadPoolExecutor
+
+    Raises:
+      ValueError if the manifest is from an unsupported version or durability
+      is unknown
+    """
+    super().__init__()
+    self._path = pathlib.Path(path)
+    self._durability = atomic.check(durability)
+    self._max_workers = max_workers
+
+    manifest_path = self._path.joinpath(MANIFEST)
+    self._has_manifest = manifest_path.exists()
+    suffix = None
+    if self._has_manifest:
+      with open(manifest_path, "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+      version = manifest.get("format")
+      if version != _FORMAT:
+        raise ValueError(f"Unsupported manifest format {version} in "
+                         f"{manifest_path}")
+      shards = manifest["shards"]
+      suffix = manifest["suffix"]
+
+    if driver is None or driver == "auto":
+      if suffix is not None:
+        # Format of the existing shards
+        default = auto.driver_for_path("shard" + suffix)
+      else:
+        default = None
+      if default is None and driver == "auto":
+        default = auto.best_driver()
+      driver = default or serialization.DefaultJSONDriver
+    self._driver = driver
+    self._suffix = _suffix_of(driver) if suffix is None else suffix
+
+    self._loaded: Set[int] = set()
+    self._tracker = _ShardTracker(shards)
+    self.add_observer(self._tracker)
+    self._save_on_exit = save_on_exit
+
+  def __reduce__(self) -> tuple:
+    # Copies are detached from the directory
+    self.load_all()
+    return (LazyAutoDict, (dict(dict.items(self)),))
+
+  @property
+  def path(self) -> pathlib.Path:
+    """Path to directory"""
+    return self._path
+
+  @property
+  def shards(self) -> int:
+    """Number of shards"""
+    return self._tracker.shards
+
+  @property
+  def dirty_shards(self) -> Set[int]:
+    """Indices of shards changed since the last save"""
+    return set(self._tracker.dirty)
+
+  def _shard_path(self, i: int) -> pathlib.Path:
+    return self._path.joinpath(f"{i:05d}{self._suffix}")
+
+  def _load_shard(self, i: int) -> None:
+    """Load a shard if it was not loaded
+
+    Args:
+      i: Index of shard
+    """
+    if i in self._loaded:
+      return
+    self._loaded.add(i)
+    path = self._shard_path(i)
+    if not path.exists():
+      return
+    data = self._driver.load(path, lazy=True)
+    dict.update(self, data)
+    self._tracker.members.setdefault(i, set()).update(data.keys())
+
+  def _load_key(self, key: object) -> None:
+    """Load the shard of a top-level key
+
+    Args:
+      key: Top-level key
+    """
+    self._load_shard(self._tracker.shard_of(key))
+
+  def load_all(self) -> None:
+    """Load every shard
+    """
+    for i in range(self._tracker.shards):
+      self._load_shard(i)
+
+  def __missing__(self, key: object):
+    i = self._tracker.shard_of(key)
+    if i not in self._loaded:
+      self._load_shard(i)
+      if dict.__contains__(self, key):
+        return self[key]
+    value = self[key] = ObservedAutoDict()
+    return value
+
+  def __setitem__(self, key: object, value: object) -> None:
+    self._load_key(key)
+    super().__setitem__(key, value)
+
+  def __delitem__(self, key: object) -> None:
+    self._load_key(key)
+    super().__delitem__(key)
+
+  def pop(self, key: object, *args) -> object:
+    self._load_key(key)
+    return super().pop(key, *args)
+
+  def get(self, key: object, default: object = None) -> object:
+    self._load_key(key)
+    return super().get(key, default)
+
+  def setdefault(self, key: object, default: object = None) -> object:
+    self._load_key(key)
+    return super().setdefault(key, default)
+
+  def contains(self, *keys: object) -> bool:
+    self._load_key(keys[0])
+    return super().contains(*keys)
+
+  def __contains__(self, o: object) -> bool:
+    if isinstance(o, list):
+      return self.contains(*o)
+    self._load_key(o)
+    return dict.__contains__(self, o)
+
+  def clear(self) -> None:
+    # Stored shards are replaced by empty ones
+    self._loaded = set(range(self._tracker.shards))
+    super().clear()
+
+  def popitem(self) -> tuple:
+    self.load_all()
+    return super().popitem()
+
+  def keys(self):
+    self.load_all()
+    return dict.keys(self)
+
+  def values(self):
+    self.load_all()
+    return dict.values(self)
+
+  def items(self):
+    self.load_all()
+    return dict.items(self)
+
+  def __iter__(self) -> Iterator[object]:
+    self.load_all()
+    return dict.__iter__(self)
+
+  def __reversed__(self) -> Iterator[object]:
+    self.load_all()
+    return reversed(list(dict.__iter__(self)))
+
+  def __len__(self) -> int:
+    self.load_all()
+    return dict.__len__(self)
+
+  def __repr__(self) -> str:
+    self.load_all()
+    return dict.__repr__(self)
+
+  def __eq__(self, other: object) -> bool:
+    self.load_all()
+    if isinstance(other, ShardedAutoDict):
+      other.load_all()
+    return dict.__eq__(self, other)
+
+  def __ne__(self, other: object) -> bool:
+    result = self.__eq__(other)
+    if result is NotImplemented:
+      return result
+    return not result
+
+  def __or__(self, other: object) -> dict:
+    if not isinstance(other, dict):
+      return NotImplemented
+    self.load_all()
+    result = dict(dict.items(self))
+    result.update(other)
+    return result
+
+  def __ror__(self, other: object) -> dict:
+    if not isinstance(other, dict):
+      return NotImplemented
+    self.load_all()
+    result = dict(other)
+    result.update(dict.items(self))
+    return result
+
+  def copy(self) -> LazyAutoDict:
+    self.load_all()
+    return LazyAutoDict(dict.items(self))
+
+  def _write_shard(self, i: int, obj: dict) -> None:
+    """Write a shard, an empty shard removes its file
+
+    Args:
+      i: Index of shard
+      obj: Top-level keys of shard
+    """
+    path = self._shard_path(i)
+    if len(obj) == 0:
+      with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+      return
+    with atomic.open_atomic(path, self._durability) as file:
+      self._driver.dump(obj, file)
+
+  def save(self) -> None:
+    """Write the shards changed since the last save
+    """
+    self._path.mkdir(parents=True, exist_ok=True)
+    if not self._has_manifest:
+      manifest = {
+          "format": _FORMAT,
+          "shards": self._tracker.shards,
+          "suffix": self._suffix
+      }
+      with atomic.open_atomic(self._path.joinpath(MANIFEST),
+                              self._durability) as file:
+        file.write(json.dumps(manifest).encode(encoding="utf-8"))
+      self._has_manifest = True
+
+    dirty = sorted(self._tracker.dirty)
+    if len(dirty) == 0:
+      return
+    objs = []
+    for i in dirty:
+      objs.append({
+          k: dict.__getitem__(self, k)
+          for k in self._tracker.members.get(i, ())
+      })
+    if len(dirty) == 1 or self._max_workers == 1:
+      for i, obj in zip(dirty, objs):
+        self._write_shard(i, obj)
+    else:
+      # Imported upon use, importing concurrent.futures is slow
+      import concurrent.futures  # pylint: disable=import-outside-toplevel
+      with concurrent.futures.ThreadPoolExecutor(self._max_workers) as pool:
+        # Every write completes before the first error is raised
+        for future in [
+            pool.submit(self._write_shard, i, obj)
+            for i, obj in zip(dirty, objs)
+        ]:
+          future.result()
+    self._tracker.dirty.difference_update(dirty)
+
+  def __enter__(self) -> ShardedAutoDict:
+    """Enter ContextManager
+    Returns:
+      self
+    """
+    return self
+
+  def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+    """Exit ContextManager
+    """
+    if self._save_on_exit:
+      self.save()
+      self._save_on_exit = False
+
+  def __del__(self) -> None:
+    """Object destructor
+    """
+    # Not set if __init__ raised
+    if self.__dict__.get("_save_on_exit", False):
+      self.save()
+      self._save_on_exit = False
+
+
+def _suffix_of(driver: type) -> str:
+  """Get the file suffix of a driver's format
+
+  Args:
+    driver: SerializationDriver class
+
+  Returns:
+    Suffix from auto.EXTENSIONS for binary formats else ".json"
+  """
+  for suffix, (module_name, class_name) in auto.EXTENSIONS.items():
+    if driver.__module__ == module_name and driver.__name__ == class_name:
+      return suffix
+  return ".json"
@@ -3,11 +3,10 @@
 
 from __future__ import annotations
 
-import datetime
+import decimal
 import io
 import os
-from typing import Callable, Union
-import uuid
+from typing import Union
 
 try:
   import simplejson
@@ -16,39 +15,16 @@ except ImportError as e:
       "Cannot use SimpleJSONDriver without simplejson installed") from e
 
 from autodict.implementation import AutoDict
-from autodict.json_drivers import base
+from autodict.json_drivers import serialization
 
 
-class SimpleJSONDriver(base.JSONDriver):
+class SimpleJSONDriver(serialization.JSONDriver):
   """JSONDriver that uses the simplejson library
   """
 
-  TYPES_SERIALIZE = {
-      datetime.datetime: lambda t: t.isoformat(),
-      datetime.date: lambda t: t.isoformat(),
-      datetime.time: lambda t: t.isoformat(),
-      uuid.UUID: str
-  }
+  NATIVE_TYPES = (decimal.Decimal,)
 
-  @classmethod
-  def default(cls, obj: object) -> Union[str, dict, list, int, float]:
-    """Serialize an object into a JSON basic type
-
-    Args:
-      obj: Object to serialize
-
-    Returns:
-      Serialized object in JSON basic types
-
-    Raises:
-      TypeError upon encoding error
-    """
-    for t, op in cls.TYPES_SERIALIZE.items():
-      op: Callable
-      if isinstance(obj, t):
-        return op(obj)
-
-    raise TypeError(f"AutoDict encoder cannot encode type='{type(obj)}'")
+  _INPUT_TYPES = (str,)
 
   @classmethod
   def dump(cls,
@@ -64,8 +40,7 @@ class SimpleJSONDriver(base.JSONDriver):
       if isinstance(fp, io.TextIOBase):
         simplejson.dump(obj, fp, indent=indent, default=cls.default)
       else:
-        s = simplejson.dumps(obj, indent=indent, default=cls.default)
-        fp.write(s.encode(encoding="utf-8"))
+        cls.iterdump(obj, fp, indent=indent)
 
   @classmethod
   def dumps(cls, obj: AutoDict, indent: int = None) -> str:
@@ -89,12 +64,19 @@ class SimpleJSONDriver(base.JSONDriver):
     return AutoDict(d)
 
   @classmethod
-  def load(cls, fp: Union[str, os.PathLike, io.IOBase]) -> AutoDict:
+  def load(cls,
+           fp: Union[str, os.PathLike, io.IOBase],
+           lazy: bool = False) -> AutoDict:
     if isinstance(fp, (str, os.PathLike)):
       with open(fp, "r", encoding="utf-8") as file:
-        return simplejson.load(file, object_hook=cls.object_hook)
-    return simplejson.load(fp, object_hook=cls.object_hook)
+        return cls.loads(file.read(), lazy=lazy)
+    return cls.loads(fp.read(), lazy=lazy)
 
   @classmethod
-  def loads(cls, s: Union[str, bytes]) -> AutoDict:
-    return simplejson.loads(s, object_hook=cls.object_hook)
+  def loads(cls,
+            s: Union[str, bytes, bytearray, memoryview],
+            lazy: bool = False) -> AutoDict:
+    s = cls._coerce_input(s)
+    hook = None if lazy else cls.object_hook
+    with serialization.gc_paused():
+      return cls.upgrade_root(simplejson.loads(s, object_hook=hook))
@@ -0,0 +1,606 @@
+"""AutoDict stored in a SQLite database, loaded one node at a time
+"""
+
+from __future__ import annotations
+
+import collections.abc
+import io
+import json
+import os
+import pathlib
+import sqlite3
+from typing import Iterator, Optional, Tuple, Type, Union
+
+from autodict.implementation import AutoDict
+from autodict.json_drivers import auto, serialization
+
+# Number of members selected per query when iterating a node
+_PAGE_SIZE = 1000
+
+# Each row is a member of a node: parent is the encoded path of the node, a
+# NULL value is a nested node else the JSON of a leaf. The primary key orders
+# members by key within their node and places every descendant of a node
+# right after its members, see _subtree.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+  parent BLOB NOT NULL,
+  key TEXT NOT NULL,
+  value TEXT,
+  PRIMARY KEY (parent, key)
+) WITHOUT ROWID
+"""
+
+
+def _key(key: object) -> str:
+  """Convert a key to a string like JSON objects do
+
+  Args:
+    key: str, int, float, bool, or None
+
+  Returns:
+    Key as stored
+
+  Raises:
+    TypeError if key is another type
+  """
+  if isinstance(key, str):
+    return key
+  if key is None or isinstance(key, (int, float)):
+    return json.dumps(key)
+  raise TypeError(f"Keys must be str, int, float, bool or None, not "
+                  f"{type(key).__name__}")
+
+
+def _join(parent: bytes, key: str) -> bytes:
+  """Encode the path of a member
+
+  Keys are joined by NUL bytes, NUL and 0x01 within keys are escaped so the
+  descendants of a node sort between its path + NUL and its path + 0x01.
+
+  Args:
+    parent: Encoded path of node, b"" for the root
+    key: Key of member in node
+
+  Returns:
+    Encoded path of member
+  """
+  b = key.encode(encoding="utf-8").replace(b"\x01", b"\x01\x02").replace(
+      b"\x00", b"\x01\x01")
+  if len(parent) == 0:
+    return b
+  return parent + b"\x00" + b
+
+
+def _subtree(path: bytes) -> Tuple[str, tuple]:
+  """Get the condition selecting the rows of a node and its descendants
+
+  Args:
+    path: Encoded path of node
+
+  Returns:
+    (SQL condition on parent, parameters)
+  """
+  if len(path) == 0:
+    return "1", ()
+  return "parent >= ? AND parent < ?", (path, path + b"\x01")
+
+
+def _key_after(prefix: str) -> Optional[str]:
+  """Get the smallest string greater than every string starting with prefix
+
+  Args:
+    prefix: Non-empty prefix
+
+  Returns:
+    Upper bound, None if there is none
+  """
+  for i in range(len(prefix) - 1, -1, -1):
+    if ord(prefix[i]) < 0x10FFFF:
+      return prefix[:i] + chr(ord(prefix[i]) + 1)
+  return None
+
+
+class _Store:
+  """Connection shared by the nodes of a SQLiteAutoDict
+  """
+
+  __slots__ = ("connection", "driver", "batch_size", "save_on_exit", "pending")
+
+  def __init__(self, connection: sqlite3.Connection,
+               driver: Type[serialization.JSONDriver], batch_size: int,
+               save_on_exit: bool) -> None:
+    self.connection = connection
+    self.driver = driver
+    self.batch_size = batch_size
+    self.save_on_exit = save_on_exit
+    # Rows written in the open transaction
+    self.pending = 0
+
+  def commit(self) -> None:
+    """Commit the open transaction
+    """
+    self.connection.commit()
+    self.pending = 0
+
+  def close(self) -> None:
+    """Commit, or roll back if not save_on_exit, and close the connection
+    """
+    if self.connection is None:
+      return
+    if self.save_on_exit:
+      self.commit()
+    self.connection.close()
+    self.connection = None
+
+  def __del__(self) -> None:
+    """Object destructor
+    """
+    self.close()
+
+
+class SQLiteAutoDict(collections.abc.MutableMapping):
+  """AutoDict stored in a SQLite database for trees larger than memory
+
+  Each leaf is a row keyed by the path of its node and its key, nested nodes
+  are rows without a value. Indexing a nested node returns a SQLiteAutoDict
+  of that node which queries its members upon access, nothing is cached.
+  Missing keys add an empty node like AutoDict. Leaves are decoded by a
+  JSONDriver, lists and other mutable leaves are copies: reassign them to
+  save changes.
+
+  Writes are batched into transactions committed every batch_size rows, by
+  commit, and upon close. Keys are stored as strings like JSON objects and
+  ordered by code point, see prefix and range. A node's view writing after
+  the node was removed leaves unreachable rows until the node is set again.
+  The connection may only be used by the thread that opened it.
+  """
+
+  def __init__(self,
+               path: Union[str, os.PathLike],
+               *,
+               driver: Union[Type[serialization.JSONDriver], str] = None,
+               batch_size: int = 10000,
+               save_on_exit: bool = True) -> None:
+    """Initialize SQLiteAutoDict
+
+    Args:
+      path: Path to database file, created if it does not exist
+      driver: JSONDriver to encode/decode leaves, None will use
+        DefaultJSONDriver, "auto" will use the fastest installed JSONDriver,
+        see best_driver
+      batch_size: Number of rows written per transaction
+      save_on_exit: True will commit when object is closed, False will roll
+        back the open transaction
+    """
+    if driver is None:
+      driver = serialization.DefaultJSONDriver
+    elif driver == "auto":
+      driver = auto.best_driver()
+    self._path = pathlib.Path(path)
+    connection = sqlite3.connect(self._path)
+    connection.execute(_SCHEMA)
+    self._store = _Store(connection, driver, batch_size, save_on_exit)
+    self._node_path: tuple = ()
+    self._encoded = b""
+
+  @classmethod
+  def _view(cls, path: pathlib.Path, store: _Store, node_path: tuple,
+            encoded: bytes) -> SQLiteAutoDict:
+    """Create the view of a node of an open database
+
+    Args:
+      path: Path to database file
+      store: Connection and settings of the database
+      node_path: Keys from the root to the node
+      encoded: Encoded path of the node, see _join
+
+    Returns:
+      SQLiteAutoDict of the node
+    """
+    node = cls.__new__(cls)
+    node._path = path
+    node._store = store
+    node._node_path = node_path
+    node._encoded = encoded
+    return node
+
+  def _child(self, key: str) -> SQLiteAutoDict:
+    """Create the view of a nested node
+
+    Args:
+      key: Key of node in this node
+
+    Returns:
+      SQLiteAutoDict sharing this one's connection
+    """
+    return type(self)._view(self._path, self._store, self._node_path + (key,),
+                            _join(self._encoded, key))
+
+  @property
+  def path(self) -> pathlib.Path:
+    """Path to database file"""
+    return self._path
+
+  @property
+  def node_path(self) -> tuple:
+    """Keys from the root to this node"""
+    return self._node_path
+
+  def _execute(self, sql: str, parameters: tuple = ()) -> sqlite3.Cursor:
+    return self._store.connection.execute(sql, parameters)
+
+  def _wrote(self, rows: int) -> None:
+    """Count written rows, committing once a batch is full
+
+    Args:
+      rows: Number of rows written
+    """
+    store = self._store
+    store.pending += rows
+    if store.pending >= store.batch_size:
+      store.commit()
+
+  def _decode(self, key: str, value: Optional[str]) -> object:
+    """Decode the value of a member
+
+    Args:
+      key: Key of member
+      value: Value column of member
+
+    Returns:
+      SQLiteAutoDict of a nested node else the leaf
+    """
+    if value is None:
+      return self._child(key)
+    return self._store.driver.loads(value)
+
+  def _lookup(self, key: str) -> Tuple[bool, Optional[str]]:
+    """Get the value column of a member
+
+    Args:
+      key: Key of member
+
+    Returns:
+      (True if the member exists, value column)
+    """
+    row = self._execute("SELECT value FROM nodes WHERE parent = ? AND key = ?",
+                        (self._encoded, key)).fetchone()
+    if row is None:
+      return False, None
+    return True, row[0]
+
+  def _rows(self, parent: bytes, key: str, value: object) -> Iterator[tuple]:
+    """Encode a value into rows
+
+    Args:
+      parent: Encoded path of node holding the value
+      key: Key of value
+      value: Mappings become nested nodes, others leaves
+
+    Yields:
+      (parent, key, value column) of the value and its descendants
+    """
+    if isinstance(value, collections.abc.Mapping):
+      yield parent, key, None
+      path = _join(parent, key)
+      for k, v in value.items():
+        yield from self._rows(path, _key(k), v)
+      return
+    s = self._store.driver.dumps(value)
+    if isinstance(s, bytes):
+      s = s.decode(encoding="utf-8")
+    yield parent, key, s
+
+  def _remove(self, key: str) -> int:
+    """Delete a member and its descendants
+
+    Args:
+      key: Key of member
+
+    Returns:
+      Number of rows deleted
+    """
+    n = self._execute("DELETE FROM nodes WHERE parent = ? AND key = ?",
+                      (self._encoded, key)).rowcount
+    condition, parameters = _subtree(_join(self._encoded, key))
+    n += self._execute(f"DELETE FROM nodes WHERE {condition}",
+                       parameters).rowcount
+    return n
+
+  def __getitem__(self, key: object) -> object:
+    key = _key(key)
+    found, value = self._lookup(key)
+    if not found:
+      # Rows written through views of a removed node are dropped
+      n = self._remove(key)
+      self._execute("INSERT INTO nodes VALUES (?, ?, NULL)",
+                    (self._encoded, key))
+      self._wrote(n + 1)
+    return self._decode(key, value)
+
+  def __setitem__(self, key: object, value: object) -> None:
+    key = _key(key)
+    if isinstance(value, SQLiteAutoDict):
+      # Materialized first since its rows are deleted if it is a child
+      value = value.to_dict()
+    n = self._remove(key)
+    n += self._store.connection.executemany(
+        "INSERT INTO nodes VALUES (?, ?, ?)",
+        self._rows(self._encoded, key, value)).rowcount
+    self._wrote(n)
+
+  def __delitem__(self, key: object) -> None:
+    key = _key(key)
+    n = self._remove(key)
+    if n == 0:
+      raise KeyError(key)
+    self._wrote(n)
+
+  def __iter__(self) -> Iterator[str]:
+    for row in self._pages("key", None, None):
+      yield row[0]
+
+  def __len__(self) -> int:
+    return self._execute("SELECT COUNT(*) FROM nodes WHERE parent = ?",
+                         (self._encoded,)).fetchone()[0]
+
+  def __contains__(self, o: object) -> bool:
+    if isinstance(o, list):
+      return self.contains(*o)
+    return self._lookup(_key(o))[0]
+
+  def __repr__(self) -> str:
+    return f"SQLiteAutoDict({str(self._path)!r}, {self._node_path!r})"
+
+  def contains(self, *keys: object) -> bool:
+    """Check for the presence of keys in dictionary
+
+    Supply multiple keys to check children, only nested nodes are descended.
+    A single query regardless of depth.
+
+    Args:
+      keys: one or more keys to check for (cascading levels)
+
+    Returns:
+      True when key(s) exist
+    """
+    keys = [_key(k) for k in keys]
+    parent = self._encoded
+    for k in keys[:-1]:
+      parent = _join(parent, k)
+    row = self._execute("SELECT 1 FROM nodes WHERE parent = ? AND key = ?",
+                        (parent, keys[-1])).fetchone()
+    return row is not None
+
+  def get(self, key: object, default: object = None) -> object:
+    key = _key(key)
+    found, value = self._lookup(key)
+    if not found:
+      return default
+    return self._decode(key, value)
+
+  def pop(self, key: object, *args) -> object:
+    key = _key(key)
+    found, value = self._lookup(key)
+    if not found:
+      if len(args) > 0:
+        return args[0]
+      raise KeyError(key)
+    if value is None:
+      result = self._child(key).to_dict()
+    else:
+      result = self._store.driver.loads(value)
+    self._wrote(self._remove(key))
+    return result
+
+  def setdefault(self, key: object, default: object = None) -> object:
+    if key not in self:
+      self[key] = default
+    return self[key]
+
+  def clear(self) -> None:
+    condition, parameters = _subtree(self._encoded)
+    n = self._execute(f"DELETE FROM nodes WHERE {condition}",
+                      parameters).rowcount
+    self._wrote(n)
+
+  def items(self) -> Iterator[Tuple[str, object]]:
+    """Iterate the members of this node
+
+    Returns:
+      Iterator of (key, value), nested nodes as SQLiteAutoDicts
+    """
+    return self.range()
+
+  def values(self) -> Iterator[object]:
+    """Iterate the values of this node
+
+    Returns:
+      Iterator of values, nested nodes as SQLiteAutoDicts
+    """
+    return (v for _, v in self.range())
+
+  def prefix(self, prefix: str) -> Iterator[Tuple[str, object]]:
+    """Iterate the members whose key starts with prefix
+
+    Uses the primary key's index, in order of key.
+
+    Args:
+      prefix: Start of keys
+
+    Returns:
+      Iterator of (key, value), nested nodes as SQLiteAutoDicts
+    """
+    if len(prefix) == 0:
+      return self.items()
+    return self.range(prefix, _key_after(prefix))
+
+  def range(self,
+            start: str = None,
+            stop: str = None) -> Iterator[Tuple[str, object]]:
+    """Iterate the members whose key is in [start, stop)
+
+    Uses the primary key's index, in order of key compared by code point.
+
+    Args:
+      start: Smallest key, None is unbounded
+      stop: Key after the last, None is unbounded
+
+    Yields:
+      (key, value), nested nodes as SQLiteAutoDicts
+    """
+    for k, v in self._pages("key, value", start, stop):
+      yield k, self._decode(k, v)
+
+  def _pages(self, columns: str, start: Optional[str],
+             stop: Optional[str]) -> Iterator[tuple]:
+    """Select the members of this node in [start, stop) a page at a time
+
+    Each page is a query starting after the last key of the previous one so
+    writes and commits between items do not disturb the iteration.
+
+    Args:
+      columns: Columns to select, key first
+      start: Smallest key, None is unbounded
+      stop: Key after the last, None is unbounded
+
+    Yields:
+      Selected row of each member in order of key
+    """
+    while True:
+      condition = ""
+      parameters = (self._encoded,)
+      if start is not None:
+        condition += " AND key >= ?"
+        parameters += (start,)
+      if stop is not None:
+        condition += " AND key < ?"
+        parameters += (stop,)
+      rows = self._execute(
+          f"SELECT {columns} FROM nodes WHERE parent = ?{condition} "
+          f"ORDER BY key LIMIT {_PAGE_SIZE}", parameters).fetchall()
+      yield from rows
+      if len(rows) < _PAGE_SIZE:
+        return
+      # Keys are unique within a node, the next page starts after the last
+      start = rows[-1][0] + "\0"
+
+  def to_dict(self) -> AutoDict:
+    """Load this node and its descendants
+
+    Returns:
+      AutoDict of this node
+    """
+    root = AutoDict()
+    nodes = {self._encoded: root}
+    condition, parameters = _subtree(self._encoded)
+    loads = self._store.driver.loads
+    # Nodes sort before their members so each parent is created first
+    for parent, k, v in self._execute(
+        f"SELECT parent, key, value FROM nodes WHERE {condition} "
+        "ORDER BY parent, key", parameters):
+      node = nodes.get(parent)
+      if node is None:
+        # Unreachable rows, see SQLiteAutoDict
+        continue
+      if v is None:
+        node[k] = nodes[_join(parent, k)] = AutoDict()
+      else:
+        node[k] = loads(v)
+    return root
+
+  def import_file(
+      self,
+      fp: Union[str, os.PathLike, io.IOBase],
+      driver: Type[serialization.SerializationDriver] = None) -> int:
+    """Set the top-level members of a file into this node
+
+    JSONDrivers parse one member at a time, see iterload, so memory is
+    bounded by the largest member. Rows are committed in batches.
+
+    Args:
+      fp: Path to file or object with a read() function
+      driver: SerializationDriver of the file, None will use the driver of a
+        binary suffix else DefaultJSONDriver
+
+    Returns:
+      Number of members set
+    """
+    if driver is None:
+      driver = (isinstance(fp, (str, os.PathLike)) and
+                auto.driver_for_path(fp)) or serialization.DefaultJSONDriver
+    n = 0
+    for item_path, v in driver.iterload(fp, lazy=True):
+      self[item_path[-1]] = v
+      n += 1
+    return n
+
+  def export_file(self,
+                  fp: Union[str, os.PathLike, io.IOBase],
+                  driver: Type[serialization.SerializationDriver] = None,
+                  indent: int = None) -> None:
+    """Dump this node to a file
+
+    JSONDrivers load and encode one top-level member at a time, see
+    JSONDriver.iterencode, so memory is bounded by the largest member. Other
+    drivers load the whole node.
+
+    Args:
+      fp: Path to file or object with a write() function
+      driver: SerializationDriver of the file, None will use the driver of a
+        binary suffix else DefaultJSONDriver
+      indent: Indentation parameter passed to the driver
+    """
+    if driver is None:
+      driver = (isinstance(fp, (str, os.PathLike)) and
+                auto.driver_for_path(fp)) or serialization.DefaultJSONDriver
+    if issubclass(driver, serialization.JSONDriver) and len(self) > 1:
+      driver.iterdump(_Members(self), fp, indent=indent)
+    else:
+      driver.dump(self.to_dict(), fp, indent=indent)
+
+  def commit(self) -> None:
+    """Commit the open transaction
+    """
+    self._store.commit()
+
+  def close(self) -> None:
+    """Commit, or roll back if not save_on_exit, and close the connection
+
+    Closes the database for every node, also done once the root and every
+    nested node are garbage collected.
+    """
+    self._store.close()
+
+  def __enter__(self) -> SQLiteAutoDict:
+    """Enter ContextManager
+    Returns:
+      self
+    """
+    return self
+
+  def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+    """Exit ContextManager
+    """
+    self.close()
+
+
+class _Members(dict):
+  """Members of a node loaded one at a time, for JSONDriver.iterencode
+
+  Empty as a dict, iterencode only reads len() and items() then encodes
+  batches of the loaded members.
+  """
+
+  def __init__(self, node: SQLiteAutoDict) -> None:
+    super().__init__()
+    self._node = node
+
+  def __len__(self) -> int:
+    return len(self._node)
+
+  def items(self) -> Iterator[Tuple[str, object]]:
+    for k, v in self._node.items():
+      if isinstance(v, SQLiteAutoDict):
+        v = v.to_dict()
+      yield k, v
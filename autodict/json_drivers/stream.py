@@ -0,0 +1,313 @@
+"""Incremental scanning of JSON documents larger than memory
+"""
+
+from __future__ import annotations
+
+import codecs
+import io
+import json
+import os
+import re
+from typing import Container, Iterator, Tuple, Union
+
+# Text up to the next bracket, skipping complete strings
+_NON_BRACKET = re.compile(r'[^"\[\]{}]*'
+                          r'(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')
+_SCALAR_END = re.compile(r"[,}\]\s]")
+_WHITESPACE = " \t\n\r"
+
+Path = Tuple[Union[str, int], ...]
+
+
+class _Scanner:
+  """Chunked reader of a JSON document
+
+  Scanned text is discarded unless it is part of a value being captured, so
+  memory is bounded by the largest captured value.
+  """
+
+  def __init__(self, fp: io.IOBase, chunk_size: int) -> None:
+    """Initialize _Scanner
+
+    Args:
+      fp: Object with a read() function returning str or bytes
+      chunk_size: Number of bytes or characters per read
+    """
+    self._fp = fp
+    self._chunk_size = chunk_size
+    self._decoder = None
+    self._buf = ""
+    self._pos = 0
+    self._eof = False
+    # Start of capture in _buf, None when not capturing
+    self._mark = None
+    # Captured text already released from _buf
+    self._pieces = []
+
+  def _fill(self) -> bool:
+    """Read another chunk into the buffer
+
+    Returns:
+      True if anything was read, False at end of file
+    """
+    if self._eof:
+      return False
+    chunk = self._fp.read(self._chunk_size)
+    if len(chunk) == 0:
+      self._eof = True
+      if self._decoder is not None:
+        self._decoder.decode(b"", final=True)
+      return False
+    if isinstance(chunk, (bytes, bytearray, memoryview)):
+      if self._decoder is None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+      chunk = self._decoder.decode(chunk)
+    self._buf += chunk
+    return True
+
+  def _release(self, i: int) -> int:
+    """Release scanned text from the buffer and read another chunk
+
+    Text before i is moved to the captured pieces if capturing, else dropped.
+    A trailing run of backslashes is kept since it may escape a quote in the
+    next chunk.
+
+    Args:
+      i: Index in buffer that has been scanned up to
+
+    Returns:
+      Index equivalent to i in the new buffer
+
+    Raises:
+      ValueError at end of file
+    """
+    buf = self._buf
+    keep = i
+    while keep > 0 and buf[keep - 1] == "\\":
+      keep -= 1
+    if self._mark is not None:
+      self._pieces.append(buf[self._mark:keep])
+      self._mark = 0
+    self._buf = buf[keep:]
+    self._pos = 0
+    if not self._fill():
+      raise self._error("unexpected end of file")
+    return i - keep
+
+  def _error(self, msg: str) -> ValueError:
+    return ValueError(f"Invalid JSON: {msg}")
+
+  def peek(self) -> str:
+    """Skip whitespace and get the next character without consuming it
+
+    Returns:
+      Next character or "" at end of file
+    """
+    while True:
+      buf = self._buf
+      n = len(buf)
+      pos = self._pos
+      while pos < n and buf[pos] in _WHITESPACE:
+        pos += 1
+      if pos < n:
+        self._pos = pos
+        return buf[pos]
+      self._buf = ""
+      self._pos = 0
+      if not self._fill():
+        return ""
+
+  def expect(self, chars: str) -> str:
+    """Consume the next character which must be one of chars
+
+    Args:
+      chars: Allowed characters
+
+    Returns:
+      Consumed character
+
+    Raises:
+      ValueError if next character is not allowed
+    """
+    c = self.peek()
+    if c == "" or c not in chars:
+      raise self._error(f"expected one of '{chars}' got '{c}'")
+    self._pos += 1
+    return c
+
+  def _string_end(self, i: int) -> int:
+    """Find the end of a string literal
+
+    Args:
+      i: Index just after the opening quote
+
+    Returns:
+      Index just after the closing quote
+    """
+    buf = self._buf
+    while True:
+      j = buf.find('"', i)
+      if j < 0:
+        i = self._release(len(buf))
+        buf = self._buf
+        continue
+      k = j - 1
+      while k >= 0 and buf[k] == "\\":
+        k -= 1
+      if (j - 1 - k) % 2 == 0:
+        return j + 1
+      i = j + 1
+
+  def _container_end(self, i: int) -> int:
+    """Find the end of an object or array
+
+    Args:
+      i: Index of the opening bracket
+
+    Returns:
+      Index just after the closing bracket
+    """
+    depth = 0
+    match = _NON_BRACKET.match
+    while True:
+      buf = self._buf
+      i = match(buf, i).end()
+      if i == len(buf):
+        i = self._release(i)
+        continue
+      c = buf[i]
+      i += 1
+      if c == '"':
+        # String continues into the next chunk
+        i = self._string_end(i)
+      elif c in "[{":
+        depth += 1
+      else:
+        depth -= 1
+        if depth == 0:
+          return i
+
+  def _scalar_end(self, i: int) -> int:
+    """Find the end of a number, true, false, or null
+
+    Args:
+      i: Index of the first character
+
+    Returns:
+      Index just after the last character
+    """
+    while True:
+      m = _SCALAR_END.search(self._buf, i)
+      if m is not None:
+        return m.start()
+      i = len(self._buf)
+      if not self._fill():
+        return i
+
+  def value(self, capture: bool) -> str:
+    """Consume a value
+
+    Args:
+      capture: True will return the value's JSON text, False will skip it
+        holding only one chunk in memory
+
+    Returns:
+      JSON text of value or "" if not captured
+    """
+    c = self.peek()
+    if c == "":
+      raise self._error("unexpected end of file")
+    start = self._pos
+    if capture:
+      self._mark = start
+    try:
+      if c == '"':
+        end = self._string_end(start + 1)
+      elif c in "[{":
+        end = self._container_end(start)
+      else:
+        end = self._scalar_end(start)
+      self._pos = end
+      if not capture:
+        return ""
+      self._pieces.append(self._buf[self._mark:end])
+      s = "".join(self._pieces)
+    finally:
+      self._mark = None
+      self._pieces = []
+    return s
+
+  def read_string(self) -> str:
+    """Consume a string literal
+
+    Returns:
+      Decoded string
+    """
+    c = self.peek()
+    if c != '"':
+      raise self._error(f"expected string got '{c}'")
+    return json.loads(self.value(True))
+
+  def members(self) -> Iterator[Union[str, int]]:
+    """Iterate over the members of the object or array at the cursor
+
+    The caller must consume each member's value before advancing.
+
+    Yields:
+      Key of object member or index of array member
+    """
+    c = self.expect("{[")
+    close = "}" if c == "{" else "]"
+    if self.peek() == close:
+      self._pos += 1
+      return
+    i = 0
+    while True:
+      if close == "}":
+        key = self.read_string()
+        self.expect(":")
+        yield key
+      else:
+        yield i
+        i += 1
+      if self.expect("," + close) == close:
+        return
+
+
+def iter_fragments(
+    fp: Union[str, os.PathLike, io.IOBase],
+    prefix: Path = (),
+    keys: Container = None,
+    chunk_size: int = 1 << 16) -> Iterator[Tuple[Path, str]]:
+  """Iterate over the members of a nested object or array as JSON text
+
+  Args:
+    fp: Path to file or object with a read() function
+    prefix: Keys and indices to descend before iterating, () iterates the top
+      level
+    keys: Only members with these keys or indices are returned, others are
+      skipped without holding them in memory. None returns every member
+    chunk_size: Number of bytes or characters per read
+
+  Yields:
+    (path, JSON text) for each member, path is prefix + (key,)
+  """
+  if isinstance(fp, (str, os.PathLike)):
+    with open(fp, "rb") as file:
+      yield from iter_fragments(file, prefix, keys, chunk_size)
+    return
+
+  scanner = _Scanner(fp, chunk_size)
+  prefix = tuple(prefix)
+  for target in prefix:
+    for key in scanner.members():
+      if key == target:
+        break
+      scanner.value(False)
+    else:
+      return
+  for key in scanner.members():
+    if keys is None or key in keys:
+      yield prefix + (key,), scanner.value(True)
+    else:
+      scanner.value(False)
@@ -3,11 +3,12 @@
 
 from __future__ import annotations
 
-import datetime
+import decimal
+import gc
 import io
+import itertools
 import os
-from typing import Callable, Union
-import uuid
+from typing import Type, Union
 
 try:
   import ujson
@@ -15,100 +16,131 @@ except ImportError as e:
   raise ImportError("Cannot use UltraJSONDriver without ujson installed") from e
 
 from autodict.implementation import AutoDict
-from autodict.json_drivers import base
+from autodict.json_drivers import serialization
 
 
-class UltraJSONDriver(base.JSONDriver):
+def _holds_decimal(obj: object) -> bool:
+  """Check if a tree holds a Decimal
+
+  Visits the tree a level at a time with the garbage collector's traversal so
+  the check runs at C speed rather than a Python loop per value.
+
+  Args:
+    obj: Root of tree
+
+  Returns:
+    True if a dict, list, or tuple of the tree holds a Decimal
+  """
+  level = [obj]
+  while level:
+    refs = gc.get_referents(*level)
+    types = set(map(type, refs))
+    if any(issubclass(t, decimal.Decimal) for t in types):
+      return True
+    containers = {t for t in types if issubclass(t, (dict, list, tuple))}
+    is_container = map(containers.__contains__, map(type, refs))
+    level = list(itertools.compress(refs, is_container))
+  return False
+
+
+class UltraJSONDriver(serialization.JSONDriver):
   """JSONDriver that uses the ujson library
+
+  ujson encodes Decimals itself as JSON numbers with the precision of a float.
+  See with_options to encode them with the REGISTRY instead.
   """
 
-  TYPES_SERIALIZE = {
-      datetime.datetime: lambda t: t.isoformat(),
-      datetime.date: lambda t: t.isoformat(),
-      datetime.time: lambda t: t.isoformat(),
-      uuid.UUID: str
-  }
+  NATIVE_TYPES = (decimal.Decimal,)
+
+  # True encodes Decimals with the REGISTRY, checking each tree before dumping
+  ENCODE_DECIMALS = False
 
   @classmethod
-  def default(cls, obj: object) -> Union[str, dict, list, int, float]:
-    """Serialize an object into a JSON basic type
+  def with_options(cls,
+                   *,
+                   encode_decimals: bool = False) -> Type[UltraJSONDriver]:
+    """Create an UltraJSONDriver with different encoding options
 
     Args:
-      obj: Object to serialize
+      encode_decimals: True will encode Decimals with the REGISTRY, as str by
+        default, at the cost of scanning each tree for them before dumping.
+        False will let ujson encode them as numbers, losing precision beyond a
+        float
 
     Returns:
-      Serialized object in JSON basic types
-
-    Raises:
-      TypeError upon encoding error
+      Subclass of UltraJSONDriver with ENCODE_DECIMALS and NATIVE_TYPES set
     """
-    for t, op in cls.TYPES_SERIALIZE.items():
-      op: Callable
-      if isinstance(obj, t):
-        return op(obj)
+    attrs = {
+        "ENCODE_DECIMALS": encode_decimals,
+        "NATIVE_TYPES": () if encode_decimals else (decimal.Decimal,)
+    }
+    return type(cls.__name__, (cls,), attrs)
+
+  @classmethod
+  def _encode_decimals(cls, obj: object) -> object:
+    """Replace Decimals by their encoding from default()
 
-    raise TypeError(f"AutoDict encoder cannot encode type='{type(obj)}'")
+    Args:
+      obj: Object to encode
+
+    Returns:
+      obj if it holds no Decimal, else a copy of the dicts and lists holding
+      them
+    """
+    if isinstance(obj, dict):
+      copied = None
+      for k, v in obj.items():
+        encoded = cls._encode_decimals(v)
+        if encoded is not v:
+          if copied is None:
+            copied = dict(obj)
+          copied[k] = encoded
+      return obj if copied is None else copied
+    if isinstance(obj, (list, tuple)):
+      copied = None
+      for i, v in enumerate(obj):
+        encoded = cls._encode_decimals(v)
+        if encoded is not v:
+          if copied is None:
+            copied = list(obj)
+          copied[i] = encoded
+      return obj if copied is None else copied
+    if isinstance(obj, decimal.Decimal):
+      return cls.default(obj)
+    return obj
 
   @classmethod
   def dump(cls,
            obj: AutoDict,
            fp: Union[str, os.PathLike, io.IOBase],
            indent: int = None) -> None:
-    if indent is None:
-      indent = 0
-    if isinstance(fp, (str, os.PathLike)):
-      with open(fp, "w", encoding="utf-8") as file:
-        ujson.dump(obj, file, indent=indent, default=cls.default)
-    else:
-      if isinstance(fp, io.TextIOBase):
-        ujson.dump(obj, fp, indent=indent, default=cls.default)
-      else:
-        s = ujson.dumps(obj, indent=indent, default=cls.default)
-        fp.write(s.encode(encoding="utf-8"))
+    cls.iterdump(obj, fp, indent=indent)
 
   @classmethod
   def dumps(cls, obj: AutoDict, indent: int = None) -> str:
     if indent is None:
       indent = 0
+    if cls.ENCODE_DECIMALS and _holds_decimal(obj):
+      obj = cls._encode_decimals(obj)
     return ujson.dumps(obj, indent=indent, default=cls.default)
 
   @classmethod
-  def upgrade_dicts(
-      cls, obj: Union[dict, list, str, int, float]
-  ) -> Union[dict, list, str, int, float, AutoDict]:
-    """Traverse an object and upgrade the dicts to AutoDicts
-
-    Args:
-      obj: JSON basic type object
-
-    Returns:
-      Appropriate Python object
-
-    Raises:
-      TypeError upon decoding error
-    """
-    if isinstance(obj, dict):
-      for k, v in obj.items():
-        obj[k] = cls.upgrade_dicts(v)
-      return AutoDict(obj)
-    if isinstance(obj, list):
-      for i, v in enumerate(obj):
-        obj[i] = cls.upgrade_dicts(v)
-      return obj
-    return obj
-
-  @classmethod
-  def load(cls, fp: Union[str, os.PathLike, io.IOBase]) -> AutoDict:
-    return base.DefaultJSONDriver.load(fp)
-    # ujson is faster but doesn't make upgrading to AutoDicts fast
-    # if isinstance(fp, (str, os.PathLike)):
-    #   with open(fp, "rb") as file:
-    #     return cls.upgrade_dicts(ujson.loads(file.read()))
-    # fp: Union[io.BytesIO, io.StringIO]
-    # return cls.upgrade_dicts(ujson.loads(fp.read()))
+  def load(cls,
+           fp: Union[str, os.PathLike, io.IOBase],
+           lazy: bool = False) -> AutoDict:
+    if isinstance(fp, (str, os.PathLike)):
+      with open(fp, "rb") as file:
+        s = file.read()
+    else:
+      s = fp.read()
+    return cls.loads(s, lazy=lazy)
 
   @classmethod
-  def loads(cls, s: Union[str, bytes]) -> AutoDict:
-    return base.DefaultJSONDriver.loads(s)
-    # ujson is faster but doesn't make upgrading to AutoDicts fast
-    # return cls.upgrade_dicts(ujson.loads(s))
+  def loads(cls,
+            s: Union[str, bytes, bytearray, memoryview],
+            lazy: bool = False) -> AutoDict:
+    s = cls._coerce_input(s)
+    with serialization.gc_paused():
+      if lazy:
+        return cls.upgrade_root(ujson.loads(s))
+      return cls.upgrade_dicts(ujson.loads(s))
@@ -0,0 +1,10 @@
+"""Benchmarks
+
+Typical usage:
+  python -m benchmarks.drivers --sizes 1K 1M --output results.json
+  python -m benchmarks.drivers --baseline results.json --threshold 0.2
+  python -m benchmarks.core --rev master
+  python -m benchmarks.ndjson --batches 100 --batch-size 1000
+  python -m benchmarks.durability --sizes 1K 1M --repeat 20
+  python -m benchmarks.encoder_cache --sizes 1M 10M --dirty 0.01
+"""
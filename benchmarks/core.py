@@ -0,0 +1,311 @@
+"""Microbenchmark AutoDict in-memory operations
+
+Typical usage:
+  python -m benchmarks.core --output results.json
+  python -m benchmarks.core --rev master
+  python -m benchmarks.core --profile --profile-dir profiles
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import copy
+import importlib
+import io
+import os
+import pathlib
+import pstats
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List
+
+from benchmarks import data, results
+
+_ROOT = pathlib.Path(__file__).parent.parent
+
+# Scenario: function(autodict module) returning the statement to time
+Scenario = Callable[[object], Callable[[], object]]
+
+
+def _chain(depth: int) -> Scenario:
+
+  def setup(autodict) -> Callable[[], object]:
+    keys = [f"key{i}" for i in range(depth)]
+
+    def stmt() -> None:
+      d = autodict.AutoDict()
+      node = d
+      for k in keys[:-1]:
+        node = node[k]
+      node[keys[-1]] = None
+
+    return stmt
+
+  return setup
+
+
+def _nested(autodict, depth: int) -> object:
+  d = autodict.AutoDict()
+  node = d
+  for i in range(depth - 1):
+    node = node[f"key{i}"]
+  node[f"key{depth - 1}"] = None
+  return d
+
+
+def _contains(depth: int, as_list: bool) -> Scenario:
+
+  def setup(autodict) -> Callable[[], object]:
+    d = _nested(autodict, depth)
+    keys = [f"key{i}" for i in range(depth)]
+    if as_list:
+      return lambda: keys in d
+    return lambda: d.contains(*keys)
+
+  return setup
+
+
+def _document(autodict) -> object:
+  d = autodict.AutoDict()
+  for k, v in data.iter_items("wide", 1 << 20):
+    d[k] = autodict.AutoDict(v)
+  return d
+
+
+def _iterate(autodict) -> Callable[[], object]:
+  d = _document(autodict)
+
+  def stmt() -> None:
+    for _, child in d.items():
+      for _ in child.items():
+        pass
+
+  return stmt
+
+
+def _update(autodict) -> Callable[[], object]:
+  d = _document(autodict)
+  other = dict(d)
+  return lambda: autodict.AutoDict().update(other)
+
+
+def _equality(autodict) -> Callable[[], object]:
+  d = _document(autodict)
+  other = copy.deepcopy(d)
+  return lambda: d == other
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "missing_chain_4": _chain(4),
+    "missing_chain_16": _chain(16),
+    "contains_1": _contains(1, False),
+    "contains_4": _contains(4, False),
+    "contains_16": _contains(16, False),
+    "contains_list_4": _contains(4, True),
+    "contains_list_16": _contains(16, True),
+    "iterate_1M": _iterate,
+    "update_1M": _update,
+    "equality_1M": _equality,
+}
+
+
+def node_overhead(autodict, n: int = 100000) -> Dict[str, float]:
+  """Measure memory per empty node versus a plain dict
+
+  Args:
+    autodict: autodict module
+    n: Number of nodes to allocate
+
+  Returns:
+    {"autodict": bytes per node, "dict": bytes per node}
+  """
+  out = {}
+  for name, cls in (("autodict", autodict.AutoDict), ("dict", dict)):
+    tracemalloc.start()
+    nodes = [cls(key=None) for _ in range(n)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    out[name] = current / n
+    del nodes
+  return out
+
+
+def run(autodict,
+        scenarios: List[str],
+        repeat: int = 5,
+        verbose: bool = True) -> results.Results:
+  """Time each scenario
+
+  Args:
+    autodict: autodict module
+    scenarios: Names of scenarios, see SCENARIOS
+    repeat: Number of timeit repeats, best is kept
+    verbose: True will print each measurement as it completes
+
+  Returns:
+    Results keyed by scenario, time is seconds per call
+  """
+  out: results.Results = {}
+  for name in scenarios:
+    stmt = SCENARIOS[name](autodict)
+    timer = timeit.Timer(stmt)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    out[name] = {"time": best}
+    if verbose:
+      print(f"{name:30} {best * 1e6:12.3f}us", flush=True)
+  overhead = node_overhead(autodict)
+  out["node_bytes"] = {"time": overhead["autodict"], **overhead}
+  if verbose:
+    print(f"{'node_bytes':30} {overhead['autodict']:9.1f}B "
+          f"(dict {overhead['dict']:.1f}B)")
+  return out
+
+
+def profile(autodict,
+            scenarios: List[str],
+            profile_dir: str = None,
+            n_top: int = 15) -> None:
+  """Profile each scenario and print the hottest functions
+
+  Args:
+    autodict: autodict module
+    scenarios: Names of scenarios, see SCENARIOS
+    profile_dir: Directory to dump .prof files, None will not
+    n_top: Number of functions to print per scenario
+  """
+  if profile_dir is not None:
+    os.makedirs(profile_dir, exist_ok=True)
+  for name in scenarios:
+    stmt = SCENARIOS[name](autodict)
+    number, _ = timeit.Timer(stmt).autorange()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(number):
+      stmt()
+    profiler.disable()
+
+    buf = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buf)
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(n_top)
+    print(f"==== {name} ({number} calls)")
+    print(buf.getvalue())
+    if profile_dir is not None:
+      stats.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+
+
+def run_revision(rev: str, scenarios: List[str],
+                 repeat: int) -> results.Results:
+  """Run the scenarios against another git revision of autodict
+
+  Checks out rev into a temporary worktree and runs this suite in a subprocess
+  importing autodict from there.
+
+  Args:
+    rev: git revision
+    scenarios: Names of scenarios, see SCENARIOS
+    repeat: Number of timeit repeats, best is kept
+
+  Returns:
+    Results of rev
+  """
+  with tempfile.TemporaryDirectory() as tmp:
+    worktree = pathlib.Path(tmp).joinpath("worktree")
+    subprocess.check_call(
+        ["git", "worktree", "add", "--detach",
+         str(worktree), rev],
+        cwd=_ROOT,
+        stdout=subprocess.DEVNULL)
+    try:
+      # version.py is generated by setup.py and not tracked
+      version = _ROOT.joinpath("autodict", "version.py")
+      version_rev = worktree.joinpath("autodict", "version.py")
+      if version.exists() and not version_rev.exists():
+        shutil.copy(version, version_rev)
+      output = pathlib.Path(tmp).joinpath("results.json")
+      subprocess.check_call([
+          sys.executable, "-m", "benchmarks.core", "--import-path",
+          str(worktree), "--repeat",
+          str(repeat), "--output",
+          str(output), "--scenarios"
+      ] + scenarios,
+                            cwd=_ROOT)
+      return results.load(output)
+    finally:
+      subprocess.check_call(
+          ["git", "worktree", "remove", "--force",
+           str(worktree)],
+          cwd=_ROOT)
+
+
+def main(argv: List[str] = None) -> int:
+  """Benchmark AutoDict from the command line
+
+  Args:
+    argv: Command line arguments, None will use sys.argv
+
+  Returns:
+    Exit code, 1 if a regression was found
+  """
+  parser = argparse.ArgumentParser(prog="python -m benchmarks.core",
+                                   description=__doc__.splitlines()[0])
+  parser.add_argument("--scenarios",
+                      nargs="+",
+                      default=list(SCENARIOS),
+                      choices=list(SCENARIOS))
+  parser.add_argument("--repeat", type=int, default=5)
+  parser.add_argument("--output", help="Path to write results JSON")
+  parser.add_argument("--baseline", help="Path to results JSON to compare")
+  parser.add_argument("--rev", help="git revision to run and compare against")
+  parser.add_argument("--threshold",
+                      type=float,
+                      default=0.2,
+                      help="Allowed fractional slowdown versus baseline")
+  parser.add_argument("--profile",
+                      action="store_true",
+                      help="Print hottest functions of each scenario instead")
+  parser.add_argument("--profile-dir", help="Directory to dump .prof files")
+  parser.add_argument("--import-path", help=argparse.SUPPRESS)
+  args = parser.parse_args(argv)
+
+  if args.import_path:
+    sys.path.insert(0, args.import_path)
+  autodict = importlib.import_module("autodict")
+
+  if args.profile:
+    profile(autodict, args.scenarios, profile_dir=args.profile_dir)
+    return 0
+
+  baseline = None
+  label = "baseline"
+  if args.rev:
+    print(f"Running {args.rev}")
+    baseline = run_revision(args.rev, args.scenarios, args.repeat)
+    label = args.rev
+  elif args.baseline:
+    baseline = results.load(args.baseline)
+
+  print(f"Running {results.git_revision()}")
+  out = run(autodict, args.scenarios, repeat=args.repeat)
+  if args.output:
+    results.save(args.output, out)
+
+  if baseline is None:
+    return 0
+  results.print_table(results.compare(baseline, out),
+                      old_label=label,
+                      new_label=results.git_revision())
+  slow = results.regressions(baseline, out, args.threshold)
+  if len(slow) == 0:
+    return 0
+  print(f"{len(slow)} regressions slower by more than {args.threshold:.0%}")
+  return 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,163 @@
+"""Generate JSON documents of various shapes and sizes
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import string
+from typing import Callable, Dict, Iterator, Tuple
+
+_SIZE_SUFFIXES = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+def parse_size(s: str) -> int:
+  """Parse a human readable size
+
+  Args:
+    s: Size such as "512", "1K", "100M", or "1G"
+
+  Returns:
+    Size in bytes
+
+  Raises:
+    ValueError if s is not a valid size
+  """
+  m = re.fullmatch(r"(\d+)([KMG]?)B?", s.strip().upper())
+  if m is None:
+    raise ValueError(f"Invalid size '{s}'")
+  return int(m[1]) * _SIZE_SUFFIXES[m[2]]
+
+
+def format_size(n: int) -> str:
+  """Format a size as human readable
+
+  Args:
+    n: Size in bytes
+
+  Returns:
+    Size such as "1K" or "100M"
+  """
+  for suffix in ("G", "M", "K"):
+    scale = _SIZE_SUFFIXES[suffix]
+    if n >= scale and n % scale == 0:
+      return f"{n // scale}{suffix}"
+  return str(n)
+
+
+def gen_string(rng: random.Random,
+               min_length: int = 8,
+               max_length: int = 12) -> str:
+  """Generate a random string with letter, numbers, and symbols
+
+  Args:
+    rng: Random number generator
+    min_length: minimum length of string
+    max_length: maximum length of string
+
+  Returns:
+    str Random length string with random characters
+  """
+  all_char = string.ascii_letters + string.punctuation + string.digits
+  return "".join(
+      rng.choice(all_char) for _ in range(rng.randint(min_length, max_length)))
+
+
+def _gen_leaf(rng: random.Random) -> object:
+  """Generate a random JSON leaf value
+
+  Args:
+    rng: Random number generator
+
+  Returns:
+    str, int, float, bool, or None
+  """
+  r = rng.random()
+  if r < 0.4:
+    return gen_string(rng)
+  if r < 0.6:
+    return rng.randint(-1 << 31, 1 << 31)
+  if r < 0.8:
+    return rng.random()
+  if r < 0.9:
+    return rng.random() < 0.5
+  return None
+
+
+def _item_wide(rng: random.Random) -> object:
+  return {gen_string(rng): _gen_leaf(rng) for _ in range(8)}
+
+
+def _item_deep(rng: random.Random) -> object:
+  item = _gen_leaf(rng)
+  for _ in range(rng.randint(8, 16)):
+    item = {gen_string(rng): item, gen_string(rng): _gen_leaf(rng)}
+  return item
+
+
+def _item_list(rng: random.Random) -> object:
+  return [[_gen_leaf(rng) for _ in range(8)] for _ in range(4)]
+
+
+def _item_string(rng: random.Random) -> object:
+  return gen_string(rng, min_length=64, max_length=256)
+
+
+def _item_numeric(rng: random.Random) -> object:
+  return {
+      "ints": [rng.randint(-1 << 31, 1 << 31) for _ in range(16)],
+      "floats": [rng.random() * 1e6 for _ in range(16)]
+  }
+
+
+# Name: function to generate one top-level item
+SHAPES: Dict[str, Callable[[random.Random], object]] = {
+    "wide": _item_wide,
+    "deep": _item_deep,
+    "list": _item_list,
+    "string": _item_string,
+    "numeric": _item_numeric,
+}
+
+
+def iter_items(shape: str,
+               size: int,
+               seed: int = 0) -> Iterator[Tuple[str, object]]:
+  """Generate top-level items until their JSON is approximately size bytes
+
+  Args:
+    shape: Name of shape, see SHAPES
+    size: Target size of JSON document in bytes
+    seed: Seed for random number generator
+
+  Yields:
+    (key, value) top-level items
+  """
+  rng = random.Random(seed)
+  gen_item = SHAPES[shape]
+  total = 2
+  i = 0
+  while total < size:
+    key = f"{i:08}"
+    value = gen_item(rng)
+    total += len(json.dumps(value)) + len(key) + 4
+    i += 1
+    yield key, value
+
+
+def generate(shape: str, size: int, seed: int = 0) -> dict:
+  """Generate a document with approximately size bytes of JSON
+
+  autodict is not imported so another revision can be benchmarked, use
+  JSONDriver.upgrade_dicts to convert.
+
+  Args:
+    shape: Name of shape, see SHAPES
+    size: Target size of JSON document in bytes
+    seed: Seed for random number generator
+
+  Returns:
+    dict with only JSON basic types
+  """
+  return dict(iter_items(shape, size, seed=seed))
@@ -0,0 +1,183 @@
+"""Benchmark load/dump of every installed JSON and binary driver
+
+Typical usage:
+  python -m benchmarks.drivers --sizes 1K 1M --output results.json
+  python -m benchmarks.drivers --baseline results.json --threshold 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List
+
+import autodict
+from autodict.json_drivers import auto
+
+from benchmarks import data, results
+
+# Operation: function(driver, document, path to file of document written by
+# driver)
+OPERATIONS: Dict[str, Callable[[type, dict, pathlib.Path], object]] = {
+    "load_path": lambda driver, _, path: driver.load(path),
+    "load_file": lambda driver, _, path: _load_file(driver, path),
+    "loads": lambda driver, _, path: driver.loads(path.read_bytes()),
+    "dump_path": lambda driver, d, path: driver.dump(d, path),
+    "dump_file": lambda driver, d, path: _dump_file(driver, d, path),
+    "dumps": lambda driver, d, _: driver.dumps(d),
+}
+
+
+def _load_file(driver: type, path: pathlib.Path) -> object:
+  with open(path, "rb") as file:
+    return driver.load(file)
+
+
+def _dump_file(driver: type, d: dict, path: pathlib.Path) -> None:
+  with open(path, "wb") as file:
+    driver.dump(d, file)
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+  """Measure the duration and peak memory of a function
+
+  Duration is the best of repeat runs without tracing. Peak memory is from one
+  extra run with tracemalloc since tracing slows execution.
+
+  Args:
+    func: Function to measure
+    repeat: Number of timed runs
+
+  Returns:
+    {"time": seconds, "peak": bytes}
+  """
+  best = float("inf")
+  for _ in range(repeat):
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    best = min(best, time.perf_counter() - start)
+    del result
+  gc.collect()
+  tracemalloc.start()
+  try:
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  del result
+  return {"time": best, "peak": peak}
+
+
+def run(drivers: Iterable[type],
+        shapes: Iterable[str],
+        sizes: Iterable[int],
+        operations: Iterable[str],
+        *,
+        repeat: int = 3,
+        verbose: bool = True) -> results.Results:
+  """Run the benchmark matrix
+
+  Args:
+    drivers: Driver classes to benchmark
+    shapes: Names of document shapes, see data.SHAPES
+    sizes: Target document sizes in bytes
+    operations: Names of operations, see OPERATIONS
+    repeat: Number of timed runs of each measurement
+    verbose: True will print each measurement as it completes
+
+  Returns:
+    Results keyed by "driver/shape/size/operation"
+  """
+  drivers = list(drivers)
+  operations = list(operations)
+  out: results.Results = {}
+  with tempfile.TemporaryDirectory() as tmp:
+    tmp = pathlib.Path(tmp)
+    for shape in shapes:
+      for size in sizes:
+        d = autodict.DefaultJSONDriver.upgrade_dicts(data.generate(shape, size))
+        scratch = tmp.joinpath("scratch")
+        for driver in drivers:
+          # Each format loads a file it wrote
+          path = tmp.joinpath(f"{shape}_{size}_{driver.__name__}")
+          driver.dump(d, path)
+          for op in operations:
+            # Dump to a scratch file so the loaded file stays intact
+            target = scratch if op.startswith("dump") else path
+            func = OPERATIONS[op]
+            m = measure(lambda f=func, dr=driver, t=target: f(dr, d, t),
+                        repeat)
+            name = f"{driver.__name__}/{shape}/{data.format_size(size)}/{op}"
+            out[name] = m
+            if verbose:
+              print(f"{name:60} {m['time']:10.6f}s "
+                    f"{m['peak'] / (1 << 20):10.2f}MiB",
+                    flush=True)
+        del d
+  return out
+
+
+def main(argv: List[str] = None) -> int:
+  """Benchmark drivers from the command line
+
+  Args:
+    argv: Command line arguments, None will use sys.argv
+
+  Returns:
+    Exit code, 1 if a regression was found
+  """
+  parser = argparse.ArgumentParser(prog="python -m benchmarks.drivers",
+                                   description=__doc__.splitlines()[0])
+  parser.add_argument("--drivers",
+                      nargs="+",
+                      help="Driver class names, default is every installed")
+  parser.add_argument("--shapes",
+                      nargs="+",
+                      default=list(data.SHAPES),
+                      choices=list(data.SHAPES))
+  parser.add_argument("--sizes",
+                      nargs="+",
+                      default=["1K", "100K", "1M"],
+                      help="Document sizes from 1K to 1G")
+  parser.add_argument("--operations",
+                      nargs="+",
+                      default=list(OPERATIONS),
+                      choices=list(OPERATIONS))
+  parser.add_argument("--repeat", type=int, default=3)
+  parser.add_argument("--output", help="Path to write results JSON")
+  parser.add_argument("--baseline", help="Path to results JSON to compare")
+  parser.add_argument("--threshold",
+                      type=float,
+                      default=0.2,
+                      help="Allowed fractional slowdown versus baseline")
+  args = parser.parse_args(argv)
+
+  drivers = auto.installed_drivers(binary=True)
+  if args.drivers:
+    drivers = [d for d in drivers if d.__name__ in args.drivers]
+  sizes = [data.parse_size(s) for s in args.sizes]
+
+  out = run(drivers, args.shapes, sizes, args.operations, repeat=args.repeat)
+  if args.output:
+    results.save(args.output, out)
+
+  if args.baseline is None:
+    return 0
+  baseline = results.load(args.baseline)
+  results.print_table(results.compare(baseline, out))
+  slow = results.regressions(baseline, out, args.threshold)
+  if len(slow) == 0:
+    return 0
+  print(f"{len(slow)} regressions slower by more than {args.threshold:.0%}")
+  results.print_table(slow)
+  return 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,149 @@
+"""Benchmark JSONAutoDict save latency at each durability level
+
+Typical usage:
+  python -m benchmarks.durability --sizes 1K 1M --repeat 20
+  python -m benchmarks.durability --dir /mnt/disk --output results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+import tempfile
+import time
+from typing import Iterable, List
+
+import autodict
+from autodict.json_drivers import atomic, auto
+
+from benchmarks import data, results
+
+
+def measure(d: autodict.JSONAutoDict, repeat: int) -> dict:
+  """Measure the latency of saving
+
+  Args:
+    d: JSONAutoDict to save
+    repeat: Number of saves
+
+  Returns:
+    {"time": median seconds, "max": slowest seconds}
+  """
+  durations = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    d.save()
+    durations.append(time.perf_counter() - start)
+  durations.sort()
+  return {"time": durations[len(durations) // 2], "max": durations[-1]}
+
+
+def run(driver: type,
+        shape: str,
+        sizes: Iterable[int],
+        durabilities: Iterable[str],
+        *,
+        directory: str = None,
+        repeat: int = 10,
+        verbose: bool = True) -> results.Results:
+  """Save documents at every durability level
+
+  Args:
+    driver: JSONDriver class
+    shape: Name of document shape, see data.SHAPES
+    sizes: Target document sizes in bytes
+    durabilities: Names of levels, see atomic.DURABILITIES
+    directory: Directory to save in, None will use a temporary directory.
+      Results depend on its file system
+    repeat: Number of saves of each measurement
+    verbose: True will print each measurement as it completes
+
+  Returns:
+    Results keyed by "durability/size"
+  """
+  durabilities = list(durabilities)
+  out: results.Results = {}
+  with tempfile.TemporaryDirectory(dir=directory) as tmp:
+    path = pathlib.Path(tmp).joinpath("save.json")
+    for size in sizes:
+      doc = data.generate(shape, size)
+      for durability in durabilities:
+        d = autodict.JSONAutoDict(path,
+                                  save_on_exit=False,
+                                  driver=driver,
+                                  durability=durability,
+                                  **doc)
+        m = measure(d, repeat)
+        del d
+        key = f"{durability}/{data.format_size(size)}"
+        out[key] = m
+        if verbose:
+          print(f"{key:30} {m['time'] * 1e3:10.3f}ms median "
+                f"{m['max'] * 1e3:10.3f}ms max",
+                flush=True)
+  return out
+
+
+def main(argv: List[str] = None) -> int:
+  """Benchmark durability levels from the command line
+
+  Args:
+    argv: Command line arguments, None will use sys.argv
+
+  Returns:
+    Exit code, 1 if a regression was found
+  """
+  parser = argparse.ArgumentParser(prog="python -m benchmarks.durability",
+                                   description=__doc__.splitlines()[0])
+  parser.add_argument("--driver",
+                      help="Driver class name, default is the fastest")
+  parser.add_argument("--shape", default="wide", choices=list(data.SHAPES))
+  parser.add_argument("--sizes",
+                      nargs="+",
+                      default=["1K", "100K", "1M"],
+                      help="Document sizes from 1K to 1G")
+  parser.add_argument("--durabilities",
+                      nargs="+",
+                      default=list(atomic.DURABILITIES),
+                      choices=list(atomic.DURABILITIES))
+  parser.add_argument("--dir", help="Directory to save in, default is temp")
+  parser.add_argument("--repeat", type=int, default=10)
+  parser.add_argument("--output", help="Path to write results JSON")
+  parser.add_argument("--baseline", help="Path to results JSON to compare")
+  parser.add_argument("--threshold",
+                      type=float,
+                      default=0.2,
+                      help="Allowed fractional slowdown versus baseline")
+  args = parser.parse_args(argv)
+
+  drivers = auto.installed_drivers(binary=True)
+  if args.driver:
+    drivers = [d for d in drivers if d.__name__ == args.driver]
+    if len(drivers) == 0:
+      parser.error(f"Driver {args.driver} is not installed")
+  sizes = [data.parse_size(s) for s in args.sizes]
+
+  out = run(drivers[0],
+            args.shape,
+            sizes,
+            args.durabilities,
+            directory=args.dir,
+            repeat=args.repeat)
+  if args.output:
+    results.save(args.output, out)
+
+  if args.baseline is None:
+    return 0
+  baseline = results.load(args.baseline)
+  results.print_table(results.compare(baseline, out))
+  slow = results.regressions(baseline, out, args.threshold)
+  if len(slow) == 0:
+    return 0
+  print(f"{len(slow)} regressions slower by more than {args.threshold:.0%}")
+  results.print_table(slow)
+  return 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
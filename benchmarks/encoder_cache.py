@@ -0,0 +1,189 @@
+"""Benchmark re-encoding a tree after changing a fraction of it
+
+Compares dumps() of the whole document to encode_cached() which only encodes
+the changed subtrees.
+
+Typical usage:
+  python -m benchmarks.encoder_cache --sizes 1M 10M --dirty 0.01
+  python -m benchmarks.encoder_cache --baseline results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import sys
+import time
+from typing import Iterable, List
+
+import autodict
+from autodict.json_drivers import auto
+
+from benchmarks import data, results
+
+
+def touch(d: autodict.ObservedAutoDict, fraction: float,
+          rng: random.Random) -> None:
+  """Change the deepest object of a fraction of the top-level items
+
+  Args:
+    d: Tree to change
+    fraction: Fraction of top-level items to change
+    rng: Random number generator
+  """
+  keys = list(d.keys())
+  for k in rng.sample(keys, max(1, int(len(keys) * fraction))):
+    node = d
+    key = k
+    while isinstance(node.get(key), dict):
+      node = node[key]
+      children = [c for c, v in node.items() if isinstance(v, dict)]
+      key = children[0] if children else None
+    if node is d:
+      # Not an object, replaced instead
+      d[k] = rng.random()
+    else:
+      node["dirty"] = rng.random()
+
+
+def measure(driver: type, d: autodict.ObservedAutoDict, fraction: float,
+            repeat: int) -> dict:
+  """Measure encoding after each change
+
+  Args:
+    driver: JSONDriver class
+    d: Tree to encode, encoded once first to fill the cache
+    fraction: Fraction of top-level items changed before each encoding
+    repeat: Number of changes and encodings
+
+  Returns:
+    {"time": median seconds of dumps(), "cached": median seconds of
+    encode_cached()}
+  """
+  rng = random.Random(0)
+  driver.encode_cached(d)
+  full = []
+  cached = []
+  for _ in range(repeat):
+    touch(d, fraction, rng)
+    start = time.perf_counter()
+    target = driver.encode_cached(d)
+    cached.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    s = driver.dumps(d)
+    full.append(time.perf_counter() - start)
+    if isinstance(s, str):
+      s = s.encode(encoding="utf-8")
+    if s != target:
+      raise ValueError(f"{driver.__name__}.encode_cached differs from dumps")
+  full.sort()
+  cached.sort()
+  return {"time": full[len(full) // 2], "cached": cached[len(cached) // 2]}
+
+
+def run(drivers: Iterable[type],
+        shapes: Iterable[str],
+        sizes: Iterable[int],
+        *,
+        fraction: float = 0.01,
+        repeat: int = 10,
+        verbose: bool = True) -> results.Results:
+  """Encode documents after changing a fraction of them
+
+  Args:
+    drivers: JSONDriver classes with the "encode_cached" capability
+    shapes: Names of document shapes, see data.SHAPES
+    sizes: Target document sizes in bytes
+    fraction: Fraction of top-level items changed before each encoding
+    repeat: Number of encodings of each measurement
+    verbose: True will print each measurement as it completes
+
+  Returns:
+    Results keyed by "driver/shape/size"
+  """
+  drivers = list(drivers)
+  out: results.Results = {}
+  for shape in shapes:
+    for size in sizes:
+      doc = data.generate(shape, size)
+      for driver in drivers:
+        # Plain children are copied into ObservedAutoDicts upon access
+        d = autodict.ObservedAutoDict(copy.deepcopy(doc))
+        m = measure(driver, d, fraction, repeat)
+        del d
+        key = f"{driver.__name__}/{shape}/{data.format_size(size)}"
+        out[key] = m
+        if verbose:
+          print(f"{key:40} {m['time'] * 1e3:10.3f}ms dumps "
+                f"{m['cached'] * 1e3:10.3f}ms cached "
+                f"{m['time'] / m['cached']:8.1f}x",
+                flush=True)
+  return out
+
+
+def main(argv: List[str] = None) -> int:
+  """Benchmark encoder caches from the command line
+
+  Args:
+    argv: Command line arguments, None will use sys.argv
+
+  Returns:
+    Exit code, 1 if a regression was found
+  """
+  parser = argparse.ArgumentParser(prog="python -m benchmarks.encoder_cache",
+                                   description=__doc__.splitlines()[0])
+  parser.add_argument("--drivers",
+                      nargs="+",
+                      help="Driver class names, default is every installed "
+                      "driver that supports encode_cached")
+  parser.add_argument("--shapes",
+                      nargs="+",
+                      default=["wide", "deep"],
+                      choices=list(data.SHAPES))
+  parser.add_argument("--sizes",
+                      nargs="+",
+                      default=["100K", "1M", "10M"],
+                      help="Document sizes from 1K to 1G")
+  parser.add_argument("--dirty",
+                      type=float,
+                      default=0.01,
+                      help="Fraction of top-level items changed per encoding")
+  parser.add_argument("--repeat", type=int, default=10)
+  parser.add_argument("--output", help="Path to write results JSON")
+  parser.add_argument("--baseline", help="Path to results JSON to compare")
+  parser.add_argument("--threshold",
+                      type=float,
+                      default=0.2,
+                      help="Allowed fractional slowdown versus baseline")
+  args = parser.parse_args(argv)
+
+  drivers = [
+      d for d in auto.installed_drivers() if auto.supports(d, "encode_cached")
+  ]
+  if args.drivers:
+    drivers = [d for d in drivers if d.__name__ in args.drivers]
+  sizes = [data.parse_size(s) for s in args.sizes]
+
+  out = run(drivers,
+            args.shapes,
+            sizes,
+            fraction=args.dirty,
+            repeat=args.repeat)
+  if args.output:
+    results.save(args.output, out)
+
+  if args.baseline is None:
+    return 0
+  baseline = results.load(args.baseline)
+  results.print_table(results.compare(baseline, out, metric="cached"))
+  slow = results.regressions(baseline, out, args.threshold, metric="cached")
+  if len(slow) == 0:
+    return 0
+  print(f"{len(slow)} regressions slower by more than {args.threshold:.0%}")
+  results.print_table(slow)
+  return 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
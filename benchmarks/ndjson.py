@@ -0,0 +1,157 @@
+"""Benchmark NDJSONAutoDict appends versus JSONAutoDict saves
+
+Typical usage:
+  python -m benchmarks.ndjson --batches 100 --batch-size 1000
+  python -m benchmarks.ndjson --drivers OrjsonDriver --output results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import sys
+import tempfile
+import time
+from typing import Iterable, List
+
+import autodict
+from autodict.json_drivers import auto
+
+from benchmarks import data, results
+
+
+def _records(n: int, seed: int = 0) -> List[dict]:
+  rng = random.Random(seed)
+  return [{
+      "name": data.gen_string(rng),
+      "value": rng.random(),
+      "count": i
+  } for i in range(n)]
+
+
+def ingest_save(driver: type, path: pathlib.Path, records: List[dict],
+                batches: int) -> float:
+  """Ingest batches of records into a JSONAutoDict saving after each batch
+
+  Args:
+    driver: JSONDriver class
+    path: Path to JSON file
+    records: Records of one batch
+    batches: Number of batches
+
+  Returns:
+    Duration in seconds
+  """
+  start = time.perf_counter()
+  d = autodict.JSONAutoDict(path, driver=driver, save_on_exit=False)
+  for i in range(batches):
+    batch = d[str(i)]
+    for j, record in enumerate(records):
+      batch[str(j)] = record
+    d.save()
+  return time.perf_counter() - start
+
+
+def ingest_append(driver: type, path: pathlib.Path, records: List[dict],
+                  batches: int) -> float:
+  """Ingest batches of records into a NDJSONAutoDict flushing after each batch
+
+  Args:
+    driver: JSONDriver class
+    path: Path to log file
+    records: Records of one batch
+    batches: Number of batches
+
+  Returns:
+    Duration in seconds
+  """
+  start = time.perf_counter()
+  with autodict.NDJSONAutoDict(path, driver=driver) as d:
+    for i in range(batches):
+      batch = d[str(i)]
+      for j, record in enumerate(records):
+        batch[str(j)] = record
+      d.flush()
+  return time.perf_counter() - start
+
+
+def run(drivers: Iterable[type],
+        batches: int,
+        batch_size: int,
+        verbose: bool = True) -> results.Results:
+  """Ingest records with every driver and storage
+
+  Args:
+    drivers: JSONDriver classes to benchmark
+    batches: Number of batches
+    batch_size: Number of records per batch
+    verbose: True will print each measurement as it completes
+
+  Returns:
+    Results keyed by "driver/storage", time is seconds per record
+  """
+  records = _records(batch_size)
+  n = batches * batch_size
+  out: results.Results = {}
+  with tempfile.TemporaryDirectory() as tmp:
+    tmp = pathlib.Path(tmp)
+    for driver in drivers:
+      for name, func in (("save", ingest_save), ("append", ingest_append)):
+        path = tmp.joinpath(f"{driver.__name__}_{name}.json")
+        elapsed = func(driver, path, records, batches)
+        key = f"{driver.__name__}/{name}"
+        out[key] = {"time": elapsed / n, "size": path.stat().st_size}
+        if verbose:
+          print(f"{key:40} {n / elapsed:12.0f} records/s "
+                f"{path.stat().st_size / (1 << 20):10.2f}MiB",
+                flush=True)
+  return out
+
+
+def main(argv: List[str] = None) -> int:
+  """Benchmark ingestion from the command line
+
+  Args:
+    argv: Command line arguments, None will use sys.argv
+
+  Returns:
+    Exit code, 1 if a regression was found
+  """
+  parser = argparse.ArgumentParser(prog="python -m benchmarks.ndjson",
+                                   description=__doc__.splitlines()[0])
+  parser.add_argument("--drivers",
+                      nargs="+",
+                      help="Driver class names, default is every installed")
+  parser.add_argument("--batches", type=int, default=100)
+  parser.add_argument("--batch-size", type=int, default=1000)
+  parser.add_argument("--output", help="Path to write results JSON")
+  parser.add_argument("--baseline", help="Path to results JSON to compare")
+  parser.add_argument("--threshold",
+                      type=float,
+                      default=0.2,
+                      help="Allowed fractional slowdown versus baseline")
+  args = parser.parse_args(argv)
+
+  drivers = auto.installed_drivers()
+  if args.drivers:
+    drivers = [d for d in drivers if d.__name__ in args.drivers]
+
+  out = run(drivers, args.batches, args.batch_size)
+  if args.output:
+    results.save(args.output, out)
+
+  if args.baseline is None:
+    return 0
+  baseline = results.load(args.baseline)
+  results.print_table(results.compare(baseline, out))
+  slow = results.regressions(baseline, out, args.threshold)
+  if len(slow) == 0:
+    return 0
+  print(f"{len(slow)} regressions slower by more than {args.threshold:.0%}")
+  results.print_table(slow)
+  return 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
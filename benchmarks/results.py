@@ -0,0 +1,134 @@
+"""Save, load, and compare benchmark results
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import pathlib
+import platform
+import subprocess
+from typing import Dict, List, Tuple, Union
+
+# Name of measurement: {"time": seconds, other metrics...}
+Results = Dict[str, Dict[str, float]]
+
+
+def git_revision() -> str:
+  """Get the current git revision
+
+  Returns:
+    Short hash with "+dirty" if there are uncommitted changes, or "unknown"
+  """
+  try:
+    rev = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                  stderr=subprocess.DEVNULL,
+                                  text=True).strip()
+    status = subprocess.check_output(
+        ["git", "status", "--porcelain", "--untracked-files=no"],
+        stderr=subprocess.DEVNULL,
+        text=True)
+  except (OSError, subprocess.CalledProcessError):
+    return "unknown"
+  if status.strip():
+    rev += "+dirty"
+  return rev
+
+
+def save(path: Union[str, pathlib.Path], results: Results) -> None:
+  """Save results with metadata
+
+  Args:
+    path: Path to JSON file
+    results: Benchmark results
+  """
+  doc = {
+      "meta": {
+          "revision": git_revision(),
+          "python": platform.python_version(),
+          "platform": platform.platform(),
+          "timestamp": datetime.datetime.now().isoformat(),
+      },
+      "results": results,
+  }
+  with open(path, "w", encoding="utf-8") as file:
+    json.dump(doc, file, indent=2)
+
+
+def load(path: Union[str, pathlib.Path]) -> Results:
+  """Load results
+
+  Args:
+    path: Path to JSON file written by save
+
+  Returns:
+    Benchmark results
+  """
+  with open(path, "r", encoding="utf-8") as file:
+    return json.load(file)["results"]
+
+
+def compare(baseline: Results,
+            current: Results,
+            metric: str = "time") -> List[Tuple[str, float, float, float]]:
+  """Compare a metric between two sets of results
+
+  Args:
+    baseline: Reference results
+    current: New results
+    metric: Name of metric to compare
+
+  Returns:
+    List of (name, baseline, current, current / baseline) for names in both
+  """
+  rows = []
+  for name, values in current.items():
+    if name not in baseline:
+      continue
+    old = baseline[name].get(metric)
+    new = values.get(metric)
+    if old is None or new is None:
+      continue
+    ratio = new / old if old > 0 else float("inf")
+    rows.append((name, old, new, ratio))
+  return rows
+
+
+def regressions(baseline: Results,
+                current: Results,
+                threshold: float,
+                metric: str = "time") -> List[Tuple[str, float, float, float]]:
+  """Find measurements that got worse by more than a threshold
+
+  Args:
+    baseline: Reference results
+    current: New results
+    threshold: Allowed fractional increase, 0.2 allows 20% slower
+    metric: Name of metric to compare
+
+  Returns:
+    List of (name, baseline, current, current / baseline) that regressed
+  """
+  return [
+      row for row in compare(baseline, current, metric=metric)
+      if row[3] > 1 + threshold
+  ]
+
+
+def print_table(rows: List[Tuple[str, float, float, float]],
+                old_label: str = "baseline",
+                new_label: str = "current") -> None:
+  """Print a comparison table
+
+  Args:
+    rows: Output of compare
+    old_label: Column header for baseline values
+    new_label: Column header for current values
+  """
+  if len(rows) == 0:
+    print("No common measurements")
+    return
+  n_pad = max(len(r[0]) for r in rows) + 1
+  print(f"{'name':{n_pad}} {old_label:>12} {new_label:>12} {'ratio':>7}")
+  for name, old, new, ratio in rows:
+    print(f"{name:{n_pad}} {old:12.6g} {new:12.6g} {ratio:7.3f}")
@@ -20,7 +20,7 @@ with open("README.md", encoding="utf-8") as file:
 required = []
 extras_require = {
     "test": ["coverage", "pylint"],
-    "extras": ["orjson", "ujson", "python-rapidjson", "simplejson"]
+    "extras": ["orjson", "ujson", "python-rapidjson", "simplejson", "msgpack"]
 }
 
 try:
@@ -23,7 +23,7 @@ class TestBase(unittest.TestCase):
   def __clean_test_root(self):
     if self._TEST_ROOT.exists():
       for f in self._TEST_ROOT.iterdir():
-        if f.is_file():
+        if f.is_file() or f.is_symlink():
           f.unlink()
         else:
           shutil.rmtree(f)
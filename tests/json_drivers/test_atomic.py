@@ -0,0 +1,121 @@
+"""Test module json_drivers.atomic
+"""
+
+import os
+import stat
+import time
+
+from tests import base
+
+import autodict
+from autodict.json_drivers import atomic
+
+
+class TestAtomic(base.TestBase):
+  """Test atomic
+  """
+
+  def test_check(self):
+    for durability in atomic.DURABILITIES:
+      self.assertEqual(atomic.check(durability), durability)
+    self.assertRaises(ValueError, atomic.check, "sync")
+
+  def test_fsync_dir(self):
+    atomic.fsync_dir(self._TEST_ROOT)
+
+  def test_signature(self):
+    path = self._TEST_ROOT.joinpath("a.json")
+    self.assertIsNone(atomic.signature(path))
+    path.write_bytes(b"a")
+    signature = atomic.signature(path)
+    self.assertEqual(atomic.signature(path), signature)
+    with atomic.open_atomic(path) as file:
+      file.write(b"a")
+    self.assertNotEqual(atomic.signature(path), signature)
+
+  def test_open_atomic(self):
+    path = self._TEST_ROOT.joinpath("a.json")
+    for durability in atomic.DURABILITIES:
+      with atomic.open_atomic(path, durability) as file:
+        file.write(durability.encode())
+      self.assertEqual(path.read_bytes(), durability.encode())
+    self.assertEqual([p.name for p in self._TEST_ROOT.iterdir()], ["a.json"])
+
+    # A failed write leaves the file intact
+    with self.assertRaises(KeyError):
+      with atomic.open_atomic(path) as file:
+        file.write(b"partial")
+        raise KeyError
+    self.assertEqual(path.read_bytes(), b"fsync_dir")
+    self.assertEqual([p.name for p in self._TEST_ROOT.iterdir()], ["a.json"])
+
+    # Except in place
+    with self.assertRaises(KeyError):
+      with atomic.open_atomic(path, "none") as file:
+        file.write(b"partial")
+        raise KeyError
+    self.assertEqual(path.read_bytes(), b"partial")
+
+    if os.name == "posix":
+      os.chmod(path, 0o600)
+      with atomic.open_atomic(path) as file:
+        file.write(b"mode")
+      self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+      # Links are kept, their target is replaced
+      link = self._TEST_ROOT.joinpath("link.json")
+      link.symlink_to(path.name)
+      for durability in atomic.DURABILITIES:
+        with atomic.open_atomic(link, durability) as file:
+          file.write(durability.encode())
+        self.assertTrue(link.is_symlink())
+        self.assertEqual(path.read_bytes(), durability.encode())
+      path.write_bytes(b"{}")
+      with autodict.JSONAutoDict(link) as d:
+        d["a"] = 1
+      self.assertTrue(link.is_symlink())
+      self.assertEqual(autodict.DefaultJSONDriver.load(path), {"a": 1})
+
+    self.assertRaises(ValueError, atomic.open_atomic(path, "sync").__enter__)
+
+  def test_json_auto_dict(self):
+    for name in ["basic.json", "basic.json.gz"]:
+      path = self._TEST_ROOT.joinpath(name)
+      for durability in atomic.DURABILITIES:
+        with autodict.JSONAutoDict(path, durability=durability) as d:
+          d[durability] = True
+      with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+        self.assertDictEqual(d, {k: True for k in atomic.DURABILITIES})
+
+    self.assertRaises(ValueError,
+                      autodict.JSONAutoDict,
+                      path,
+                      durability="sync")
+
+    # Encoding errors leave the file intact
+    class UnknownType:
+      pass
+
+    d = autodict.JSONAutoDict(path, save_on_exit=False)
+    d["unknown"] = UnknownType()
+    self.assertRaises(TypeError, d.save)
+    d.pop("unknown")
+    self.assertDictEqual(d, {k: True for k in atomic.DURABILITIES})
+    with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+      self.assertDictEqual(d, {k: True for k in atomic.DURABILITIES})
+
+  def test_speed_durability(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    n = 20
+    elapsed = {}
+    for durability in atomic.DURABILITIES:
+      d = autodict.JSONAutoDict(path,
+                                save_on_exit=False,
+                                durability=durability)
+      d["key"] = "value"
+      start = time.perf_counter()
+      for _ in range(n):
+        d.save()
+      elapsed[durability] = time.perf_counter() - start
+
+    self.log_speed(elapsed["fsync_dir"], elapsed["flush"])
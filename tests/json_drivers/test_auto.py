@@ -0,0 +1,85 @@
+"""Test module json_drivers.auto
+"""
+
+import decimal
+import importlib
+from unittest import mock
+
+from tests import base
+
+import autodict
+from autodict.json_drivers import auto, marshal, pickle
+
+
+class TestAuto(base.TestBase):
+  """Test best_driver and helpers
+  """
+
+  def test_installed_drivers(self):
+    drivers = auto.installed_drivers()
+    self.assertIn(autodict.DefaultJSONDriver, drivers)
+    self.assertIs(drivers[-1], autodict.DefaultJSONDriver)
+
+    real_import = importlib.import_module
+
+    def fake_import(name: str):
+      if name != "autodict.json_drivers.serialization":
+        raise ImportError(name)
+      return real_import(name)
+
+    with mock.patch.object(importlib, "import_module", fake_import):
+      drivers = auto.installed_drivers()
+    self.assertEqual(drivers, (autodict.DefaultJSONDriver,))
+
+    drivers = auto.installed_drivers(binary=True)
+    self.assertIs(drivers[0], auto.installed_drivers()[0])
+    self.assertIn(pickle.PickleDriver, drivers)
+
+  def test_driver_for_path(self):
+    self.assertIs(auto.driver_for_path("a.pickle"), pickle.PickleDriver)
+    self.assertIs(auto.driver_for_path("a.PKL"), pickle.PickleDriver)
+    self.assertIs(auto.driver_for_path("a.pkl.gz"), pickle.PickleDriver)
+    self.assertIs(auto.driver_for_path("dir/a.marshal"), marshal.MarshalDriver)
+    self.assertIsNone(auto.driver_for_path("a.json"))
+    self.assertIsNone(auto.driver_for_path("a.json.xz"))
+    self.assertIsNone(auto.driver_for_path("a.gz"))
+
+  def test_supports(self):
+    driver = autodict.DefaultJSONDriver
+    self.assertTrue(auto.supports(driver, "indent"))
+    self.assertFalse(auto.supports(driver, "unknown"))
+    self.assertTrue(auto.supports(driver, decimal.Decimal))
+
+    class UnknownType:
+      pass
+
+    self.assertFalse(auto.supports(driver, UnknownType))
+
+    class Driver(autodict.DefaultJSONDriver):
+      NATIVE_TYPES = (UnknownType,)
+
+    self.assertTrue(auto.supports(Driver, UnknownType))
+
+  def test_best_driver(self):
+    installed = auto.installed_drivers()
+    driver = autodict.best_driver()
+    self.assertIs(driver, installed[0])
+    self.assertIs(autodict.best_driver(), driver)
+
+    driver = autodict.best_driver(["indent", "lazy", decimal.Decimal])
+    self.assertIn("indent", driver.CAPABILITIES)
+
+    self.assertRaises(ValueError, autodict.best_driver, ["unknown"])
+
+  def test_json_auto_dict(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    with autodict.JSONAutoDict(path, driver="auto") as d:
+      d["key"] = "value"
+      self.assertIs(d._driver, autodict.best_driver())  # pylint: disable=protected-access
+
+    with autodict.JSONAutoDict(path, driver="auto", save_on_exit=False) as d:
+      self.assertDictEqual(d, {"key": "value"})
+
+    path = self._TEST_ROOT.joinpath("basic.pickle")
+    with autodict.JSONAutoDict(path, driver="auto") as d:
+      self.assertIs(d._driver, pickle.PickleDriver)  # pylint: disable=protected-access
@@ -1,13 +1,40 @@
 """Test module autodict
 """
 
+import asyncio
+import copy
 import datetime
+import gc
 import json
+import multiprocessing
+import pathlib
+import subprocess
+import sys
+import threading
+import time
+import unittest
 import uuid
+import weakref
+from unittest import mock
 
 from tests import base
 
 import autodict
+from autodict.json_drivers import cache, locking, pickle, serialization
+
+
+def _locking_worker(path: pathlib.Path, i: int, n: int) -> None:
+  """Save n changes to a file shared with other processes
+
+  Args:
+    path: Path to file
+    i: Index of worker
+    n: Number of changes
+  """
+  d = autodict.JSONAutoDict(path, locking=True, save_on_exit=False)
+  for j in range(n):
+    d["workers"][str(i)][str(j)] = j
+    d.save()
 
 
 class TestDefaultJSONDriver(base.TestBase):
@@ -96,6 +123,143 @@ class TestDefaultJSONDriver(base.TestBase):
     s = autodict.DefaultJSONDriver.dumps(self.JSON_BASIC, indent=2)
     json.loads(s)  # No JSON errors
 
+  def test_iterencode(self):
+    driver = autodict.DefaultJSONDriver
+    for obj in [self.JSON_BASIC, [1, {"a": 2}, []], {}, {"a": 1}, 5]:
+      for indent in [None, 0, 2]:
+        target = driver.dumps(obj, indent=indent).encode()
+        for chunk_size in [1, 1 << 16]:
+          pieces = list(
+              driver.iterencode(obj, indent=indent, chunk_size=chunk_size))
+          self.assertEqual(b"".join(pieces), target)
+
+    # Small members are batched
+    d = {f"key{i}": i for i in range(1000)}
+    self.assertLess(len(list(driver.iterencode(d))), 50)
+    self.assertEqual(len(list(driver.iterencode(d, chunk_size=1))), 2001)
+
+    # Formats encoded at once are split into chunks
+    driver = pickle.PickleDriver
+    target = driver.dumps(d)
+    pieces = list(driver.iterencode(d, chunk_size=1000))
+    self.assertEqual(b"".join(pieces), target)
+    self.assertEqual([len(s) for s in pieces[:-1]],
+                     [1000] * (len(target) // 1000))
+    self.assertEqual(list(driver.iterencode(d)), [target])
+
+  def test_iterdump(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    target = autodict.DefaultJSONDriver.dumps(self.JSON_BASIC, indent=2)
+
+    autodict.DefaultJSONDriver.iterdump(self.JSON_BASIC,
+                                        path,
+                                        indent=2,
+                                        chunk_size=16)
+    with open(path, "r", encoding="utf-8") as file:
+      self.assertEqual(file.read(), target)
+
+    class Writer:
+
+      def __init__(self) -> None:
+        self.writes = []
+
+      def write(self, b: bytes) -> None:
+        self.writes.append(b)
+
+    writer = Writer()
+    autodict.DefaultJSONDriver.iterdump(self.JSON_BASIC,
+                                        writer,
+                                        indent=2,
+                                        chunk_size=64)
+    self.assertEqual(b"".join(writer.writes).decode(), target)
+    self.assertGreater(len(writer.writes), 1)
+    for b in writer.writes[:-1]:
+      self.assertGreaterEqual(len(b), 64)
+
+    with open(path, "w", encoding="utf-8") as file:
+      autodict.DefaultJSONDriver.iterdump(self.JSON_BASIC, file, chunk_size=1)
+    with open(path, "r", encoding="utf-8") as file:
+      self.assertEqual(file.read(),
+                       autodict.DefaultJSONDriver.dumps(self.JSON_BASIC))
+
+  def test_encode_cached(self):
+    driver = autodict.DefaultJSONDriver
+    d = autodict.ObservedAutoDict(copy.deepcopy(self.JSON_BASIC))
+    d["plain"] = {"a": {"b": 1}}
+    d[2] = {"int": "key"}
+    self.assertEqual(driver.encode_cached(d), driver.dumps(d).encode())
+    self.assertIsInstance(d["child"], autodict.ObservedAutoDict)
+    encoding = d._encoded  # pylint: disable=protected-access
+    self.assertEqual(encoding.members["plain"], b'"plain": {"a": {"b": 1}}')
+    self.assertEqual(encoding.dirty, set())
+    # Members holding lists are encoded every time
+    self.assertEqual(encoding.volatile, {"list"} | {2})
+    d["list"][3]["num"] = 6
+    self.assertEqual(driver.encode_cached(d), driver.dumps(d).encode())
+
+    # Mutations invalidate the member of every ancestor
+    d["plain"]["a"]["c"] = 2
+    self.assertEqual(encoding.dirty, {"plain"})
+    self.assertEqual(d["plain"]._encoded.dirty, {"a"})  # pylint: disable=protected-access
+    self.assertEqual(driver.encode_cached(d), driver.dumps(d).encode())
+    d["plain"].pop("a")
+    d["child"].clear()
+    d["new"] = 1
+    self.assertEqual(driver.encode_cached(d), driver.dumps(d).encode())
+    del d["new"]
+    d.popitem()
+    self.assertEqual(driver.encode_cached(d), driver.dumps(d).encode())
+    d.clear()
+    d["a"]["b"] = 1
+    self.assertEqual(driver.encode_cached(d), driver.dumps(d).encode())
+
+    # A child under two keys only notifies the key it is linked to
+    d["x"] = d["a"]
+    self.assertEqual(driver.encode_cached(d), driver.dumps(d).encode())
+    d["a"]["b"] = 2
+    self.assertEqual(driver.encode_cached(d), driver.dumps(d).encode())
+    d["x"]["b"] = 3
+    self.assertEqual(driver.encode_cached(d), driver.dumps(d).encode())
+
+    # Copies are not cached
+    self.assertIsNone(copy.deepcopy(d)["child"]._encoded)  # pylint: disable=protected-access
+
+    for obj in [{}, {"a": {"b": 1}}, [1, {"a": 2}], 5]:
+      self.assertEqual(driver.encode_cached(obj), driver.dumps(obj).encode())
+
+  def test_upgrade_dicts(self):
+    key = self.gen_string()
+    value = self.gen_string()
+    d = {key: value, "list": [[{key: value}], {key: {key: value}}]}
+
+    result = autodict.DefaultJSONDriver.upgrade_dicts(d)
+    self.assertIsInstance(result, autodict.AutoDict)
+    self.assertDictEqual(result, d)
+    self.assertIsInstance(result["list"][0][0], autodict.AutoDict)
+    self.assertIsInstance(result["list"][1], autodict.AutoDict)
+    self.assertIsInstance(result["list"][1][key], autodict.AutoDict)
+
+    l = [d]
+    result = autodict.DefaultJSONDriver.upgrade_dicts(l)
+    self.assertIs(result, l)
+    self.assertIsInstance(result[0], autodict.AutoDict)
+
+    self.assertEqual(autodict.DefaultJSONDriver.upgrade_dicts(key), key)
+
+  def test_gc_paused(self):
+    self.assertTrue(gc.isenabled())
+    with serialization.gc_paused():
+      self.assertFalse(gc.isenabled())
+    self.assertTrue(gc.isenabled())
+
+    gc.disable()
+    try:
+      with serialization.gc_paused():
+        self.assertFalse(gc.isenabled())
+      self.assertFalse(gc.isenabled())
+    finally:
+      gc.enable()
+
   def test_object_hook(self):
     key = self.gen_string()
     value = self.gen_string()
@@ -129,6 +293,57 @@ class TestDefaultJSONDriver(base.TestBase):
       self.assertIsInstance(d, autodict.AutoDict)
       self.assertDictEqual(self.JSON_BASIC_DESERIALIZED, d)
 
+    b = path.read_bytes()
+    for s in [b, bytearray(b), memoryview(b)]:
+      d = autodict.DefaultJSONDriver.loads(s)
+      self.assertDictEqual(self.JSON_BASIC_DESERIALIZED, d)
+
+  def test_mapped(self):
+    path = self._DATA_ROOT.joinpath("basic.json")
+    with serialization.mapped(path) as view:
+      self.assertIsInstance(view, memoryview)
+      self.assertEqual(view, path.read_bytes())
+
+    path = self._TEST_ROOT.joinpath("empty.json")
+    path.touch()
+    with serialization.mapped(str(path)) as view:
+      self.assertEqual(len(view), 0)
+
+  def test_iterload(self):
+    path = self._DATA_ROOT.joinpath("basic.json")
+
+    items = dict(autodict.DefaultJSONDriver.iterload(path, chunk_size=16))
+    self.assertDictEqual(
+        items, {(k,): v for k, v in self.JSON_BASIC_DESERIALIZED.items()})
+    self.assertIsInstance(items[("child",)], autodict.AutoDict)
+    self.assertIsInstance(items[("list",)][3], autodict.AutoDict)
+
+    items = list(
+        autodict.DefaultJSONDriver.iterload(path, prefix=["list"], keys={3}))
+    self.assertListEqual(items, [(("list", 3), {"num": 5})])
+
+    with open(path, "r", encoding="utf-8") as file:
+      items = list(
+          autodict.DefaultJSONDriver.iterload(file, keys={"child"}, lazy=True))
+    self.assertListEqual(items, [(("child",), {"name": "Plain"})])
+    self.assertIsInstance(items[0][1], autodict.LazyAutoDict)
+
+  def test_load_lazy(self):
+    path = self._DATA_ROOT.joinpath("basic.json")
+
+    d = autodict.DefaultJSONDriver.load(path, lazy=True)
+    self.assertIsInstance(d, autodict.LazyAutoDict)
+    self.assertDictEqual(self.JSON_BASIC_DESERIALIZED, d)
+    self.assertIs(type(dict.__getitem__(d, "child")), dict)
+    self.assertIsInstance(d["child"], autodict.LazyAutoDict)
+
+    with open(path, "r", encoding="utf-8") as file:
+      d = autodict.DefaultJSONDriver.loads(file.read(), lazy=True)
+      self.assertIsInstance(d, autodict.LazyAutoDict)
+      self.assertDictEqual(self.JSON_BASIC_DESERIALIZED, d)
+
+    self.assertEqual(autodict.DefaultJSONDriver.loads("[{}]", lazy=True), [{}])
+
 
 class TestJSONAutoDict(base.TestBase):
   """Test JSONAutoDict
@@ -140,6 +355,7 @@ class TestJSONAutoDict(base.TestBase):
     with autodict.JSONAutoDict(path, save_on_exit=False) as d:
       self.assertIsInstance(d, autodict.AutoDict)
       self.assertIsInstance(d, autodict.JSONAutoDict)
+      self.assertNotIsInstance(d, autodict.LazyAutoDict)
 
       self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
 
@@ -158,6 +374,41 @@ class TestJSONAutoDict(base.TestBase):
       self.assertIsInstance(d, autodict.AutoDict)
       self.assertDictEqual({}, d)
 
+  def test_init_lazy_children(self):
+    path = self._DATA_ROOT.joinpath("basic.json")
+
+    with autodict.JSONAutoDict(path, save_on_exit=False,
+                               lazy_children=True) as d:
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+      self.assertIsInstance(d, autodict.LazyAutoDict)
+      self.assertIsInstance(d, autodict.JSONAutoDict)
+      self.assertNotIsInstance(d, autodict.ObservedAutoDict)
+      self.assertIs(type(dict.__getitem__(d, "child")), dict)
+      d["child"]["a"]["b"] = "c"
+      self.assertIsInstance(d["child"], autodict.LazyAutoDict)
+      self.assertEqual(d["child"]["a"], {"b": "c"})
+
+  def test_init_keys(self):
+    path = self._DATA_ROOT.joinpath("basic.json")
+
+    with autodict.JSONAutoDict(path, keys=["child", "name"]) as d:
+      self.assertDictEqual(d, {
+          "child": {
+              "name": "Plain"
+          },
+          "name": "Whoami"
+      })
+      self.assertIsInstance(d["child"], autodict.AutoDict)
+      self.assertRaises(ValueError, d.save)
+
+    with autodict.JSONAutoDict(path, keys=["child"], lazy_children=True) as d:
+      self.assertDictEqual(d, {"child": {"name": "Plain"}})
+
+    path = self._TEST_ROOT.joinpath("does not exist.json")
+    with autodict.JSONAutoDict(path, keys=["child"]) as d:
+      self.assertDictEqual(d, {})
+    self.assertFalse(path.exists())
+
   def test_save(self):
     path = self._TEST_ROOT.joinpath("basic.json")
     with autodict.JSONAutoDict(path,
@@ -214,6 +465,661 @@ class TestJSONAutoDict(base.TestBase):
       s = file.read()
       self.assertNotIn("\n", s)
 
+    # Children do not keep their parent alive, saved without collection
+    gc.disable()
+    try:
+      for kwargs in [{}, {"encoder_cache": True}, {"lazy_children": True}]:
+        path.unlink()
+        d = autodict.JSONAutoDict(path, **kwargs)
+        d["a"]["b"] = 1
+        child = d["a"]
+        del d
+        self.assertDictEqual(autodict.DefaultJSONDriver.load(path),
+                             {"a": {"b": 1}})
+        del child
+    finally:
+      gc.enable()
+
+  def test_async(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+
+    # asyncio is imported upon first use
+    code = ("import sys, autodict\n"
+            "sys.exit('asyncio' in sys.modules or "
+            "'concurrent.futures' in sys.modules)")
+    self.assertEqual(subprocess.run([sys.executable, "-c", code],
+                                    check=False).returncode, 0)
+
+    async def run() -> None:
+      async with await autodict.JSONAutoDict.open(path) as d:
+        self.assertIsInstance(d, autodict.JSONAutoDict)
+        self.assertDictEqual(d, {})
+        d["a"]["b"] = 1
+
+      d = await autodict.JSONAutoDict.open(path,
+                                           save_on_exit=False,
+                                           lazy_children=True)
+      self.assertDictEqual(d, {"a": {"b": 1}})
+      self.assertIs(type(dict.__getitem__(d, "a")), dict)
+      d["c"] = 2
+      await d.asave(indent=2)
+      with open(path, "r", encoding="utf-8") as file:
+        self.assertEqual(json.loads(file.read()), {"a": {"b": 1}, "c": 2})
+
+      d = await autodict.JSONAutoDict.open(path, keys=["a"])
+      with self.assertRaises(ValueError):
+        await d.asave()
+
+    asyncio.run(run())
+
+  def test_async_coalesce(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    dumped = []
+    release = threading.Event()
+
+    class Driver(autodict.DefaultJSONDriver):
+
+      @classmethod
+      def dump(cls, obj, fp, indent=None):
+        dumped.append(dict(obj))
+        release.wait()
+        super().dump(obj, fp, indent=indent)
+
+    async def run() -> None:
+      d = autodict.JSONAutoDict(path, save_on_exit=False, driver=Driver)
+      saves = []
+      for i in range(10):
+        d["i"] = i
+        saves.append(asyncio.ensure_future(d.asave()))
+        await asyncio.sleep(0)
+      release.set()
+      await asyncio.gather(*saves)
+
+      # The first save blocks the others which coalesce into one
+      self.assertEqual(dumped, [{"i": 0}, {"i": 9}])
+      with open(path, "r", encoding="utf-8") as file:
+        self.assertEqual(json.loads(file.read()), {"i": 9})
+
+      # Errors are raised to the caller that started the save
+      d._driver = None  # pylint: disable=protected-access
+      with self.assertRaises(AttributeError):
+        await d.asave()
+      d._driver = Driver  # pylint: disable=protected-access
+      await d.asave()
+      self.assertEqual(len(dumped), 3)
+
+    asyncio.run(run())
+
+  def _wait_for(self, condition) -> None:
+    event = threading.Event()
+    for _ in range(500):
+      if condition():
+        return
+      event.wait(0.01)
+    self.fail("Timed out")
+
+  def test_autosave_interval(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+
+    d = autodict.JSONAutoDict(path, save_on_exit=False, autosave_interval=0.01)
+    self.assertEqual(d.save_stats["saves"], 0)
+    d["a"]["b"] = 1
+    self._wait_for(lambda: d.save_stats["saves"] == 1)
+    self.assertEqual(d.save_stats["pending_changes"], 0)
+    self.assertDictEqual(autodict.DefaultJSONDriver.load(path), {"a": {"b": 1}})
+
+    # Unchanged trees are not saved
+    with d.lock:
+      d["c"] = [1, 2]
+      d["a"].pop("b")
+    self._wait_for(lambda: d.save_stats["saves"] == 2)
+    self.assertDictEqual(autodict.DefaultJSONDriver.load(path), {
+        "a": {},
+        "c": [1, 2]
+    })
+    stats = d.save_stats
+    self.assertGreater(stats["max_seconds"], 0)
+    self.assertGreaterEqual(stats["total_seconds"], stats["last_seconds"])
+    self.assertGreater(stats["snapshot_seconds"], 0)
+
+    # Thread does not keep the object alive
+    ref = weakref.ref(d)
+    del d
+    gc.collect()
+    self.assertIsNone(ref())
+
+    with autodict.JSONAutoDict(path,
+                               autosave_interval=0.01,
+                               autosave_min_changes=3) as d:
+      d["x"] = 1
+      d["y"] = 2
+      self.assertEqual(d.save_stats["pending_changes"], 2)
+      threading.Event().wait(0.05)
+      self.assertEqual(d.save_stats["saves"], 0)
+      d.flush()
+      self.assertEqual(d.save_stats["saves"], 1)
+      self.assertEqual(d.save_stats["pending_changes"], 0)
+      d.flush()
+      self.assertEqual(d.save_stats["saves"], 1)
+      d_copy = copy.copy(d)
+      self.assertEqual(d_copy, d)
+      self.assertIsNot(d_copy.lock, d.lock)
+    self.assertDictEqual(autodict.DefaultJSONDriver.load(path), {
+        "a": {},
+        "c": [1, 2],
+        "x": 1,
+        "y": 2
+    })
+
+    self.assertRaises(ValueError,
+                      autodict.JSONAutoDict,
+                      path,
+                      keys=["a"],
+                      autosave_interval=1)
+
+  def test_speed_flush(self):
+    path = self._TEST_ROOT.joinpath("basic_large.json")
+
+    with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+      n = 5000
+      for i in range(n):
+        d[str(i)] = TestDefaultJSONDriver.JSON_BASIC
+
+      start = time.perf_counter()
+      d.save()
+      elapsed_save = time.perf_counter() - start
+
+      # Writers are only blocked while copying
+      d["key"] = "value"
+      d.flush()
+      elapsed_blocked = d.save_stats["snapshot_seconds"]
+
+    self.log_speed(elapsed_save, elapsed_blocked)
+
+  def test_journal(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    journal = self._TEST_ROOT.joinpath("basic.json.journal")
+
+    with autodict.JSONAutoDict(path) as d:
+      d["a"]["b"] = 1
+      d["c"] = [1, 2]
+
+    with autodict.JSONAutoDict(path, journal=True) as d:
+      d["a"]["d"]["e"] = 2
+      d.pop("c")
+      d["f"] = "value"
+      self.assertFalse(journal.exists())
+      d.save()
+      self.assertEqual(d.save_stats["pending_changes"], 0)
+      size = journal.stat().st_size
+      d.save()
+      self.assertEqual(journal.stat().st_size, size)
+      d["f"] = "new"
+    # Snapshot is untouched, the journal has every change
+    self.assertDictEqual(autodict.DefaultJSONDriver.load(path), {
+        "a": {
+            "b": 1
+        },
+        "c": [1, 2]
+    })
+    expected = {"a": {"b": 1, "d": {"e": 2}}, "f": "new"}
+    with autodict.JSONAutoDict(path, journal=True) as d:
+      self.assertDictEqual(d, expected)
+      self.assertIsInstance(d["a"]["d"], autodict.ObservedAutoDict)
+      d.clear()
+      d["g"] = 3
+      d.save()
+      d_copy = copy.deepcopy(d)
+      self.assertEqual(d_copy, d)
+      d_copy["h"] = 4
+      del d_copy
+    with autodict.JSONAutoDict(path, journal=True, save_on_exit=False) as d:
+      self.assertDictEqual(d, {"g": 3})
+      d["unsaved"] = True
+    with autodict.JSONAutoDict(path, journal=True) as d:
+      self.assertDictEqual(d, {"g": 3})
+
+    self.assertRaises(ValueError,
+                      autodict.JSONAutoDict,
+                      path,
+                      keys=["g"],
+                      journal=True)
+
+  def test_journal_compact(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    journal = self._TEST_ROOT.joinpath("basic.json.journal")
+
+    with autodict.JSONAutoDict(path, journal=True,
+                               journal_threshold=1000) as d:
+      for i in range(100):
+        d[str(i)]["i"] = i
+        d.save()
+      expected = dict(d)
+      self._wait_for(lambda: not any(
+          p.name.startswith("basic.json.journal.")
+          for p in self._TEST_ROOT.iterdir()))
+    self.assertGreater(len(autodict.DefaultJSONDriver.load(path)), 50)
+    with autodict.JSONAutoDict(path, journal=True) as d:
+      self.assertDictEqual(d, expected)
+
+    # A compaction interrupted after writing the snapshot left the rotated
+    # journal, its records are applied again
+    with autodict.JSONAutoDict(path, journal=True) as d:
+      d["x"] = {"y": 1}
+      d["x"] = 5
+      d["z"] = [1]
+    journal.rename(journal.with_name("basic.json.journal.0"))
+    with autodict.JSONAutoDict(path) as d:
+      d["x"] = 5
+      d["z"] = [1]
+    expected.update(x=5, z=[1])
+    with autodict.JSONAutoDict(path, journal=True) as d:
+      self.assertDictEqual(d, expected)
+    self.assertEqual([p.name for p in self._TEST_ROOT.iterdir()],
+                     ["basic.json"])
+    self.assertDictEqual(autodict.DefaultJSONDriver.load(path), expected)
+
+  def test_speed_journal(self):
+    n = 5000
+    n_saves = 20
+    elapsed = []
+    for journal in [False, True]:
+      path = self._TEST_ROOT.joinpath(f"journal_{journal}.json")
+      with autodict.JSONAutoDict(path, journal=journal) as d:
+        for i in range(n):
+          d[str(i)] = TestDefaultJSONDriver.JSON_BASIC
+        d.save()
+        start = time.perf_counter()
+        for i in range(n_saves):
+          d[f"changed{i}"] = i
+          d.save()
+        elapsed.append(time.perf_counter() - start)
+
+    self.log_speed(elapsed[0], elapsed[1])
+
+  def test_encoder_cache(self):
+    for name in ["basic.json", "basic.json.gz"]:
+      path = self._TEST_ROOT.joinpath(name)
+      with autodict.JSONAutoDict(path, encoder_cache=True) as d:
+        d["a"]["b"] = 1
+        d["c"] = {"d": [1, 2]}
+        d.save()
+        d["a"]["e"] = 2
+      with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+        self.assertDictEqual(d, {"a": {"b": 1, "e": 2}, "c": {"d": [1, 2]}})
+
+    self.assertRaises(ValueError,
+                      autodict.JSONAutoDict,
+                      self._TEST_ROOT.joinpath("basic.pickle"),
+                      encoder_cache=True)
+
+  def test_speed_encoder_cache(self):
+    n = 5000
+    n_saves = 5
+    elapsed = []
+    for encoder_cache in [False, True]:
+      path = self._TEST_ROOT.joinpath(f"cache_{encoder_cache}.json")
+      with autodict.JSONAutoDict(path,
+                                 save_on_exit=False,
+                                 encoder_cache=encoder_cache) as d:
+        for i in range(n):
+          d[str(i)] = {"name": self.gen_string(), "child": {"i": i}}
+        d.save()
+        start = time.perf_counter()
+        for i in range(n_saves):
+          # 1% of top-level items change between saves
+          for j in range(i, n, 100):
+            d[str(j)]["child"]["i"] = -j
+          d.save()
+        elapsed.append(time.perf_counter() - start)
+
+    self.log_speed(elapsed[0], elapsed[1])
+
+  def test_lazy(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+
+    # Nothing to load
+    with autodict.JSONAutoDict(path, lazy=True) as d:
+      self.assertTrue(d.loaded)
+      d["a"]["b"] = 1
+      d["c"] = [1, 2]
+    expected = {"a": {"b": 1}, "c": [1, 2]}
+
+    d = autodict.JSONAutoDict(path, lazy=True)
+    self.assertFalse(d.loaded)
+    self.assertIsInstance(d, autodict.JSONAutoDict)
+    self.assertEqual(d["a"], {"b": 1})
+    self.assertTrue(d.loaded)
+    self.assertIs(type(d), autodict.JSONAutoDict)
+
+    for load in [
+        len, list, repr, copy.copy, copy.deepcopy, lambda d: d.items(),
+        lambda d: "a" in d, lambda d: ["a", "b"] in d, lambda d: d == {},
+        lambda d: d.get("a"), lambda d: d.pop("c"), lambda d: d.update(x=1),
+        lambda d: d.setdefault("a"), lambda d: d.clear()
+    ]:
+      d = autodict.JSONAutoDict(path, lazy=True, save_on_exit=False)
+      load(d)
+      self.assertTrue(d.loaded)
+    if sys.version_info >= (3, 9):
+      d = autodict.JSONAutoDict(path, lazy=True, save_on_exit=False)
+      self.assertDictEqual({} | d, expected)
+    d = autodict.JSONAutoDict(path, lazy=True, save_on_exit=False)
+    self.assertDictEqual(d, expected)
+    self.assertIsNone(d.save_stats["pending_changes"])
+
+    # Saving before any access writes the file's contents
+    for save in [lambda d: d.save(), lambda d: d.flush()]:
+      d = autodict.JSONAutoDict(path, lazy=True, save_on_exit=False)
+      save(d)
+      self.assertTrue(d.loaded)
+      self.assertDictEqual(autodict.DefaultJSONDriver.load(path), expected)
+
+    # Closing before any access does not load nor save
+    mtime = path.stat().st_mtime_ns
+    with autodict.JSONAutoDict(path, lazy=True) as d:
+      pass
+    self.assertFalse(d.loaded)
+    d = autodict.JSONAutoDict(path, lazy=True)
+    del d
+    self.assertEqual(path.stat().st_mtime_ns, mtime)
+
+    with autodict.JSONAutoDict(path, lazy=True, journal=True) as d:
+      d["a"]["b"] = 2
+    with autodict.JSONAutoDict(path, lazy=True, journal=True) as d:
+      self.assertEqual(d["a"]["b"], 2)
+      self.assertEqual(d.save_stats["pending_changes"], 0)
+
+    # Errors are raised upon each access
+    path.write_text("{", encoding="utf-8")
+    d = autodict.JSONAutoDict(path, lazy=True, save_on_exit=False)
+    self.assertRaises(ValueError, d.get, "a")
+    self.assertRaises(ValueError, d.get, "a")
+
+  def test_speed_lazy(self):
+    path = self._TEST_ROOT.joinpath("basic_large.json")
+    with autodict.JSONAutoDict(path) as d:
+      for i in range(5000):
+        d[str(i)] = TestDefaultJSONDriver.JSON_BASIC
+
+    start = time.perf_counter()
+    autodict.JSONAutoDict(path, save_on_exit=False)
+    elapsed_eager = time.perf_counter() - start
+
+    start = time.perf_counter()
+    autodict.JSONAutoDict(path, save_on_exit=False, lazy=True)
+    elapsed_lazy = time.perf_counter() - start
+
+    self.log_speed(elapsed_eager, elapsed_lazy)
+
+  @unittest.skipIf(locking.fcntl is None, "fcntl is not available")
+  def test_locking(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    self.assertRaises(ValueError,
+                      autodict.JSONAutoDict,
+                      path,
+                      locking=True,
+                      journal=True)
+    self.assertRaises(ValueError,
+                      autodict.JSONAutoDict,
+                      path,
+                      locking=True,
+                      durability="none")
+
+    with autodict.JSONAutoDict(path, locking=True) as d:
+      d["a"]["b"] = 1
+      d["c"] = [1, 2]
+      d["d"] = 1
+    self.assertTrue(path.with_name("basic.json.lock").exists())
+
+    a = autodict.JSONAutoDict(path, locking=True, save_on_exit=False)
+    b = autodict.JSONAutoDict(path, locking=True, save_on_exit=False)
+    a["a"]["x"] = "a"
+    a["c"].append(3)
+    a["new"]["y"] = "a"
+    del a["d"]
+    b["a"]["z"] = "b"
+    b["c"] = [4]
+    b["new"]["y"] = "b"
+    b["new"]["z"] = "b"
+    child = a["a"]
+    a.save()
+    b.save()
+    expected = {
+        "a": {"b": 1, "x": "a", "z": "b"},
+        "c": [4],
+        "new": {"y": "b", "z": "b"}
+    }
+    self.assertDictEqual(b, expected)
+    with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+      self.assertDictEqual(d, expected)
+
+    # Saving reads the other's changes, replacing the previous children
+    a.save()
+    self.assertDictEqual(a, expected)
+    self.assertIsNot(a["a"], child)
+    a["a"].clear()
+    a["a"]["only"] = True
+    b["a"]["b"] = 2
+    b.save()
+    a.save()
+    b.save()
+    expected["a"] = {"only": True}
+    self.assertDictEqual(b, expected)
+
+    # Deleting then setting an empty dict replaces it
+    del a["new"]
+    a["new"] = {}
+    a.save()
+    self.assertDictEqual(a["new"], {})
+
+    # Copies do not lock
+    c = copy.deepcopy(a)
+    self.assertDictEqual(c, a)
+    c["new"] = 1
+    del c
+
+    # Workers in other processes, spawned since forked ones would inherit
+    # unreachable JSONAutoDicts of other tests that save upon collection
+    n = 4
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_locking_worker, args=(path, i, 10))
+        for i in range(n)
+    ]
+    for worker in workers:
+      worker.start()
+    for worker in workers:
+      worker.join()
+      self.assertEqual(worker.exitcode, 0)
+    with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+      self.assertEqual(len(d["workers"]), n)
+      for i in range(n):
+        self.assertEqual(d["workers"][str(i)], {str(j): j for j in range(10)})
+
+  @unittest.skipIf(locking.fcntl is None, "fcntl is not available")
+  def test_speed_locking(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    n = 2000
+    n_saves = 20
+    records = {str(i): {"name": self.gen_string(), "i": i} for i in range(n)}
+    with autodict.JSONAutoDict(path) as d:
+      d.update(records)
+
+    # Serialized workers load, update, and save under a global lock
+    start = time.perf_counter()
+    for i in range(n_saves):
+      with autodict.JSONAutoDict(path) as d:
+        d[str(i)]["i"] = -i
+    elapsed_reload = time.perf_counter() - start
+
+    # Only read again when another process saved
+    d = autodict.JSONAutoDict(path, locking=True, save_on_exit=False)
+    start = time.perf_counter()
+    for i in range(n_saves):
+      d[str(i)]["i"] = i
+      d.save()
+    elapsed_locking = time.perf_counter() - start
+
+    self.log_speed(elapsed_reload, elapsed_locking)
+
+  def test_refresh(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    with autodict.JSONAutoDict(path) as d:
+      d["a"]["b"] = 1
+      d["c"] = [1, 2]
+      d["d"] = "same"
+
+    d = autodict.JSONAutoDict(path, save_on_exit=False)
+    reloads = []
+    d.add_reload_callback(reloads.append)
+    self.assertEqual(d.refresh(), frozenset())
+    child = d["a"]
+
+    with autodict.JSONAutoDict(path) as other:
+      other["a"]["b"] = 2
+      del other["c"]
+      other["e"] = 3
+    d["x"] = "unsaved"
+    self.assertEqual(d.refresh(), frozenset(["a", "c", "e", "x"]))
+    self.assertEqual(reloads, [frozenset(["a", "c", "e", "x"])])
+    self.assertDictEqual(d, {"a": {"b": 2}, "d": "same", "e": 3})
+    self.assertEqual(child, {"b": 1})
+    child["b"] = 0
+    self.assertEqual(d["a"]["b"], 2)
+    self.assertEqual(d.refresh(), frozenset())
+
+    # Own saves are not read again, rewriting the same contents reports none
+    d["f"] = 4
+    d.save()
+    self.assertEqual(d.refresh(), frozenset())
+    with autodict.JSONAutoDict(path) as other:
+      other["f"] = 4
+    self.assertEqual(d.refresh(), frozenset())
+    self.assertEqual(len(reloads), 1)
+    d.remove_reload_callback(reloads.append)
+    self.assertRaises(ValueError, d.remove_reload_callback, reloads.append)
+
+    # Missing file keeps the contents
+    path.unlink()
+    self.assertEqual(d.refresh(), frozenset())
+    self.assertEqual(d["f"], 4)
+
+    self.assertRaises(ValueError,
+                      autodict.JSONAutoDict,
+                      path,
+                      reload_check_interval=1,
+                      journal=True)
+    d = autodict.JSONAutoDict(path, keys=["a"])
+    self.assertRaises(ValueError, d.refresh)
+
+    # Files are read into memory rather than mapped
+    path = self._TEST_ROOT.joinpath("basic.pickle")
+    with autodict.JSONAutoDict(path) as d:
+      d["a"] = 1
+    d = autodict.JSONAutoDict(path, save_on_exit=False)
+    with autodict.JSONAutoDict(path) as other:
+      other["a"] = 2
+    with mock.patch.object(serialization, "mapped", side_effect=AssertionError):
+      self.assertEqual(d.refresh(), frozenset(["a"]))
+    self.assertEqual(d["a"], 2)
+
+  def test_reload_check_interval(self):
+    path = self._TEST_ROOT.joinpath("basic.json")
+    with autodict.JSONAutoDict(path) as d:
+      d["a"] = 1
+
+    d = autodict.JSONAutoDict(path,
+                              save_on_exit=False,
+                              reload_check_interval=0.01)
+    reloads = []
+    d.add_reload_callback(reloads.append)
+    with autodict.JSONAutoDict(path) as other:
+      other["a"] = 2
+    self._wait_for(lambda: len(reloads) == 1)
+    self.assertEqual(d["a"], 2)
+
+    # Partial files are retried
+    path.write_text('{"a": ', encoding="utf-8")
+    threading.Event().wait(0.05)
+    self.assertEqual(d["a"], 2)
+    path.write_text('{"a": 3}', encoding="utf-8")
+    self._wait_for(lambda: len(reloads) == 2)
+    self.assertEqual(d["a"], 3)
+
+    # Thread does not keep the object alive
+    ref = weakref.ref(d)
+    del d
+    gc.collect()
+    self.assertIsNone(ref())
+
+  def test_speed_refresh(self):
+    path = self._TEST_ROOT.joinpath("basic_large.json")
+    with autodict.JSONAutoDict(path) as d:
+      for i in range(1000):
+        d[str(i)] = TestDefaultJSONDriver.JSON_BASIC
+    n = 20
+
+    # Reloading on a timer parses the unchanged file every time
+    start = time.perf_counter()
+    for _ in range(n):
+      autodict.JSONAutoDict(path, save_on_exit=False)
+    elapsed_reload = time.perf_counter() - start
+
+    d = autodict.JSONAutoDict(path, save_on_exit=False)
+    start = time.perf_counter()
+    for _ in range(n):
+      d.refresh()
+    elapsed_refresh = time.perf_counter() - start
+
+    self.log_speed(elapsed_reload, elapsed_refresh)
+
+  def test_open_cached(self):
+    path = self._TEST_ROOT.joinpath("basic.json.gz")
+    with autodict.JSONAutoDict(path) as d:
+      d["a"]["b"] = [1, 2]
+    tree_cache = cache.TreeCache()
+
+    d = autodict.JSONAutoDict.open_cached(path, tree_cache=tree_cache)
+    self.assertIsInstance(d, autodict.FrozenAutoDict)
+    self.assertEqual(d, {"a": {"b": (1, 2)}})
+    self.assertIs(
+        autodict.JSONAutoDict.open_cached(path, tree_cache=tree_cache), d)
+    self.assertRaises(TypeError, d["a"].clear)
+
+    with autodict.JSONAutoDict(path) as other:
+      other["c"] = 1
+    self.assertEqual(
+        autodict.JSONAutoDict.open_cached(path, tree_cache=tree_cache), {
+            "a": {"b": (1, 2)},
+            "c": 1
+        })
+
+    path = self._TEST_ROOT.joinpath("missing.json")
+    self.assertRaises(FileNotFoundError, autodict.JSONAutoDict.open_cached,
+                      path)
+
+  def test_speed_open_cached(self):
+    path = self._TEST_ROOT.joinpath("basic_large.json")
+    with autodict.JSONAutoDict(path) as d:
+      for i in range(1000):
+        d[str(i)] = TestDefaultJSONDriver.JSON_BASIC
+    n = 20
+
+    start = time.perf_counter()
+    for _ in range(n):
+      autodict.JSONAutoDict(path, save_on_exit=False)
+    elapsed_open = time.perf_counter() - start
+
+    tree_cache = cache.TreeCache()
+    autodict.JSONAutoDict.open_cached(path, tree_cache=tree_cache)
+    start = time.perf_counter()
+    for _ in range(n):
+      autodict.JSONAutoDict.open_cached(path, tree_cache=tree_cache)
+    elapsed_cached = time.perf_counter() - start
+
+    self.log_speed(elapsed_open, elapsed_cached)
+
   def test_large(self):
     path = self._DATA_ROOT.joinpath("historical-events.json")
     with autodict.JSONAutoDict(path, save_on_exit=False) as d:
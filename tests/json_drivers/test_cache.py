@@ -0,0 +1,79 @@
+"""Test module json_drivers.cache
+"""
+
+import json
+
+from tests import base
+
+import autodict
+from autodict.json_drivers import cache
+
+
+class TestTreeCache(base.TestBase):
+  """Test TreeCache
+  """
+
+  def test_open(self):
+    path = self._TEST_ROOT.joinpath("a.json")
+    path.write_text(json.dumps({"a": {"b": [1, 2]}}), encoding="utf-8")
+    loads = []
+
+    def load():
+      loads.append(path)
+      with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+    c = cache.TreeCache()
+    d = c.open(path, load)
+    self.assertIsInstance(d, autodict.FrozenAutoDict)
+    self.assertEqual(d, {"a": {"b": (1, 2)}})
+    self.assertIs(c.open(path, load), d)
+    self.assertIs(c.open(str(path.absolute()), load), d)
+    link = self._TEST_ROOT.joinpath("link.json")
+    link.symlink_to(path.name)
+    self.assertIs(c.open(link, load), d)
+    self.assertEqual(len(loads), 1)
+    self.assertIsNot(c.open(path, load, options="other"), d)
+    self.assertEqual(len(loads), 2)
+
+    # Changed files are parsed again
+    path.write_text(json.dumps({"a": 1}), encoding="utf-8")
+    self.assertEqual(c.open(path, load), {"a": 1})
+    self.assertEqual(len(loads), 3)
+    stats = c.stats
+    self.assertEqual(stats["hits"], 3)
+    self.assertEqual(stats["misses"], 3)
+    self.assertEqual(stats["files"], 2)
+
+    path.unlink()
+    self.assertRaises(FileNotFoundError, c.open, path, load)
+    self.assertEqual(c.stats["files"], 1)
+    c.clear()
+    self.assertEqual(c.stats["files"], 0)
+    self.assertEqual(c.stats["bytes"], 0)
+
+  def test_evict(self):
+    paths = [self._TEST_ROOT.joinpath(f"{i}.json") for i in range(4)]
+    for path in paths:
+      path.write_text(json.dumps({"a": "x" * 90}))
+    size = paths[0].stat().st_size
+
+    c = cache.TreeCache(max_bytes=size * 2)
+    self.assertEqual(c.max_bytes, size * 2)
+    for path in paths[:3]:
+      c.open(path, dict)
+    self.assertEqual(c.stats["files"], 2)
+    self.assertEqual(c.stats["evictions"], 1)
+
+    # Least recently opened is evicted
+    c.open(paths[1], dict)
+    c.open(paths[3], dict)
+    c.open(paths[1], dict)
+    stats = c.stats
+    self.assertEqual(stats["hits"], 2)
+    self.assertEqual(stats["bytes"], size * 2)
+
+    # Files larger than the cache are not kept
+    c = cache.TreeCache(max_bytes=size - 1)
+    c.open(paths[0], dict)
+    self.assertEqual(c.stats["files"], 0)
@@ -0,0 +1,144 @@
+"""Test module json_drivers.compression
+"""
+
+import gzip
+import io
+import json
+import time
+
+from tests import base
+from tests.json_drivers.test_base import TestDefaultJSONDriver
+
+import autodict
+from autodict.json_drivers import auto, compression
+
+
+class TestCompression(base.TestBase):
+  """Test compression
+  """
+
+  def test_resolve(self):
+    self.assertEqual(compression.resolve("a.json.gz"), "gzip")
+    self.assertEqual(compression.resolve("a.json.BZ2"), "bz2")
+    self.assertEqual(compression.resolve("a.json.xz", "infer"), "xz")
+    self.assertIsNone(compression.resolve("a.json"))
+    self.assertIsNone(compression.resolve("a.json.gz", None))
+    self.assertEqual(compression.resolve("a.json", "xz"), "xz")
+    self.assertRaises(ValueError, compression.resolve, "a.json", "zip")
+
+  def test_open_file(self):
+    path = self._TEST_ROOT.joinpath("a.bin")
+    data = b"0123456789" * 1000
+    for name in compression.COMPRESSIONS:
+      sizes = []
+      for level in [1, None]:
+        with compression.open_file(path, "wb", name, level=level) as file:
+          file.write(data)
+        sizes.append(path.stat().st_size)
+        with compression.open_file(path, "rb", name) as file:
+          self.assertEqual(file.read(), data)
+      self.assertLess(sizes[0], len(data))
+
+  def test_read_all(self):
+    data = b"0123456789" * 1000
+    buf = compression.read_all(io.BytesIO(data), chunk_size=7)
+    self.assertIsInstance(buf, bytearray)
+    self.assertEqual(buf, data)
+    self.assertEqual(compression.read_all(io.BytesIO(b"")), b"")
+
+  def test_background_writer(self):
+    out = io.BytesIO()
+    with compression.BackgroundWriter(out, max_pending=1) as writer:
+      for i in range(100):
+        self.assertEqual(writer.write(str(i).encode()), len(str(i)))
+      writer.write(bytearray(b"end"))
+    self.assertEqual(out.getvalue(),
+                     "".join(str(i) for i in range(100)).encode() + b"end")
+
+    class Broken:
+
+      def write(self, b: bytes) -> None:
+        raise OSError("disk full")
+
+    writer = compression.BackgroundWriter(Broken())
+    writer.write(b"a")
+    self.assertRaises(OSError, writer.close)
+    self.assertRaises(OSError, writer.write, b"b")
+
+  def test_load_dump(self):
+    path = self._TEST_ROOT.joinpath("basic.json.gz")
+    for driver in auto.installed_drivers():
+      for background in [False, True]:
+        compression.dump(driver,
+                         TestDefaultJSONDriver.JSON_BASIC,
+                         path,
+                         "gzip",
+                         background=background)
+        target = driver.dumps(TestDefaultJSONDriver.JSON_BASIC)
+        if isinstance(target, str):
+          target = target.encode()
+        with gzip.open(path, "rb") as file:
+          self.assertEqual(file.read(), target)
+
+        d = compression.load(driver, path, "gzip")
+        self.assertIsInstance(d["child"], autodict.AutoDict)
+        self.assertDictEqual(driver.loads(target), d)
+
+        d = compression.load(driver, path, "gzip", lazy=True)
+        self.assertIsInstance(d, autodict.LazyAutoDict)
+        self.assertIs(type(dict.__getitem__(d, "child")), dict)
+
+  def test_init(self):
+    for suffix in [".gz", ".bz2", ".xz"]:
+      path = self._TEST_ROOT.joinpath("basic.json" + suffix)
+      with autodict.JSONAutoDict(path, **TestDefaultJSONDriver.JSON_BASIC):
+        pass
+      with compression.open_file(path, "rb", compression.SUFFIXES[suffix]):
+        pass
+
+      target = json.loads(
+          autodict.DefaultJSONDriver.dumps(TestDefaultJSONDriver.JSON_BASIC))
+      with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+        self.assertDictEqual(target, d)
+
+      with autodict.JSONAutoDict(path, keys=["child"]) as d:
+        self.assertDictEqual(d, {"child": {"name": "Plain"}})
+
+    path = self._TEST_ROOT.joinpath("basic.json")
+    with autodict.JSONAutoDict(path,
+                               compression="gzip",
+                               compression_level=1,
+                               background_compression=True) as d:
+      d["key"] = "value"
+    with gzip.open(path, "rb") as file:
+      self.assertEqual(file.read(), b'{"key": "value"}')
+    with autodict.JSONAutoDict(path, save_on_exit=False,
+                               compression="gzip") as d:
+      self.assertDictEqual(d, {"key": "value"})
+
+    self.assertRaises(ValueError,
+                      autodict.JSONAutoDict,
+                      path,
+                      compression="zip")
+
+  def test_speed_background(self):
+    path = self._TEST_ROOT.joinpath("basic_large.json.gz")
+
+    d = autodict.AutoDict()
+    n = 5000
+    for i in range(n):
+      d[str(i)] = TestDefaultJSONDriver.JSON_BASIC
+
+    start = time.perf_counter()
+    compression.dump(autodict.DefaultJSONDriver, d, path, "gzip")
+    elapsed_foreground = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compression.dump(autodict.DefaultJSONDriver,
+                     d,
+                     path,
+                     "gzip",
+                     background=True)
+    elapsed_background = time.perf_counter() - start
+
+    self.log_speed(elapsed_foreground, elapsed_background)
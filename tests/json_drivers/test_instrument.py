@@ -0,0 +1,158 @@
+"""Test module json_drivers.instrument
+"""
+
+import io
+import json
+import time
+
+from tests import base
+
+import autodict
+from autodict.json_drivers import instrument, pickle
+
+
+class TestInstrument(base.TestBase):
+  """Test instrumentation hooks
+  """
+
+  def test_hooks(self):
+    events = []
+    self.assertEqual(instrument.HOOKS, ())
+    instrument.add_hook(events.append)
+    try:
+      path = self._TEST_ROOT.joinpath("a.json")
+      with autodict.JSONAutoDict(path) as d:
+        d["a"]["b"] = [1, {"c": 2}]
+      self.assertEqual(len(events), 1)
+      event = events.pop()
+      self.assertEqual(event["operation"], "dump")
+      self.assertEqual(event["driver"], "DefaultJSONDriver")
+      self.assertEqual(event["path"], str(path))
+      self.assertEqual(event["bytes_written"], path.stat().st_size)
+      self.assertEqual(event["objects"], 4)
+      self.assertGreaterEqual(event["encode_seconds"], 0)
+      self.assertGreaterEqual(event["write_seconds"], 0)
+      self.assertAlmostEqual(event["encode_seconds"] + event["write_seconds"],
+                             event["seconds"])
+
+      d = autodict.JSONAutoDict(path, save_on_exit=False)
+      self.assertEqual(d, {"a": {"b": [1, {"c": 2}]}})
+      self.assertIsInstance(d["a"], autodict.AutoDict)
+      self.assertIsInstance(d["a"]["b"][1], autodict.AutoDict)
+      event = events.pop()
+      self.assertEqual(event["operation"], "load")
+      self.assertEqual(event["bytes_read"], path.stat().st_size)
+      self.assertEqual(event["objects"], 4)
+      for k in ["read_seconds", "parse_seconds", "construct_seconds"]:
+        self.assertGreaterEqual(event[k], 0)
+      self.assertAlmostEqual(
+          event["read_seconds"] + event["parse_seconds"] +
+          event["construct_seconds"], event["seconds"])
+
+      # Nested objects are upgraded upon access
+      d = autodict.JSONAutoDict(path, save_on_exit=False, lazy_children=True)
+      self.assertEqual(d, {"a": {"b": [1, {"c": 2}]}})
+      self.assertIsInstance(d, autodict.LazyAutoDict)
+      self.assertIs(type(dict.__getitem__(d, "a")), dict)
+      self.assertEqual(events.pop()["objects"], 4)
+
+      # Compressed sizes are the sizes on disk
+      path = self._TEST_ROOT.joinpath("a.pickle.gz")
+      with autodict.JSONAutoDict(path) as d:
+        d["a"]["b"] = "x" * 1000
+      event = events.pop()
+      self.assertEqual(event["driver"], "PickleDriver")
+      self.assertEqual(event["bytes_written"], path.stat().st_size)
+      d = autodict.JSONAutoDict(path, save_on_exit=False)
+      self.assertEqual(d, {"a": {"b": "x" * 1000}})
+      self.assertIsInstance(d["a"], autodict.AutoDict)
+      self.assertGreater(events.pop()["bytes_read"], path.stat().st_size)
+    finally:
+      instrument.remove_hook(events.append)
+    self.assertEqual(instrument.HOOKS, ())
+
+    with autodict.JSONAutoDict(path) as d:
+      d["a"]["b"] = 2
+    self.assertEqual(events, [])
+
+  def test_load_dump(self):
+    path = self._TEST_ROOT.joinpath("a.pickle")
+    data = {"a": {"b": [1, 2]}, "c": "d"}
+    with autodict.StatsAggregator() as stats:
+      instrument.dump(pickle.PickleDriver, data, path)
+      d = instrument.load(pickle.PickleDriver, path)
+      self.assertEqual(d, data)
+      self.assertIsInstance(d, autodict.AutoDict)
+      d = instrument.load(pickle.PickleDriver, path, lazy=True)
+      self.assertIsInstance(d, autodict.LazyAutoDict)
+    summary = stats.summary()
+    self.assertEqual(summary["dump/PickleDriver"]["count"], 1)
+    self.assertEqual(summary["load/PickleDriver"]["count"], 2)
+    self.assertEqual(summary["load/PickleDriver"]["bytes_read"]["total"],
+                     path.stat().st_size * 2)
+
+    buf = io.BytesIO()
+    writer = instrument.MeteredWriter(buf)
+    self.assertEqual(writer.write(memoryview(b"abcd")[1:]), 3)
+    writer.write(b"e")
+    self.assertEqual(buf.getvalue(), b"bcde")
+    self.assertEqual(writer.bytes, 4)
+    writer.close()
+    self.assertFalse(buf.closed)
+
+  def test_stats_aggregator(self):
+    stats = autodict.StatsAggregator(max_samples=50, percentiles=(0, 50, 99.9))
+    for i in range(100):
+      stats({
+          "operation": "load",
+          "driver": "DefaultJSONDriver",
+          "path": "a.json",
+          "seconds": float(i + 1),
+          "objects": 2
+      })
+    stats({"operation": "dump", "driver": "DefaultJSONDriver", "seconds": 1})
+    summary = stats.summary()
+    self.assertEqual(set(summary),
+                     {"load/DefaultJSONDriver", "dump/DefaultJSONDriver"})
+    load = summary["load/DefaultJSONDriver"]
+    self.assertEqual(load["count"], 100)
+    self.assertNotIn("path", load)
+    # Percentiles of the latest 50 events, totals of every event
+    self.assertEqual(
+        load["seconds"], {
+            "p0": 51.0,
+            "p50": 75.0,
+            "p99.9": 100.0,
+            "max": 100.0,
+            "mean": 50.5,
+            "total": 5050.0
+        })
+    self.assertEqual(load["objects"]["p50"], 2)
+    json.dumps(summary)
+
+    stats.reset()
+    self.assertEqual(stats.summary(), {})
+
+  def test_speed_disabled(self):
+    path = self._TEST_ROOT.joinpath("a.json")
+    n = 20
+    with autodict.JSONAutoDict(path) as d:
+      for i in range(2000):
+        d[str(i)] = {"name": self.gen_string(), "i": [i]}
+
+    def load_save():
+      for _ in range(n):
+        d = autodict.JSONAutoDict(path, save_on_exit=False)
+        d.save()
+
+    with autodict.StatsAggregator() as stats:
+      start = time.perf_counter()
+      load_save()
+      elapsed_enabled = time.perf_counter() - start
+    self.assertEqual(stats.summary()["load/DefaultJSONDriver"]["count"], n)
+
+    start = time.perf_counter()
+    load_save()
+    elapsed_disabled = time.perf_counter() - start
+
+    self.log_speed(elapsed_enabled, elapsed_disabled)
@@ -0,0 +1,53 @@
+"""Test module json_drivers.locking
+"""
+
+import threading
+import unittest
+
+from tests import base
+
+from autodict.json_drivers import locking
+
+
+@unittest.skipIf(locking.fcntl is None, "fcntl is not available")
+class TestFileLock(base.TestBase):
+  """Test FileLock
+  """
+
+  def test_lock(self):
+    path = self._TEST_ROOT.joinpath("sub", "a.json.lock")
+    a = locking.FileLock(path)
+    b = locking.FileLock(path)
+    self.assertEqual(a.path, path)
+    self.assertFalse(path.exists())
+
+    # Shared locks do not exclude each other
+    with a.shared(), b.shared():
+      self.assertTrue(path.exists())
+
+    # Each FileLock opens the file so they exclude each other like processes
+    order = []
+    locked = threading.Event()
+
+    def take():
+      locked.wait()
+      with b.shared():
+        order.append("b")
+
+    thread = threading.Thread(target=take)
+    thread.start()
+    with a.exclusive():
+      locked.set()
+      thread.join(0.1)
+      self.assertTrue(thread.is_alive())
+      order.append("a")
+    thread.join()
+    self.assertEqual(order, ["a", "b"])
+
+    a.close()
+    a.close()
+    with a.exclusive():
+      pass
+    del a
+    del b
+    self.assertTrue(path.exists())
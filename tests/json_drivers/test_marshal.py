@@ -0,0 +1,105 @@
+"""Test module json_drivers.marshal
+"""
+
+import io
+import json
+import marshal
+import time
+
+from tests import base
+from tests.json_drivers.test_base import TestDefaultJSONDriver
+
+import autodict
+from autodict.json_drivers import marshal as marshal_driver
+
+
+class TestMarshalDriver(base.TestBase):
+  """Test MarshalDriver
+  """
+
+  # JSON_BASIC after serializing the other types
+  _TARGET = json.loads(
+      autodict.DefaultJSONDriver.dumps(TestDefaultJSONDriver.JSON_BASIC))
+
+  def test_to_basic(self):
+    result = marshal_driver.MarshalDriver.to_basic(
+        TestDefaultJSONDriver.JSON_BASIC)
+    self.assertIs(type(result), dict)
+    self.assertIs(type(result["other child"]), dict)
+    self.assertIs(type(result["list"][3]), dict)
+    self.assertEqual(result, self._TARGET)
+
+    result = marshal_driver.MarshalDriver.to_basic({1: (1, 2), "b": None})
+    self.assertEqual(result, {1: [1, 2], "b": None})
+
+    class UnknownType:
+      pass
+
+    self.assertRaises(TypeError, marshal_driver.MarshalDriver.to_basic,
+                      {"a": UnknownType()})
+
+  def test_dump(self):
+    path = self._TEST_ROOT.joinpath("basic.marshal")
+
+    marshal_driver.MarshalDriver.dump(TestDefaultJSONDriver.JSON_BASIC, path)
+    with open(path, "rb") as file:
+      self.assertEqual(marshal.load(file), self._TARGET)
+
+    path.unlink()
+
+    with open(path, "wb") as file:
+      marshal_driver.MarshalDriver.dump(TestDefaultJSONDriver.JSON_BASIC, file)
+    with open(path, "rb") as file:
+      self.assertEqual(marshal.load(file), self._TARGET)
+
+  def test_load(self):
+    path = self._TEST_ROOT.joinpath("basic.marshal")
+    marshal_driver.MarshalDriver.dump(TestDefaultJSONDriver.JSON_BASIC, path)
+
+    d = marshal_driver.MarshalDriver.load(path)
+    self.assertIsInstance(d, autodict.AutoDict)
+    self.assertIsInstance(d["list"][3], autodict.AutoDict)
+    self.assertDictEqual(self._TARGET, d)
+
+    d = marshal_driver.MarshalDriver.load(str(path), lazy=True)
+    self.assertIsInstance(d, autodict.LazyAutoDict)
+    self.assertIs(type(dict.__getitem__(d, "child")), dict)
+    self.assertDictEqual(self._TARGET, d)
+
+    d = marshal_driver.MarshalDriver.load(io.BytesIO(path.read_bytes()))
+    self.assertDictEqual(self._TARGET, d)
+
+  def test_loads(self):
+    b = marshal_driver.MarshalDriver.dumps(TestDefaultJSONDriver.JSON_BASIC)
+    self.assertIsInstance(b, bytes)
+    for s in [b, bytearray(b), memoryview(b)]:
+      d = marshal_driver.MarshalDriver.loads(s)
+      self.assertIsInstance(d, autodict.AutoDict)
+      self.assertDictEqual(self._TARGET, d)
+
+  def test_json_auto_dict(self):
+    path = self._TEST_ROOT.joinpath("basic.marshal")
+    with autodict.JSONAutoDict(path) as d:
+      self.assertIs(d._driver, marshal_driver.MarshalDriver)  # pylint: disable=protected-access
+      d["a"]["b"] = [1, 2]
+
+    with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+      self.assertDictEqual(d, {"a": {"b": [1, 2]}})
+
+  def test_speed_load(self):
+    d = autodict.AutoDict()
+    n = 5000
+    for i in range(n):
+      d[str(i)] = TestDefaultJSONDriver.JSON_BASIC
+    s_json = autodict.DefaultJSONDriver.dumps(d)
+    s_marshal = marshal_driver.MarshalDriver.dumps(d)
+
+    start = time.perf_counter()
+    _ = autodict.DefaultJSONDriver.loads(s_json)
+    elapsed_default = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _ = marshal_driver.MarshalDriver.loads(s_marshal)
+    elapsed_marshal = time.perf_counter() - start
+
+    self.log_speed(elapsed_default, elapsed_marshal)
@@ -0,0 +1,77 @@
+"""Test module json_drivers.msgpack
+"""
+
+import io
+import json
+import unittest
+
+try:
+  from autodict.json_drivers import msgpack
+except ImportError:
+  msgpack = None
+
+from tests import base
+from tests.json_drivers.test_base import TestDefaultJSONDriver
+
+import autodict
+
+
+@unittest.skipIf(msgpack is None, "msgpack is not installed")
+class TestMsgpackDriver(base.TestBase):
+  """Test MsgpackDriver
+  """
+
+  # JSON_BASIC after serializing the other types
+  _TARGET = json.loads(
+      autodict.DefaultJSONDriver.dumps(TestDefaultJSONDriver.JSON_BASIC))
+
+  def test_default(self):
+
+    class UnknownType:
+      pass
+
+    self.assertRaises(TypeError, msgpack.MsgpackDriver.dumps,
+                      {"a": UnknownType()})
+
+  def test_dump(self):
+    path = self._TEST_ROOT.joinpath("basic.msgpack")
+
+    msgpack.MsgpackDriver.dump(TestDefaultJSONDriver.JSON_BASIC, path)
+    self.assertDictEqual(msgpack.MsgpackDriver.load(path), self._TARGET)
+
+    path.unlink()
+
+    with open(path, "wb") as file:
+      msgpack.MsgpackDriver.dump(TestDefaultJSONDriver.JSON_BASIC, file)
+    self.assertDictEqual(msgpack.MsgpackDriver.load(path), self._TARGET)
+
+  def test_load(self):
+    path = self._TEST_ROOT.joinpath("basic.msgpack")
+    msgpack.MsgpackDriver.dump(TestDefaultJSONDriver.JSON_BASIC, path)
+
+    d = msgpack.MsgpackDriver.load(path)
+    self.assertIsInstance(d, autodict.AutoDict)
+    self.assertIsInstance(d["list"][3], autodict.AutoDict)
+
+    d = msgpack.MsgpackDriver.load(str(path), lazy=True)
+    self.assertIsInstance(d, autodict.LazyAutoDict)
+    self.assertIs(type(dict.__getitem__(d, "child")), dict)
+
+    d = msgpack.MsgpackDriver.load(io.BytesIO(path.read_bytes()))
+    self.assertDictEqual(self._TARGET, d)
+
+  def test_loads(self):
+    b = msgpack.MsgpackDriver.dumps({1: b"\x00", "a": (1, 2)})
+    for s in [b, bytearray(b), memoryview(b)]:
+      d = msgpack.MsgpackDriver.loads(s)
+      self.assertIsInstance(d, autodict.AutoDict)
+      self.assertDictEqual(d, {1: b"\x00", "a": [1, 2]})
+
+  def test_json_auto_dict(self):
+    path = self._TEST_ROOT.joinpath("basic.msgpack")
+    with autodict.JSONAutoDict(path) as d:
+      self.assertIs(d._driver, msgpack.MsgpackDriver)  # pylint: disable=protected-access
+      d["a"]["b"] = [1, 2]
+
+    with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+      self.assertDictEqual(d, {"a": {"b": [1, 2]}})
@@ -0,0 +1,169 @@
+"""Test module json_drivers.ndjson
+"""
+
+import json
+import time
+
+from tests import base
+
+import autodict
+from autodict.json_drivers import ndjson
+
+
+class TestAppendLog(base.TestBase):
+  """Test AppendLog
+  """
+
+  def test_record(self):
+    path = self._TEST_ROOT.joinpath("log.ndjson")
+    log = ndjson.AppendLog(path, buffer_size=1 << 16)
+    self.assertEqual(log.path, path)
+
+    log.record("set", ("a", "b"), 1)
+    log.record("set", ("c",), "multi\nline")
+    log.record("delete", ("a", "b"), None)
+    log.record("clear", ("c",), None)
+    self.assertFalse(path.exists())
+
+    log.flush()
+    with open(path, "r", encoding="utf-8") as file:
+      lines = file.read().splitlines()
+    self.assertEqual([json.loads(line) for line in lines], [
+        [["a", "b"], 1],
+        [["c"], "multi\nline"],
+        [["a", "b"]],
+        [["c"], {}],
+    ])
+
+    log.record("set", ("d",), 2)
+    log.close()
+    with open(path, "r", encoding="utf-8") as file:
+      self.assertEqual(len(file.read().splitlines()), 5)
+
+    # Small buffer flushes every line
+    log = ndjson.AppendLog(path, buffer_size=0)
+    log.record("set", ("e",), 3)
+    with open(path, "r", encoding="utf-8") as file:
+      self.assertEqual(len(file.read().splitlines()), 6)
+    log.close()
+
+  def test_replay(self):
+    path = self._TEST_ROOT.joinpath("log.ndjson")
+    log = ndjson.AppendLog(path)
+    self.assertEqual(log.replay(), {})
+
+    log.record("set", ("a", "b"), 1)
+    log.record("set", ("a", "c"), {"d": [1, 2]})
+    log.record("set", ("e",), 2)
+    log.record("delete", ("a", "b"), None)
+    log.record("set", ("f",), 3)
+    log.record("clear", (), None)
+    log.record("set", ("g",), 4)
+    log.close()
+
+    d = log.replay()
+    self.assertIsInstance(d, autodict.AutoDict)
+    self.assertEqual(d, {"g": 4})
+
+    log.rewrite({"a": {"b": 1}, "c": [1, 2]})
+    self.assertEqual(log.replay(), {"a": {"b": 1}, "c": [1, 2]})
+    self.assertIsInstance(log.replay()["a"], autodict.AutoDict)
+
+  def test_replay_invalid(self):
+    path = self._TEST_ROOT.joinpath("log.ndjson")
+    log = ndjson.AppendLog(path)
+    log.record("set", ("a",), 1)
+    log.close()
+
+    # Partial last line is truncated
+    size = path.stat().st_size
+    with open(path, "ab") as file:
+      file.write(b'[["b"], ')
+    self.assertEqual(log.replay(), {"a": 1})
+    self.assertEqual(path.stat().st_size, size)
+
+    with open(path, "ab") as file:
+      file.write(b'{"b": 1}\n')
+    self.assertRaises(ValueError, log.replay)
+
+    with open(path, "wb") as file:
+      file.write(b"not json\n")
+    self.assertRaises(ValueError, log.replay)
+
+    with open(path, "wb") as file:
+      file.write(b'[["a"], 1]\n[["a", "b"], 2]\n')
+    self.assertRaises(ValueError, log.replay)
+
+
+class TestNDJSONAutoDict(base.TestBase):
+  """Test NDJSONAutoDict
+  """
+
+  def test_init(self):
+    path = self._TEST_ROOT.joinpath("log.ndjson")
+
+    with autodict.NDJSONAutoDict(path) as d:
+      self.assertIsInstance(d, autodict.ObservedAutoDict)
+      d["a"]["b"] = 1
+      d["c"] = [1, 2]
+      d["d"] = {"e": 1}
+      d["d"]["f"] = 2
+      del d["c"]
+
+    with autodict.NDJSONAutoDict(path) as d:
+      self.assertEqual(d, {"a": {"b": 1}, "d": {"e": 1, "f": 2}})
+      self.assertIsInstance(d["a"], autodict.ObservedAutoDict)
+      d["a"]["g"] = 3
+      d["d"].pop("e")
+
+    d = autodict.NDJSONAutoDict(path)
+    self.assertEqual(d, {"a": {"b": 1, "g": 3}, "d": {"f": 2}})
+    del d
+
+  def test_compact(self):
+    path = self._TEST_ROOT.joinpath("log.ndjson")
+
+    with autodict.NDJSONAutoDict(path) as d:
+      for i in range(100):
+        d["counter"] = i
+      d["a"]["b"] = 1
+      d.flush()
+      size = path.stat().st_size
+
+      d.compact()
+      self.assertLess(path.stat().st_size, size)
+      d["a"]["c"] = 2
+
+    with open(path, "r", encoding="utf-8") as file:
+      self.assertEqual(len(file.read().splitlines()), 3)
+    with autodict.NDJSONAutoDict(path) as d:
+      self.assertEqual(d, {"counter": 99, "a": {"b": 1, "c": 2}})
+
+  def test_speed_append(self):
+    path_json = self._TEST_ROOT.joinpath("log.json")
+    path_ndjson = self._TEST_ROOT.joinpath("log.ndjson")
+
+    n = 1000
+    n_batches = 20
+    records = [{"name": self.gen_string(), "value": i} for i in range(n)]
+
+    start = time.perf_counter()
+    d = autodict.JSONAutoDict(path_json, save_on_exit=False)
+    for i in range(n_batches):
+      for j, record in enumerate(records):
+        d[str(i)][str(j)] = record
+      d.save()
+    elapsed_save = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with autodict.NDJSONAutoDict(path_ndjson) as d:
+      for i in range(n_batches):
+        for j, record in enumerate(records):
+          d[str(i)][str(j)] = record
+        d.flush()
+    elapsed_append = time.perf_counter() - start
+
+    self.assertEqual(autodict.NDJSONAutoDict(path_ndjson),
+                     autodict.DefaultJSONDriver.load(path_json))
+
+    self.log_speed(elapsed_save, elapsed_append)
@@ -1,9 +1,16 @@
 """Test module json_drivers.orjson
 """
 
+import dataclasses
 import datetime
 import json
 import time
+import unittest
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
 
 from tests import base
 from tests.json_drivers.test_base import TestDefaultJSONDriver
@@ -71,6 +78,119 @@ class TestOrjsonDriver(base.TestBase):
     s = orjson.OrjsonDriver.dumps(TestDefaultJSONDriver.JSON_BASIC, indent=2)
     json.loads(s)  # No JSON errors
 
+  def test_dumps_non_str_keys(self):
+    d = autodict.AutoDict({1: "one", "two": {2: 2.0}})
+    s = orjson.OrjsonDriver.dumps(d)
+    self.assertDictEqual(json.loads(s), {"1": "one", "two": {"2": 2.0}})
+
+    driver = orjson.OrjsonDriver.with_options()
+    s = driver.dumps(d)
+    self.assertDictEqual(json.loads(s), {"1": "one", "two": {"2": 2.0}})
+
+    driver = orjson.OrjsonDriver.with_options(non_str_keys=False)
+    self.assertRaises(TypeError, driver.dumps, d)
+
+    driver = orjson.OrjsonDriver.with_options(non_str_keys=True)
+    s = driver.dumps(d)
+    self.assertDictEqual(json.loads(s), {"1": "one", "two": {"2": 2.0}})
+
+    class UnknownType:
+      pass
+
+    d["unknown"] = UnknownType()
+    self.assertRaises(TypeError, orjson.OrjsonDriver.dumps, d)
+    self.assertRaises(TypeError, driver.dumps, d)
+
+  def test_with_options(self):
+
+    @dataclasses.dataclass
+    class Point:
+      x: int
+      y: int
+
+    timestamp = datetime.datetime(2000, 9, 1, 21, 55, 2)
+    d = autodict.AutoDict(b=timestamp, a=Point(1, 2))
+
+    driver = orjson.OrjsonDriver.with_options(sort_keys=True,
+                                              append_newline=True)
+    self.assertTrue(issubclass(driver, orjson.OrjsonDriver))
+    self.assertIn(datetime.datetime, driver.NATIVE_TYPES)
+    s = driver.dumps(d)
+    self.assertEqual(s, b'{"a":{"x":1,"y":2},"b":"2000-09-01T21:55:02"}\n')
+
+    driver = orjson.OrjsonDriver.with_options(passthrough_datetime=True,
+                                              serialize_numpy=False)
+    self.assertNotIn(datetime.datetime, driver.NATIVE_TYPES)
+    self.assertFalse(driver.OPTIONS & orjson.orjson.OPT_SERIALIZE_NUMPY)
+    driver.REGISTRY = autodict.TypeRegistry()
+    driver.REGISTRY.register(datetime.datetime, lambda t: t.timestamp())
+    s = driver.dumps(d)
+    self.assertEqual(json.loads(s)["b"], timestamp.timestamp())
+
+  def test_iterencode(self):
+    d = autodict.AutoDict({f"key{i}": {"i": i} for i in range(100, 0, -1)})
+    for indent in [None, 2]:
+      for driver in [
+          orjson.OrjsonDriver,
+          orjson.OrjsonDriver.with_options(sort_keys=True, append_newline=True)
+      ]:
+        target = driver.dumps(d, indent=indent)
+        s = b"".join(driver.iterencode(d, indent=indent, chunk_size=1))
+        self.assertEqual(s, target)
+
+    # Mixed key types fall back to encoding the whole document
+    driver = orjson.OrjsonDriver.with_options(sort_keys=True, non_str_keys=True)
+    d = autodict.AutoDict({1: "int", "a": "str"})
+    self.assertEqual(b"".join(driver.iterencode(d)), driver.dumps(d))
+
+  def test_encode_cached(self):
+    d = autodict.ObservedAutoDict({f"key{i}": {"i": i} for i in range(10)})
+    d["list"] = [{"a": 1}]
+    d[1] = "int"
+    for driver in [
+        orjson.OrjsonDriver,
+        orjson.OrjsonDriver.with_options(sort_keys=True, append_newline=True)
+    ]:
+      self.assertEqual(driver.encode_cached(d), driver.dumps(d))
+    self.assertEqual(d._encoded.volatile, {"list"})  # pylint: disable=protected-access
+    d["key0"]["i"] = -1
+    self.assertEqual(orjson.OrjsonDriver.encode_cached(d),
+                     orjson.OrjsonDriver.dumps(d))
+
+    self.assertIn("encode_cached", orjson.OrjsonDriver.CAPABILITIES)
+    sorted_driver = orjson.OrjsonDriver.with_options(sort_keys=True)
+    self.assertNotIn("encode_cached", sorted_driver.CAPABILITIES)
+
+  @unittest.skipIf(numpy is None, "numpy is not installed")
+  def test_dumps_numpy(self):
+    d = autodict.AutoDict(array=numpy.arange(4), scalar=numpy.float64(1.5))
+
+    s = orjson.OrjsonDriver.dumps(d)
+    self.assertDictEqual(json.loads(s), {"array": [0, 1, 2, 3], "scalar": 1.5})
+
+    driver = orjson.OrjsonDriver.with_options(serialize_numpy=False)
+    s = driver.dumps(d)
+    self.assertDictEqual(json.loads(s), {"array": [0, 1, 2, 3], "scalar": 1.5})
+
+  @unittest.skipIf(numpy is None, "numpy is not installed")
+  def test_speed_dump_numpy(self):
+    d = autodict.AutoDict()
+    n = 1000
+    for i in range(n):
+      d[str(i)]["values"] = numpy.random.rand(n)
+      d[str(i)]["mean"] = numpy.float64(0.5)
+
+    driver = orjson.OrjsonDriver.with_options(serialize_numpy=False)
+    start = time.perf_counter()
+    driver.dumps(d)
+    elapsed_default = time.perf_counter() - start
+
+    start = time.perf_counter()
+    orjson.OrjsonDriver.dumps(d)
+    elapsed_native = time.perf_counter() - start
+
+    self.log_speed(elapsed_default, elapsed_native)
+
   def test_upgrade_dicts(self):
     key = self.gen_string()
     value = self.gen_string()
@@ -99,6 +219,10 @@ class TestOrjsonDriver(base.TestBase):
     self.assertIsInstance(d, autodict.AutoDict)
     self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
 
+    d = orjson.OrjsonDriver.load(path, lazy=True)
+    self.assertIsInstance(d, autodict.LazyAutoDict)
+    self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+
     with open(path, "r", encoding="utf-8") as file:
       d = orjson.OrjsonDriver.load(file)
       self.assertIsInstance(d, autodict.AutoDict)
@@ -113,6 +237,16 @@ class TestOrjsonDriver(base.TestBase):
       self.assertIsInstance(d, autodict.AutoDict)
       self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
 
+      d = orjson.OrjsonDriver.loads(s, lazy=True)
+      self.assertIsInstance(d, autodict.LazyAutoDict)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+      self.assertIsInstance(d["child"], autodict.LazyAutoDict)
+
+    b = path.read_bytes()
+    for s in [b, bytearray(b), memoryview(b)]:
+      d = orjson.OrjsonDriver.loads(s)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+
   def test_speed_load(self):
     path = self._DATA_ROOT.joinpath("basic.json")
     with open(path, "r", encoding="utf-8") as file:
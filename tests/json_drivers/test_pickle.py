@@ -0,0 +1,131 @@
+"""Test module json_drivers.pickle
+"""
+
+import io
+import pickle
+import time
+
+from tests import base
+from tests.json_drivers.test_base import TestDefaultJSONDriver
+
+import autodict
+from autodict.json_drivers import pickle as pickle_driver
+
+
+class TestPickleDriver(base.TestBase):
+  """Test PickleDriver
+  """
+
+  def test_dump(self):
+    path = self._TEST_ROOT.joinpath("basic.pickle")
+
+    pickle_driver.PickleDriver.dump(TestDefaultJSONDriver.JSON_BASIC, path)
+    with open(path, "rb") as file:
+      self.assertEqual(pickle.load(file), TestDefaultJSONDriver.JSON_BASIC)
+
+    path.unlink()
+
+    pickle_driver.PickleDriver.dump(TestDefaultJSONDriver.JSON_BASIC, str(path))
+    with open(path, "rb") as file:
+      self.assertEqual(pickle.load(file), TestDefaultJSONDriver.JSON_BASIC)
+
+    path.unlink()
+
+    with open(path, "wb") as file:
+      pickle_driver.PickleDriver.dump(TestDefaultJSONDriver.JSON_BASIC,
+                                      file,
+                                      indent=2)
+    with open(path, "rb") as file:
+      self.assertEqual(pickle.load(file), TestDefaultJSONDriver.JSON_BASIC)
+
+  def test_dumps(self):
+    s = pickle_driver.PickleDriver.dumps(TestDefaultJSONDriver.JSON_BASIC)
+    self.assertIsInstance(s, bytes)
+    d = pickle.loads(s)
+    self.assertIs(type(d), autodict.AutoDict)
+    self.assertEqual(d, TestDefaultJSONDriver.JSON_BASIC)
+
+    # State of subclasses is not pickled
+    path = self._TEST_ROOT.joinpath("basic.json")
+    with autodict.JSONAutoDict(path, save_on_exit=False) as j:
+      j["key"] = "value"
+      d = pickle.loads(pickle_driver.PickleDriver.dumps(j))
+    self.assertIs(type(d), autodict.LazyAutoDict)
+    self.assertEqual(d, {"key": "value"})
+    self.assertEqual(d.__dict__, {})
+
+    # Observed children are pickled as AutoDicts
+    path = self._TEST_ROOT.joinpath("basic.pickle")
+    with autodict.JSONAutoDict(path, autosave_interval=60) as j:
+      j["a"]["b"] = 1
+      self.assertIsInstance(j["a"], autodict.ObservedAutoDict)
+      d = pickle.loads(pickle_driver.PickleDriver.dumps(j))
+      self.assertIs(type(d["a"]), autodict.AutoDict)
+    # Nested mutations of the loaded tree are observed
+    j = autodict.JSONAutoDict(path, save_on_exit=False, autosave_interval=60)
+    j["a"]["c"] = 2
+    j.flush()
+    with autodict.JSONAutoDict(path, save_on_exit=False) as j:
+      self.assertEqual(j, {"a": {"b": 1, "c": 2}})
+
+  def test_load(self):
+    path = self._TEST_ROOT.joinpath("basic.pickle")
+    pickle_driver.PickleDriver.dump(TestDefaultJSONDriver.JSON_BASIC, path)
+
+    d = pickle_driver.PickleDriver.load(path)
+    self.assertIsInstance(d, autodict.AutoDict)
+    self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC, d)
+    self.assertIsInstance(d["other child"], autodict.AutoDict)
+
+    d = pickle_driver.PickleDriver.load(str(path), lazy=True)
+    self.assertIsInstance(d, autodict.LazyAutoDict)
+    self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC, d)
+    self.assertIsInstance(d["child"], autodict.LazyAutoDict)
+
+    with open(path, "rb") as file:
+      d = pickle_driver.PickleDriver.load(file)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC, d)
+
+    d = pickle_driver.PickleDriver.load(io.BytesIO(pickle.dumps({"a": 1})))
+    self.assertIs(type(d), autodict.AutoDict)
+
+  def test_loads(self):
+    b = pickle_driver.PickleDriver.dumps(TestDefaultJSONDriver.JSON_BASIC)
+    for s in [b, bytearray(b), memoryview(b)]:
+      d = pickle_driver.PickleDriver.loads(s)
+      self.assertIsInstance(d, autodict.AutoDict)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC, d)
+
+    d = pickle_driver.PickleDriver.loads(b, lazy=True)
+    self.assertIsInstance(d, autodict.LazyAutoDict)
+
+  def test_json_auto_dict(self):
+    for name in ["basic.pickle", "basic.pkl.gz"]:
+      path = self._TEST_ROOT.joinpath(name)
+      with autodict.JSONAutoDict(path) as d:
+        self.assertIs(d._driver, pickle_driver.PickleDriver)  # pylint: disable=protected-access
+        d.update(TestDefaultJSONDriver.JSON_BASIC)
+
+      with autodict.JSONAutoDict(path, save_on_exit=False) as d:
+        self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC, d)
+
+      with autodict.JSONAutoDict(path, keys=["name"]) as d:
+        self.assertDictEqual(d, {"name": "Whoami"})
+
+  def test_speed_load(self):
+    d = autodict.AutoDict()
+    n = 5000
+    for i in range(n):
+      d[str(i)] = TestDefaultJSONDriver.JSON_BASIC
+    s_json = autodict.DefaultJSONDriver.dumps(d)
+    s_pickle = pickle_driver.PickleDriver.dumps(d)
+
+    start = time.perf_counter()
+    _ = autodict.DefaultJSONDriver.loads(s_json)
+    elapsed_default = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _ = pickle_driver.PickleDriver.loads(s_pickle)
+    elapsed_pickle = time.perf_counter() - start
+
+    self.log_speed(elapsed_default, elapsed_pickle)
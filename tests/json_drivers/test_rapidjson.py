@@ -87,6 +87,10 @@ class TestRapidJSONDriver(base.TestBase):
     self.assertIsInstance(d, autodict.AutoDict)
     self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
 
+    d = rapidjson.RapidJSONDriver.load(path, lazy=True)
+    self.assertIsInstance(d, autodict.LazyAutoDict)
+    self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+
     with open(path, "r", encoding="utf-8") as file:
       d = rapidjson.RapidJSONDriver.load(file)
       self.assertIsInstance(d, autodict.AutoDict)
@@ -101,6 +105,16 @@ class TestRapidJSONDriver(base.TestBase):
       self.assertIsInstance(d, autodict.AutoDict)
       self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
 
+      d = rapidjson.RapidJSONDriver.loads(s, lazy=True)
+      self.assertIsInstance(d, autodict.LazyAutoDict)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+      self.assertIsInstance(d["child"], autodict.LazyAutoDict)
+
+    b = path.read_bytes()
+    for s in [b, bytearray(b), memoryview(b)]:
+      d = rapidjson.RapidJSONDriver.loads(s)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+
   def test_speed_load(self):
     path = self._DATA_ROOT.joinpath("basic.json")
     with open(path, "r", encoding="utf-8") as file:
@@ -0,0 +1,131 @@
+"""Test module json_drivers.registry
+"""
+
+import datetime
+import decimal
+import enum
+import time
+import uuid
+
+from tests import base
+
+import autodict
+from autodict.json_drivers import registry
+
+
+class TestTypeRegistry(base.TestBase):
+  """Test TypeRegistry
+  """
+
+  def test_register(self):
+    r = registry.TypeRegistry()
+
+    class UnknownType:
+      pass
+
+    class UnknownChild(UnknownType):
+      pass
+
+    o = UnknownType()
+    self.assertIsNone(r.lookup(UnknownType))
+    self.assertRaises(TypeError, r.encode, o)
+
+    r.register(UnknownType, lambda _: "parent")
+    self.assertIn(UnknownType, r.types())
+    self.assertEqual(r.encode(o), "parent")
+    self.assertEqual(r.encode(UnknownChild()), "parent")
+
+    # Closer registration wins over MRO fallback, cache is reset
+    r.register(UnknownChild, lambda _: "child")
+    self.assertEqual(r.encode(o), "parent")
+    self.assertEqual(r.encode(UnknownChild()), "child")
+
+    r.unregister(UnknownChild)
+    self.assertEqual(r.encode(UnknownChild()), "parent")
+    self.assertRaises(KeyError, r.unregister, UnknownChild)
+
+  def test_register_deferred(self):
+    r = registry.TypeRegistry()
+
+    class UnknownType:
+      pass
+
+    calls = []
+
+    def callback(r_: registry.TypeRegistry) -> None:
+      calls.append(r_)
+      r_.register(UnknownType, lambda _: "deferred")
+
+    r.register_deferred("not_a_module", callback)
+    self.assertIsNone(r.lookup(UnknownType))
+    self.assertEqual(calls, [])
+
+    r.register_deferred(__name__, callback)
+    self.assertEqual(r.encode(UnknownType()), "deferred")
+    self.assertEqual(calls, [r])
+    self.assertIsNone(r.lookup(str))
+    self.assertEqual(calls, [r])
+
+  def test_builtin_types(self):
+    r = registry.REGISTRY
+
+    class Color(enum.Enum):
+      RED = "red"
+
+    timestamp = datetime.datetime(2000, 9, 1, 21, 55, 2)
+    values = [
+        timestamp,
+        timestamp.date(),
+        timestamp.time(),
+        uuid.UUID("5d1e22eb-d9b2-48cd-b081-d1056d267f28"),
+        decimal.Decimal("3.14159265358979323846"),
+        Color.RED,
+    ]
+    for v in values:
+      self.assertIsJSONTypes(r.encode(v))
+    self.assertEqual(r.encode(values[4]), "3.14159265358979323846")
+
+  def test_register_type(self):
+
+    class UnknownType:
+
+      def __init__(self, value: str) -> None:
+        self.value = value
+
+    o = UnknownType(self.gen_string())
+    self.assertRaises(TypeError, autodict.DefaultJSONDriver.default, o)
+
+    autodict.register_type(UnknownType, lambda u: u.value)
+    try:
+      self.assertEqual(autodict.DefaultJSONDriver.default(o), o.value)
+      s = autodict.DefaultJSONDriver.dumps(autodict.AutoDict(o=o))
+      self.assertEqual(autodict.DefaultJSONDriver.loads(s), {"o": o.value})
+    finally:
+      registry.REGISTRY.unregister(UnknownType)
+
+  def test_speed_encode(self):
+    values = [decimal.Decimal("1.5")] * 100000
+
+    table = {
+        datetime.datetime: lambda t: t.isoformat(),
+        datetime.date: lambda t: t.isoformat(),
+        datetime.time: lambda t: t.isoformat(),
+        uuid.UUID: str,
+        decimal.Decimal: str
+    }
+
+    start = time.perf_counter()
+    for v in values:
+      for t, op in table.items():
+        if isinstance(v, t):
+          op(v)
+          break
+    elapsed_linear = time.perf_counter() - start
+
+    encode = registry.REGISTRY.encode
+    start = time.perf_counter()
+    for v in values:
+      encode(v)
+    elapsed_registry = time.perf_counter() - start
+
+    self.log_speed(elapsed_linear, elapsed_registry)
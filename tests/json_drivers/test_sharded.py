@@ -0,0 +1,149 @@
+"""Test module json_drivers.sharded
+"""
+
+import copy
+import json
+import time
+
+from tests import base
+
+import autodict
+from autodict.json_drivers import pickle, sharded
+
+
+class TestShardedAutoDict(base.TestBase):
+  """Test ShardedAutoDict
+  """
+
+  def test_init(self):
+    path = self._TEST_ROOT.joinpath("store")
+
+    with autodict.ShardedAutoDict(path, shards=8) as d:
+      self.assertIsInstance(d, autodict.ObservedAutoDict)
+      self.assertEqual(d.path, path)
+      self.assertEqual(d.shards, 8)
+      d["a"]["b"] = 1
+      d["c"] = [1, 2]
+      d[1] = "int"
+    self.assertTrue(path.joinpath(sharded.MANIFEST).exists())
+    self.assertLessEqual(len(list(path.glob("*.json"))), 4)
+
+    # Shards argument is ignored for an existing directory
+    with autodict.ShardedAutoDict(path, shards=16) as d:
+      self.assertEqual(d.shards, 8)
+      self.assertEqual(dict.__len__(d), 0)
+      self.assertEqual(d["a"], {"b": 1})
+      self.assertIsInstance(d["a"], autodict.ObservedAutoDict)
+      self.assertLess(dict.__len__(d), 3)
+      self.assertIn("c", d)
+      self.assertIn(["a", "b"], d)
+      self.assertNotIn("missing", d)
+      self.assertEqual(d.get("1"), "int")
+      self.assertEqual(len(d), 3)
+      self.assertEqual(d, {"a": {"b": 1}, "c": [1, 2], "1": "int"})
+      self.assertEqual(d.dirty_shards, set())
+
+    path.joinpath(sharded.MANIFEST).write_text('{"format": 0}',
+                                               encoding="utf-8")
+    self.assertRaises(ValueError, autodict.ShardedAutoDict, path)
+
+  def test_save(self):
+    path = self._TEST_ROOT.joinpath("store")
+
+    d = autodict.ShardedAutoDict(path, shards=4, save_on_exit=False)
+    for i in range(20):
+      d[str(i)]["value"] = i
+    self.assertEqual(d.dirty_shards, {0, 1, 2, 3})
+    d.save()
+    self.assertEqual(d.dirty_shards, set())
+    mtimes = {p: p.stat().st_mtime_ns for p in path.iterdir()}
+
+    # Only the changed shard is rewritten
+    d["5"]["value"] = -5
+    self.assertEqual(len(d.dirty_shards), 1)
+    shard = d._shard_path(d.dirty_shards.pop())  # pylint: disable=protected-access
+    d.save()
+    for p, mtime in mtimes.items():
+      if p != shard:
+        self.assertEqual(p.stat().st_mtime_ns, mtime)
+
+    # Emptied shards are removed
+    d.clear()
+    d["only"] = 1
+    d.save()
+    self.assertEqual(len(list(path.glob("*.json"))), 2)
+
+    with autodict.ShardedAutoDict(path, max_workers=1) as d:
+      self.assertEqual(d, {"only": 1})
+      d.pop("only")
+      d.setdefault("other", 2)
+      del d["other"]
+    with autodict.ShardedAutoDict(path) as d:
+      self.assertEqual(d, {})
+
+  def test_driver(self):
+    path = self._TEST_ROOT.joinpath("store")
+
+    with autodict.ShardedAutoDict(path, driver=pickle.PickleDriver) as d:
+      d["a"]["b"] = 1
+    self.assertEqual(len(list(path.glob("*.pickle"))), 1)
+    with open(path.joinpath(sharded.MANIFEST), "r", encoding="utf-8") as file:
+      self.assertEqual(json.load(file)["suffix"], ".pickle")
+
+    # Driver of an existing directory is used
+    with autodict.ShardedAutoDict(path, driver="auto") as d:
+      self.assertIs(d._driver, pickle.PickleDriver)  # pylint: disable=protected-access
+      self.assertEqual(d, {"a": {"b": 1}})
+
+  def test_copy(self):
+    path = self._TEST_ROOT.joinpath("store")
+    with autodict.ShardedAutoDict(path, shards=4) as d:
+      d["a"]["b"] = 1
+      d["c"] = 2
+
+    d = autodict.ShardedAutoDict(path, save_on_exit=False)
+    for c in [copy.copy(d), copy.deepcopy(d)]:
+      self.assertIs(type(c), autodict.LazyAutoDict)
+      self.assertEqual(c, {"a": {"b": 1}, "c": 2})
+
+    # Each operation loads every shard of a new object
+    expected = {"a": {"b": 1}, "c": 2}
+    operations = [
+        lambda d: d.copy(), lambda d: d | {}, lambda d: {} | d,
+        lambda d: dict.fromkeys(reversed(d), 0)
+    ]
+    for op in operations:
+      d = autodict.ShardedAutoDict(path, save_on_exit=False)
+      self.assertEqual(dict.keys(op(d)), expected.keys())
+    d = autodict.ShardedAutoDict(path, save_on_exit=False)
+    self.assertEqual(d | {"c": 3, "e": 4}, {"a": {"b": 1}, "c": 3, "e": 4})
+    self.assertEqual({"c": 3, "e": 4} | d, {"a": {"b": 1}, "c": 2, "e": 4})
+    self.assertIs(type(d.copy()), autodict.LazyAutoDict)
+
+  def test_speed_save(self):
+    path_json = self._TEST_ROOT.joinpath("store.json")
+    path_sharded = self._TEST_ROOT.joinpath("store")
+
+    n = 2000
+    n_saves = 10
+    records = {str(i): {"name": self.gen_string(), "i": i} for i in range(n)}
+
+    d = autodict.JSONAutoDict(path_json, save_on_exit=False)
+    d.update(records)
+    d.save()
+    start = time.perf_counter()
+    for i in range(n_saves):
+      d[str(i)]["i"] = -i
+      d.save()
+    elapsed_json = time.perf_counter() - start
+
+    d = autodict.ShardedAutoDict(path_sharded, save_on_exit=False)
+    d.update(records)
+    d.save()
+    start = time.perf_counter()
+    for i in range(n_saves):
+      d[str(i)]["i"] = -i
+      d.save()
+    elapsed_sharded = time.perf_counter() - start
+
+    self.log_speed(elapsed_json, elapsed_sharded)
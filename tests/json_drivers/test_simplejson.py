@@ -88,6 +88,10 @@ class TestSimpleJSONDriver(base.TestBase):
     self.assertIsInstance(d, autodict.AutoDict)
     self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
 
+    d = simplejson.SimpleJSONDriver.load(path, lazy=True)
+    self.assertIsInstance(d, autodict.LazyAutoDict)
+    self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+
     with open(path, "r", encoding="utf-8") as file:
       d = simplejson.SimpleJSONDriver.load(file)
       self.assertIsInstance(d, autodict.AutoDict)
@@ -102,6 +106,16 @@ class TestSimpleJSONDriver(base.TestBase):
       self.assertIsInstance(d, autodict.AutoDict)
       self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
 
+      d = simplejson.SimpleJSONDriver.loads(s, lazy=True)
+      self.assertIsInstance(d, autodict.LazyAutoDict)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+      self.assertIsInstance(d["child"], autodict.LazyAutoDict)
+
+    b = path.read_bytes()
+    for s in [b, bytearray(b), memoryview(b)]:
+      d = simplejson.SimpleJSONDriver.loads(s)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+
   def test_speed_load(self):
     path = self._DATA_ROOT.joinpath("basic.json")
     with open(path, "r", encoding="utf-8") as file:
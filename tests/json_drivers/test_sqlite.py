@@ -0,0 +1,237 @@
+"""Test module json_drivers.sqlite
+"""
+
+import io
+import json
+import sqlite3
+import time
+
+from tests import base
+
+import autodict
+from autodict.json_drivers import sqlite
+
+
+class TestSQLiteAutoDict(base.TestBase):
+  """Test SQLiteAutoDict
+  """
+
+  def test_init(self):
+    path = self._TEST_ROOT.joinpath("store.db")
+
+    with autodict.SQLiteAutoDict(path) as d:
+      self.assertEqual(d.path, path)
+      self.assertEqual(d.node_path, ())
+      self.assertEqual(len(d), 0)
+      d["a"]["b"]["c"] = 1
+      d["d"] = [1, {"e": None}]
+      d[1] = "int"
+      self.assertIsInstance(d["a"], autodict.SQLiteAutoDict)
+      self.assertEqual(d["a"].node_path, ("a",))
+      self.assertEqual(d["a"]["b"].node_path, ("a", "b"))
+      self.assertRaises(TypeError, d.__setitem__, (1, 2), 0)
+    self.assertTrue(path.exists())
+
+    with autodict.SQLiteAutoDict(path) as d:
+      self.assertEqual(len(d), 3)
+      self.assertEqual(d.to_dict(), {
+          "a": {
+              "b": {
+                  "c": 1
+              }
+          },
+          "d": [1, {
+              "e": None
+          }],
+          "1": "int"
+      })
+      self.assertIsInstance(d.to_dict()["a"], autodict.AutoDict)
+      self.assertEqual(d.get(1), "int")
+      self.assertIsNone(d.get("missing"))
+      self.assertIn("a", d)
+      self.assertIn(["a", "b", "c"], d)
+      self.assertTrue(d.contains("a", "b"))
+      self.assertNotIn(["a", "c"], d)
+      self.assertNotIn("missing", d)
+      self.assertEqual(list(d), ["1", "a", "d"])
+
+  def test_vivify(self):
+    path = self._TEST_ROOT.joinpath("store.db")
+
+    with autodict.SQLiteAutoDict(path) as d:
+      node = d["a"]["b"]
+      self.assertEqual(d.to_dict(), {"a": {"b": {}}})
+      node["c"] = 1
+      self.assertEqual(d["a"]["b"]["c"], 1)
+
+      # Leaves are copies
+      d["l"] = [1]
+      d["l"].append(2)
+      self.assertEqual(d["l"], [1])
+
+      # Replacing a node drops its members
+      d["a"] = {"x": {"y": 2}}
+      self.assertEqual(d["a"].to_dict(), {"x": {"y": 2}})
+      d["a"] = 3
+      self.assertEqual(d["a"], 3)
+      self.assertFalse(d.contains("a", "x"))
+
+      # Writes through a view of a removed node are dropped when set again
+      node = d["n"]
+      del d["n"]
+      node["stale"] = 1
+      self.assertEqual(d["n"].to_dict(), {})
+
+      # Nodes may be copied into other nodes
+      d["x"]["k"] = 1
+      d["copy"] = d["x"]
+      self.assertEqual(d["copy"].to_dict(), {"k": 1})
+      d["x"] = d["x"]
+      self.assertEqual(d["x"].to_dict(), {"k": 1})
+
+  def test_mutable_mapping(self):
+    path = self._TEST_ROOT.joinpath("store.db")
+
+    with autodict.SQLiteAutoDict(path) as d:
+      d.update({"a": 1, "b": {"c": 2}, "e": 3})
+      self.assertEqual(d.pop("a"), 1)
+      self.assertEqual(d.pop("b"), {"c": 2})
+      self.assertEqual(d.pop("b", None), None)
+      self.assertRaises(KeyError, d.pop, "b")
+      self.assertEqual(d.setdefault("e", 4), 3)
+      self.assertEqual(d.setdefault("f", 4), 4)
+      del d["e"]
+      self.assertRaises(KeyError, d.__delitem__, "e")
+      self.assertEqual(dict(d.items()), {"f": 4})
+      self.assertEqual(list(d.values()), [4])
+
+      d["g"]["h"] = 1
+      d["g"].clear()
+      self.assertEqual(d.to_dict(), {"f": 4, "g": {}})
+      d.clear()
+      self.assertEqual(d.to_dict(), {})
+
+      # Keys with separators are escaped
+      d["a\x00b"]["\x01"] = 1
+      d["a"]["b"] = 2
+      self.assertEqual(d.to_dict(), {"a\x00b": {"\x01": 1}, "a": {"b": 2}})
+      self.assertEqual(d["a\x00b"].to_dict(), {"\x01": 1})
+
+  def test_prefix(self):
+    path = self._TEST_ROOT.joinpath("store.db")
+
+    with autodict.SQLiteAutoDict(path) as d:
+      for k in ["apple", "apricot", "banana", "ap", "b"]:
+        d[k] = k
+      self.assertEqual([k for k, _ in d.prefix("ap")],
+                       ["ap", "apple", "apricot"])
+      self.assertEqual([k for k, _ in d.prefix("")],
+                       ["ap", "apple", "apricot", "b", "banana"])
+      self.assertEqual([k for k, _ in d.range("apr", "banana")],
+                       ["apricot", "b"])
+      self.assertEqual([k for k, _ in d.range(stop="apple")], ["ap"])
+      self.assertEqual([k for k, _ in d.range("b")], ["b", "banana"])
+      self.assertEqual(list(d.prefix("c")), [])
+
+  def test_pages(self):
+    path = self._TEST_ROOT.joinpath("store.db")
+
+    n = sqlite._PAGE_SIZE * 2 + 1  # pylint: disable=protected-access
+    with autodict.SQLiteAutoDict(path, batch_size=100) as d:
+      d.update({f"{i:05}": i for i in range(n)})
+      # Writes and commits while iterating
+      for k, v in d.items():
+        d[k] = -v
+      self.assertEqual(list(d.values()), [-i for i in range(n)])
+      self.assertEqual(len(list(d.range("00001", "02001"))), 2000)
+
+  def test_transactions(self):
+    path = self._TEST_ROOT.joinpath("store.db")
+
+    d = autodict.SQLiteAutoDict(path, batch_size=10, save_on_exit=False)
+    for i in range(25):
+      d[str(i)] = i
+    d.close()
+    # Only full batches were committed
+    with autodict.SQLiteAutoDict(path) as d:
+      self.assertEqual(len(d), 20)
+      d.clear()
+
+    d = autodict.SQLiteAutoDict(path)
+    node = d["a"]
+    node["b"] = 1
+    # Views keep the connection open
+    del d
+    node["c"] = 2
+    del node
+    with autodict.SQLiteAutoDict(path) as d:
+      self.assertEqual(d.to_dict(), {"a": {"b": 1, "c": 2}})
+      d["a"]["d"] = 3
+      d.commit()
+      connection = sqlite3.connect(path)
+      rows = connection.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+      connection.close()
+      self.assertEqual(rows, 4)
+
+  def test_import_export(self):
+    path = self._TEST_ROOT.joinpath("store.db")
+    path_json = self._TEST_ROOT.joinpath("store.json")
+
+    data = {
+        "a": {
+            "b": [1, 2, {
+                "c": "d"
+            }]
+        },
+        "e": 1.5,
+        "f": {},
+        "g": None
+    }
+    with open(path_json, "w", encoding="utf-8") as file:
+      json.dump(data, file)
+
+    with autodict.SQLiteAutoDict(path) as d:
+      self.assertEqual(d.import_file(path_json), 4)
+      self.assertEqual(d.to_dict(), data)
+      self.assertIsInstance(d["a"], autodict.SQLiteAutoDict)
+
+      path_json.unlink()
+      d.export_file(path_json)
+      with open(path_json, "r", encoding="utf-8") as file:
+        self.assertEqual(json.load(file), data)
+
+      buf = io.StringIO()
+      d["a"].export_file(buf, indent=2)
+      self.assertEqual(json.loads(buf.getvalue()), data["a"])
+
+      path_pickle = self._TEST_ROOT.joinpath("store.pickle")
+      d.export_file(path_pickle)
+      d.clear()
+      d.import_file(path_pickle)
+      self.assertEqual(d.to_dict(), data)
+
+  def test_speed_get(self):
+    path = self._TEST_ROOT.joinpath("store.db")
+    path_json = self._TEST_ROOT.joinpath("store.json")
+
+    n = 5000
+    n_reads = 20
+    records = {str(i): {"name": self.gen_string(), "i": i} for i in range(n)}
+    with autodict.JSONAutoDict(path_json) as d:
+      d.update(records)
+    with autodict.SQLiteAutoDict(path) as d:
+      d.import_file(path_json)
+
+    start = time.perf_counter()
+    for i in range(n_reads):
+      with autodict.JSONAutoDict(path_json, save_on_exit=False) as d:
+        self.assertEqual(d[str(i)]["i"], i)
+    elapsed_json = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(n_reads):
+      with autodict.SQLiteAutoDict(path) as d:
+        self.assertEqual(d[str(i)]["i"], i)
+    elapsed_sqlite = time.perf_counter() - start
+
+    self.log_speed(elapsed_json, elapsed_sqlite)
@@ -0,0 +1,96 @@
+"""Test module json_drivers.stream
+"""
+
+import io
+import json
+
+from tests import base
+
+from autodict.json_drivers import stream
+
+
+class TestStream(base.TestBase):
+  """Test iter_fragments
+  """
+
+  DOC = {
+      "a": {
+          "b": [1, {
+              "c": "d"
+          }, "e\\"],
+          "f": None
+      },
+      "esc\"aped\\": "quote \" backslash \\\\\" brace { bracket ]",
+      "unicode": "é中\U0001f600",
+      "numbers": [-1.5e-3, 0, 12345678901234567890],
+      "bools": [True, False],
+      "empty": {},
+      "empty list": [],
+  }
+
+  def test_iter_fragments(self):
+    s = json.dumps(self.DOC, indent=2, ensure_ascii=False)
+    for chunk_size in [1, 2, 3, 7, 1 << 16]:
+      for fp in [io.StringIO(s), io.BytesIO(s.encode())]:
+        items = {
+            path: json.loads(frag) for path, frag in stream.iter_fragments(
+                fp, chunk_size=chunk_size)
+        }
+        expected = {(k,): v for k, v in self.DOC.items()}
+        self.assertDictEqual(items, expected)
+
+  def test_prefix(self):
+    s = json.dumps(self.DOC)
+    for chunk_size in [1, 5, 1 << 16]:
+      items = list(
+          stream.iter_fragments(io.StringIO(s), ("a", "b"),
+                                chunk_size=chunk_size))
+      items = [(path, json.loads(frag)) for path, frag in items]
+      self.assertListEqual(items, [(("a", "b", 0), 1),
+                                   (("a", "b", 1), {
+                                       "c": "d"
+                                   }), (("a", "b", 2), "e\\")])
+
+      items = list(
+          stream.iter_fragments(io.StringIO(s), ("a", "b", 1),
+                                chunk_size=chunk_size))
+      self.assertListEqual(items, [(("a", "b", 1, "c"), '"d"')])
+
+    items = list(stream.iter_fragments(io.StringIO(s), ("missing",)))
+    self.assertListEqual(items, [])
+    items = list(stream.iter_fragments(io.StringIO(s), ("empty",)))
+    self.assertListEqual(items, [])
+    items = list(stream.iter_fragments(io.StringIO(s), ("empty list",)))
+    self.assertListEqual(items, [])
+
+  def test_keys(self):
+    s = json.dumps(self.DOC)
+    for chunk_size in [1, 5, 1 << 16]:
+      items = dict(
+          stream.iter_fragments(io.StringIO(s),
+                                keys={"unicode", "bools"},
+                                chunk_size=chunk_size))
+      self.assertDictEqual(items, {
+          ("unicode",): json.dumps(self.DOC["unicode"]),
+          ("bools",): "[true, false]"
+      })
+
+  def test_path(self):
+    path = self._TEST_ROOT.joinpath("doc.json")
+    with open(path, "w", encoding="utf-8") as file:
+      json.dump(self.DOC, file)
+    items = dict(stream.iter_fragments(path, keys={"a"}))
+    self.assertDictEqual(json.loads(items[("a",)]), self.DOC["a"])
+
+    items = dict(stream.iter_fragments(str(path), keys={"a"}))
+    self.assertDictEqual(json.loads(items[("a",)]), self.DOC["a"])
+
+  def test_invalid(self):
+    invalid = [
+        "", "1", '{"a" 1}', '{"a": 1', '{"a": [1, 2}', '{"a": "unterminated',
+        "{1: 2}", '{"a": 1 "b": 2}', '{"a": {"b": 1'
+    ]
+    for s in invalid:
+      for keys in [None, set()]:
+        with self.assertRaises(ValueError):
+          list(stream.iter_fragments(io.StringIO(s), keys=keys, chunk_size=2))
@@ -1,6 +1,7 @@
 """Test module json_drivers.ujson
 """
 
+import decimal
 import json
 import time
 
@@ -67,6 +68,33 @@ class TestUltraJSONDriver(base.TestBase):
     s = ujson.UltraJSONDriver.dumps(TestDefaultJSONDriver.JSON_BASIC, indent=2)
     json.loads(s)  # No JSON errors
 
+  def test_dumps_decimal(self):
+    value = decimal.Decimal("3.14159265358979323846")
+    d = autodict.AutoDict(a=[1, (value,)], b={"c": value}, e=1.5)
+    s = ujson.UltraJSONDriver.dumps(d)
+    self.assertEqual(json.loads(s), {
+        "a": [1, [float(value)]],
+        "b": {
+            "c": float(value)
+        },
+        "e": 1.5
+    })
+    self.assertIn(decimal.Decimal, ujson.UltraJSONDriver.NATIVE_TYPES)
+
+    # Encoded by the registry rather than as lossy floats
+    driver = ujson.UltraJSONDriver.with_options(encode_decimals=True)
+    self.assertNotIn(decimal.Decimal, driver.NATIVE_TYPES)
+    s = driver.dumps(d)
+    self.assertEqual(json.loads(s), {
+        "a": [1, [str(value)]],
+        "b": {
+            "c": str(value)
+        },
+        "e": 1.5
+    })
+    self.assertEqual(d["b"]["c"], value)
+    self.assertEqual(s, autodict.DefaultJSONDriver.dumps(d).replace(" ", ""))
+
   def test_upgrade_dicts(self):
     key = self.gen_string()
     value = self.gen_string()
@@ -95,6 +123,10 @@ class TestUltraJSONDriver(base.TestBase):
     self.assertIsInstance(d, autodict.AutoDict)
     self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
 
+    d = ujson.UltraJSONDriver.load(path, lazy=True)
+    self.assertIsInstance(d, autodict.LazyAutoDict)
+    self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+
     with open(path, "r", encoding="utf-8") as file:
       d = ujson.UltraJSONDriver.load(file)
       self.assertIsInstance(d, autodict.AutoDict)
@@ -109,6 +141,16 @@ class TestUltraJSONDriver(base.TestBase):
       self.assertIsInstance(d, autodict.AutoDict)
       self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
 
+      d = ujson.UltraJSONDriver.loads(s, lazy=True)
+      self.assertIsInstance(d, autodict.LazyAutoDict)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+      self.assertIsInstance(d["child"], autodict.LazyAutoDict)
+
+    b = path.read_bytes()
+    for s in [b, bytearray(b), memoryview(b)]:
+      d = ujson.UltraJSONDriver.loads(s)
+      self.assertDictEqual(TestDefaultJSONDriver.JSON_BASIC_DESERIALIZED, d)
+
   def test_speed_load(self):
     path = self._DATA_ROOT.joinpath("basic.json")
     with open(path, "r", encoding="utf-8") as file:
@@ -1,6 +1,9 @@
 """Test module autodict
 """
 
+import copy
+import pickle
+
 from tests import base
 
 import autodict
@@ -53,3 +56,222 @@ class TestAutoDict(base.TestBase):
     self.assertFalse(d.contains(section, key, key))
     self.assertIn([key, key], d)
     self.assertNotIn([key, key, key], d)
+
+
+class TestLazyAutoDict(base.TestBase):
+  """Test LazyAutoDict
+  """
+
+  def test_missing_children(self):
+    key = self.gen_string()
+    value = self.gen_string(min_length=40, max_length=50)
+
+    d = autodict.LazyAutoDict()
+    d[key][key][key] = value
+    self.assertIsInstance(d[key], autodict.LazyAutoDict)
+    self.assertIsInstance(d[key][key], autodict.LazyAutoDict)
+    self.assertEqual(d[key][key][key], value)
+
+  def test_upgrade(self):
+    key = self.gen_string()
+    value = self.gen_string(min_length=40, max_length=50)
+
+    plain = {key: {key: {key: value}}, "list": [{key: value}]}
+    d = autodict.LazyAutoDict(plain)
+    self.assertDictEqual(d, plain)
+
+    # Untouched children are left plain
+    self.assertIs(type(dict.__getitem__(d, key)), dict)
+
+    child = d[key]
+    self.assertIsInstance(child, autodict.LazyAutoDict)
+    self.assertIs(dict.__getitem__(d, key), child)
+    self.assertIs(d[key], child)
+    self.assertIs(type(dict.__getitem__(child, key)), dict)
+    self.assertIs(type(plain[key]), dict)
+
+    child = d.get(key)
+    self.assertIsInstance(child[key], autodict.LazyAutoDict)
+    self.assertIsNone(d.get(value))
+    self.assertEqual(d.get(value, value), value)
+    self.assertNotIn(value, d)
+
+    d[key][key][value][value] = value
+    self.assertEqual(plain[key][key], {key: value})
+
+    self.assertIs(type(d["list"][0]), dict)
+
+  def test_contains(self):
+    key = self.gen_string()
+    value = self.gen_string(min_length=40, max_length=50)
+
+    d = autodict.LazyAutoDict({key: {key: {key: value}}})
+    self.assertTrue(d.contains(key, key, key))
+    self.assertFalse(d.contains(key, value, key))
+    self.assertIn([key, key], d)
+    self.assertNotIn([key, value], d)
+
+
+class TestObservedAutoDict(base.TestBase):
+  """Test ObservedAutoDict
+  """
+
+  def test_missing_children(self):
+    key = self.gen_string()
+    value = self.gen_string(min_length=40, max_length=50)
+
+    d = autodict.ObservedAutoDict()
+    d[key][key][key] = value
+    self.assertIsInstance(d[key], autodict.ObservedAutoDict)
+    self.assertIsInstance(d[key][key], autodict.ObservedAutoDict)
+    self.assertEqual(d[key][key][key], value)
+
+  def test_observers(self):
+    events = []
+
+    def callback(op, path, value):
+      events.append((op, path, value))
+
+    child = autodict.AutoDict(b=autodict.AutoDict())
+    d = autodict.ObservedAutoDict({"plain": {"y": 1}, "a": child})
+    d.add_observer(callback)
+
+    d["plain"]["z"] = 2
+    self.assertEqual(events.pop(0), ("set", ("plain", "z"), 2))
+    self.assertIsInstance(d["plain"], autodict.ObservedAutoDict)
+
+    # AutoDicts are upgraded in place
+    d["a"]["b"]["c"] = 3
+    self.assertIs(d["a"], child)
+    self.assertIsInstance(child, autodict.ObservedAutoDict)
+    self.assertEqual(events.pop(0), ("set", ("a", "b", "c"), 3))
+
+    d["n"]["m"] = 1
+    self.assertEqual(events.pop(0)[:2], ("set", ("n",)))
+    self.assertEqual(events.pop(0), ("set", ("n", "m"), 1))
+
+    del d["n"]
+    self.assertEqual(events.pop(0), ("delete", ("n",), None))
+
+    # Removed children are no longer observed
+    d["a"] = 5
+    self.assertEqual(events.pop(0), ("set", ("a",), 5))
+    child["q"] = 1
+    self.assertEqual(events, [])
+
+    d.update({"k": 1}, j=2)
+    self.assertEqual(events.pop(0), ("set", ("k",), 1))
+    self.assertEqual(events.pop(0), ("set", ("j",), 2))
+    self.assertEqual(d.pop("k"), 1)
+    self.assertEqual(events.pop(0), ("delete", ("k",), None))
+    self.assertIsNone(d.pop("k", None))
+    self.assertRaises(KeyError, d.pop, "k")
+    self.assertEqual(d.popitem(), ("j", 2))
+    self.assertEqual(events.pop(0), ("delete", ("j",), None))
+
+    self.assertEqual(d.setdefault("s", 1), 1)
+    self.assertEqual(d.setdefault("s", 2), 1)
+    self.assertEqual(events.pop(0), ("set", ("s",), 1))
+
+    d["plain"].clear()
+    self.assertEqual(events.pop(0), ("clear", ("plain",), None))
+    self.assertEqual(events, [])
+
+    # Observers of children see paths relative to themselves
+    child_events = []
+    d["plain"].add_observer(lambda *args: child_events.append(args))
+    d["plain"]["x"] = 1
+    self.assertEqual(child_events, [("set", ("x",), 1)])
+    self.assertEqual(events.pop(0), ("set", ("plain", "x"), 1))
+
+    d.remove_observer(callback)
+    d["x"] = 1
+    self.assertEqual(events, [])
+    self.assertRaises(ValueError, d.remove_observer, callback)
+
+  def test_copy(self):
+    events = []
+    d = autodict.ObservedAutoDict({"a": {"b": 1}})
+    d.add_observer(lambda *args: events.append(args))
+    d["a"]["c"] = 2
+    events.clear()
+
+    other = copy.deepcopy(d)
+    self.assertEqual(other, d)
+    other["a"]["d"] = 3
+    other["e"] = 4
+    self.assertEqual(events, [])
+
+    other = pickle.loads(pickle.dumps(d))
+    self.assertEqual(other, d)
+    self.assertIsInstance(other["a"], autodict.ObservedAutoDict)
+    other["a"]["d"] = 3
+    self.assertEqual(events, [])
+
+    # Children linked to another tree are linked again upon access
+    tree = pickle.loads(pickle.dumps(d))
+    other = autodict.ObservedAutoDict()
+    dict.update(other, tree)
+    other.add_observer(lambda *args: events.append(args))
+    other["a"]["d"] = 3
+    self.assertEqual(events, [("set", ("a", "d"), 3)])
+    self.assertIs(other["a"].parent(), other)
+
+    # Shallow copies do not take over the children they share
+    events.clear()
+    child = d["a"]
+    other = copy.copy(d)
+    child["x"] = 1
+    d["a"]["y"] = 2
+    self.assertEqual(events, [("set", ("a", "x"), 1), ("set", ("a", "y"), 2)])
+    self.assertIs(other["a"], child)
+
+
+class TestFrozenAutoDict(base.TestBase):
+  """Test FrozenAutoDict
+  """
+
+  def test_freeze(self):
+    plain = {"a": {"b": [1, {"c": 2}]}, "d": 1}
+    d = autodict.FrozenAutoDict.freeze(plain)
+    self.assertIsInstance(d, autodict.FrozenAutoDict)
+    self.assertIsInstance(d["a"], autodict.FrozenAutoDict)
+    self.assertEqual(d["a"]["b"], (1, {"c": 2}))
+    self.assertIsInstance(d["a"]["b"][1], autodict.FrozenAutoDict)
+    self.assertIs(autodict.FrozenAutoDict.freeze(d), d)
+    self.assertEqual(autodict.FrozenAutoDict.freeze([{}]), ({},))
+    self.assertIn(["a", "b"], d)
+    self.assertTrue(d.contains("a", "b"))
+
+    self.assertRaises(KeyError, d.__getitem__, "missing")
+    self.assertNotIn("missing", d)
+    for mutate in [
+        lambda: d.__setitem__("x", 1), lambda: d.__delitem__("d"),
+        lambda: d.pop("d"), d.popitem, d.clear, lambda: d.setdefault("x"),
+        lambda: d.update(x=1), lambda: d["a"].update(x=1)
+    ]:
+      self.assertRaises(TypeError, mutate)
+    with self.assertRaises(TypeError):
+      d |= {"x": 1}
+    self.assertEqual(d, {"a": {"b": (1, {"c": 2})}, "d": 1})
+
+  def test_thaw(self):
+    d = autodict.FrozenAutoDict.freeze({"a": {"b": [1, {"c": 2}]}})
+    thawed = d.thaw()
+    self.assertIs(type(thawed), autodict.AutoDict)
+    self.assertIs(type(thawed["a"]["b"]), list)
+    self.assertIs(type(thawed["a"]["b"][1]), autodict.AutoDict)
+    thawed["a"]["b"].append(3)
+    thawed["x"]["y"] = 1
+    self.assertEqual(d, {"a": {"b": (1, {"c": 2})}})
+
+  def test_copy(self):
+    d = autodict.FrozenAutoDict.freeze({"a": {"b": 1}})
+    for other in [
+        copy.copy(d),
+        copy.deepcopy(d),
+        pickle.loads(pickle.dumps(d))
+    ]:
+      self.assertIsInstance(other, autodict.FrozenAutoDict)
+      self.assertEqual(other, d)
+      self.assertRaises(TypeError, other.clear)